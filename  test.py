@@ -10,7 +10,7 @@ import os
 # Adiciona o diretório atual ao path para importar o main
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from main import TranspositorMusical
+from main import TranspositorMusical, medir_inicializacao, processar_jsonl
 
 def test_notas_naturais():
     """Testa as 7 notas musicais naturais"""
@@ -117,6 +117,1057 @@ def test_transpositor():
     
     print("\n🎉 Todos os testes concluídos!")
 
+def test_acordes_compilados():
+    """Testa a representação compilada de acordes e a tabela de transposições"""
+    print("\n🧩 Testando acordes compilados...")
+    
+    transpositor = TranspositorMusical()
+    
+    acorde = transpositor.compilar_acorde("F#m7/C#")
+    testes_estrutura = [
+        ("raiz", acorde.raiz, 6),
+        ("qualidade", acorde.qualidade, "m7"),
+        ("baixo", acorde.baixo, 1),
+        ("grafias", len(acorde.grafias), 24),
+    ]
+    for nome, resultado, esperado in testes_estrutura:
+        status = "✅" if resultado == esperado else "❌"
+        print(f"   {status} {nome}: {resultado} (esperado: {esperado})")
+        assert status == "✅"
+    
+    testes_tabela = [
+        ("F#m7/C#", 1, False, "Gm7/D"),
+        ("Bb7", 2, False, "C7"),
+        ("(Am)", 1, True, "(Bbm)"),
+        ("Cb", 1, False, "C"),
+    ]
+    for simbolo, semitons, bemois, esperado in testes_tabela:
+        resultado = transpositor.compilar_acorde(simbolo).transpor(semitons, bemois)
+        status = "✅" if resultado == esperado else "❌"
+        print(f"   {status} {simbolo} + {semitons} = {resultado} (esperado: {esperado})")
+        assert status == "✅"
+    
+    compilada = transpositor.compilar_cifra("C G Am F")
+    resultado = transpositor.transpor_cifra_compilada(compilada, 2)
+    status = "✅" if resultado == "D A Bm G" else "❌"
+    print(f"   {status} Cifra compilada + 2 = {resultado}")
+    assert status == "✅"
+
+def test_transposicao_em_fluxo():
+    """Testa a transposição linha a linha preservando o alinhamento"""
+    print("\n📜 Testando transposição em fluxo...")
+    
+    transpositor = TranspositorMusical()
+    
+    testes_linhas = [
+        ("C    G    Am\n", 1, False, "C#   G#   A#m\n"),
+        ("C#   G#   A#m\n", -1, False, "C    G    Am\n"),
+        ("  Em  D/F#  C\r\n", 2, False, "  F#m E/G#  D\r\n"),
+        ("1 2 3\n", 5, False, "1 2 3\n"),
+    ]
+    for linha, semitons, bemois, esperado in testes_linhas:
+        resultado = transpositor.transpor_linha(linha, semitons, bemois)
+        status = "✅" if resultado == esperado else "❌"
+        print(f"   {status} {linha!r} + {semitons} = {resultado!r} (esperado: {esperado!r})")
+        assert status == "✅"
+    
+    linhas = ["C G\n", "letra\n", "F C\n"]
+    resultado = list(transpositor.transpor_fluxo(iter(linhas), 2))
+    esperado = ["D A\n", "letra\n", "G D\n"]
+    status = "✅" if resultado == esperado else "❌"
+    print(f"   {status} Fluxo de {len(linhas)} linhas: {resultado}")
+    assert status == "✅"
+
+def test_partes_por_instrumento():
+    """Testa a geração das partes de vários instrumentos em uma só passada"""
+    print("\n🎺 Testando partes por instrumento...")
+    
+    transpositor = TranspositorMusical()
+    
+    cifra = "C G Am F"
+    partes = transpositor.transpor_partes(cifra, "violao")
+    status = "✅" if len(partes) == len(transpositor.instrumentos) else "❌"
+    print(f"   {status} {len(partes)} partes geradas")
+    assert status == "✅"
+    
+    for instrumento_id in ["ukulele_soprano", "saxofone_alto", "trompa_fa"]:
+        esperado = transpositor.transpor_cifra(cifra, "violao", instrumento_id)
+        resultado = partes[instrumento_id]
+        status = "✅" if resultado == esperado else "❌"
+        print(f"   {status} {instrumento_id}: {resultado} (esperado: {esperado})")
+        assert status == "✅"
+
+def test_matriz_intervalos():
+    """Testa a matriz pré-calculada de intervalos entre instrumentos"""
+    print("\n🧮 Testando matriz de intervalos...")
+    
+    transpositor = TranspositorMusical()
+    
+    ids, matriz = transpositor.matriz_intervalos()
+    status = "✅" if len(matriz) == len(ids) == len(transpositor.instrumentos) else "❌"
+    print(f"   {status} Matriz {len(matriz)}x{len(ids)}")
+    assert status == "✅"
+    
+    divergencias = [
+        (origem, destino)
+        for origem in ids for destino in ids
+        if transpositor.calcular_diferenca_afinacao(origem, destino)
+        != transpositor._diferenca_afinacao_direta(origem, destino)
+    ]
+    status = "✅" if not divergencias else "❌"
+    print(f"   {status} Matriz confere com o cálculo direto ({len(divergencias)} divergências)")
+    assert status == "✅"
+    
+    transpositor.adicionar_instrumento("trompete_do", "Trompete Dó", ["C4"], "C")
+    semitons = transpositor.calcular_diferenca_afinacao("trompete_sib", "trompete_do")
+    status = "✅" if semitons == 2 else "❌"
+    print(f"   {status} Catálogo recompilado após alteração: Trompete Sib → Dó = {semitons} (esperado: 2)")
+    assert status == "✅"
+
+def test_tabelas_compartilhadas():
+    """Testa que as tabelas são imutáveis e compartilhadas entre instâncias"""
+    print("\n🧊 Testando tabelas compartilhadas...")
+    
+    a = TranspositorMusical()
+    b = TranspositorMusical()
+    
+    status = "✅" if a.instrumentos is b.instrumentos and a.tipos_acordes is b.tipos_acordes else "❌"
+    print(f"   {status} Instâncias compartilham catálogo e tabelas")
+    assert status == "✅"
+    
+    try:
+        a.tipos_acordes['x'] = 'inventado'
+        status = "❌"
+    except TypeError:
+        status = "✅"
+    print(f"   {status} Tabela de acordes é somente leitura")
+    assert status == "✅"
+    
+    a.adicionar_instrumento("cavaquinho", "Cavaquinho", ["D4", "G4", "B4", "D5"])
+    status = "✅" if "cavaquinho" in a.instrumentos and "cavaquinho" not in b.instrumentos else "❌"
+    print(f"   {status} Alteração do catálogo não afeta outras instâncias")
+    assert status == "✅"
+    
+    testes_notas = [("Bb3", 46), ("Cb4", 47), ("B#3", 48), ("C-1", -12)]
+    for nota, esperado in testes_notas:
+        resultado = a.nota_para_numero(nota)
+        status = "✅" if resultado == esperado else "❌"
+        print(f"   {status} {nota} = {resultado} (esperado: {esperado})")
+        assert status == "✅"
+    
+    medidas = medir_inicializacao(1000)
+    print(f"   ⏱️  Importação: {medidas['importacao_ms']:.3f} ms | Instância: {medidas['instancia_us']:.3f} µs")
+
+def test_gerador_sintetico():
+    """Testa o gerador de cifras sintéticas usado nos benchmarks"""
+    print("\n📈 Testando gerador de cifras sintéticas...")
+    
+    from benchmark import gerar_cifra_sintetica, executar_benchmarks
+    
+    cifra = gerar_cifra_sintetica(500, semente=7)
+    tokens = cifra.split()
+    status = "✅" if len(tokens) == 500 and cifra == gerar_cifra_sintetica(500, semente=7) else "❌"
+    print(f"   {status} {len(tokens)} tokens gerados de forma reprodutível")
+    assert status == "✅"
+    
+    status = "✅" if any('/' in t for t in tokens) and any(t.islower() for t in tokens) else "❌"
+    print(f"   {status} Mistura acordes com baixo e palavras de letra")
+    assert status == "✅"
+    
+    relatorio = executar_benchmarks(tamanhos=[10])
+    funcoes = {r["funcao"] for r in relatorio["resultados"]}
+    status = "✅" if len(funcoes) == 5 else "❌"
+    print(f"   {status} Relatório com {len(funcoes)} funções medidas")
+    assert status == "✅"
+
+def test_perfil_desempenho():
+    """Testa a instrumentação opcional de desempenho"""
+    print("\n📊 Testando perfil de desempenho...")
+    
+    transpositor = TranspositorMusical()
+    status = "✅" if transpositor.obter_perfil() is None else "❌"
+    print(f"   {status} Perfil desligado por padrão")
+    assert status == "✅"
+    
+    transpositor.ativar_perfil()
+    resultado = transpositor.transpor_cifra("C G Am F C G", "violao", "saxofone_alto")
+    transpositor.converter_cifra_portugues(resultado)
+    perfil = transpositor.obter_perfil()
+    
+    status = "✅" if resultado == "C G Am F C G" else "❌"
+    print(f"   {status} Resultado inalterado com o perfil ativo: {resultado}")
+    assert status == "✅"
+    
+    chamadas = perfil["metodos"].get("transpor_cifra", {}).get("chamadas")
+    status = "✅" if chamadas == 1 else "❌"
+    print(f"   {status} transpor_cifra contado {chamadas} vez(es)")
+    assert status == "✅"
+    
+    cache = perfil["cache"]
+    status = "✅" if cache["acertos"] + cache["falhas"] == 6 and cache["acertos"] >= 2 else "❌"
+    print(f"   {status} Cache: {cache['acertos']} acertos, {cache['falhas']} falhas")
+    assert status == "✅"
+    
+    etapas = [etapa for etapa, dados in perfil["etapas"].items() if dados["chamadas"]]
+    status = "✅" if {"analise", "transposicao", "traducao"} <= set(etapas) else "❌"
+    print(f"   {status} Etapas medidas: {', '.join(etapas)}")
+    assert status == "✅"
+    
+    transpositor.desativar_perfil()
+    transpositor.transpor_cifra("C G", "violao", "violao")
+    status = "✅" if transpositor.obter_perfil()["metodos"]["transpor_cifra"]["chamadas"] == 1 else "❌"
+    print(f"   {status} Nada é contado com o perfil desativado")
+    assert status == "✅"
+
+def test_transposicao_em_lote():
+    """Testa a transposição vetorizada de várias notas"""
+    print("\n🎹 Testando transposição de notas em lote...")
+    
+    transpositor = TranspositorMusical()
+    
+    notas = ["C4", "Bb5", "xyz", "C-1", "G9", "E4"]
+    lote = transpositor.transpor_notas(notas, 2)
+    esperado = ["D4", "C6", None, "D-1", None, "F#4"]
+    status = "✅" if lote.notas == esperado else "❌"
+    print(f"   {status} {notas} + 2 = {lote.notas}")
+    assert status == "✅"
+    
+    fora = [bool(f) for f in lote.fora_do_limite]
+    status = "✅" if fora == [False, False, True, False, True, False] else "❌"
+    print(f"   {status} Máscara de fora do limite: {fora}")
+    assert status == "✅"
+    
+    from array import array
+    lote = transpositor.transpor_notas(["C4", "G9"], 100000)
+    ok = (lote.notas == [None, None] and list(lote.fora_do_limite) == [1, 1]
+          and type(lote.numeros) is array and type(lote.fora_do_limite) is array)
+    print(f"   {'✅' if ok else '❌'} Deslocamento enorme fica fora do limite: {lote.notas}")
+    assert ok, lote
+
+    lote = transpositor.transpor_notas(["A4", "C#3"], -1, usar_bemois=True)
+    status = "✅" if lote.notas == ["Ab4", "C3"] else "❌"
+    print(f"   {status} Grafia com bemóis: {lote.notas}")
+    assert status == "✅"
+    
+    numeros = transpositor.notas_para_numeros(["C4", "A4"])
+    status = "✅" if list(numeros) == [60, 69] else "❌"
+    print(f"   {status} Números MIDI: {list(numeros)}")
+    assert status == "✅"
+
+def test_formato_binario():
+    """Testa a gravação e leitura do corpus binário de cifras"""
+    print("\n💾 Testando formato binário de cifras...")
+    
+    import tempfile
+    
+    transpositor = TranspositorMusical()
+    musicas = {
+        "asa_branca.txt": "   G        C/G   D7\nQuando olhei a terra ardendo\n",
+        "exemplo.txt": "  Bb  (Am) F#m7/C#  Cb\n",
+        "mista.txt": "[Intro]\nAm       G\nA vida é bela\nE eu te amo\nE|--0--2--|\n",
+    }
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "cancioneiro.cifb")
+        transpositor.gravar_cifras_binarias(caminho, musicas)
+        
+        with transpositor.abrir_cifras_binarias(caminho) as corpus:
+            status = "✅" if corpus.nomes() == list(musicas) else "❌"
+            print(f"   {status} Músicas no corpus: {corpus.nomes()}")
+            assert status == "✅"
+            
+            for nome, texto in musicas.items():
+                status = "✅" if corpus.ler(nome) == texto else "❌"
+                print(f"   {status} {nome} lido sem alterações")
+                assert status == "✅"
+            
+            resultado = corpus.transpor("exemplo.txt", 2)
+            esperado = "  C  (Bm) G#m7/D#  C#\n"
+            status = "✅" if resultado == esperado else "❌"
+            print(f"   {status} Transposição +2: {resultado!r} (esperado: {esperado!r})")
+            assert status == "✅"
+            
+            resultado = corpus.converter_portugues("exemplo.txt")
+            esperado = transpositor.converter_cifra_portugues(musicas["exemplo.txt"])
+            status = "✅" if resultado == esperado else "❌"
+            print(f"   {status} Explicação: {resultado}")
+            assert status == "✅"
+            
+            resultado = corpus.transpor("mista.txt", 2)
+            esperado = transpositor.transpor_cifra_compilada(transpositor.compilar_cifra(musicas["mista.txt"]), 2)
+            status = "✅" if resultado.split() == esperado.split() and "A vida é bela" in resultado else "❌"
+            print(f"   {status} Letra fica igual à de transpor_cifra: {resultado!r}")
+            assert status == "✅"
+
+def test_cache_resultados():
+    """Testa o cache de resultados em memória e em disco"""
+    print("\n🗄️  Testando cache de resultados...")
+    
+    import tempfile
+    from cache_resultados import CacheResultados
+    
+    transpositor = TranspositorMusical()
+    cifra = "C G Am F"
+    esperado = transpositor.transpor_cifra(cifra, "violao", "clarineta_sib")
+    
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "cache.db")
+        
+        with CacheResultados(transpositor, caminho) as cache:
+            primeiro = cache.transpor_cifra(cifra, "violao", "clarineta_sib")
+            segundo = cache.transpor_cifra(cifra, "violao", "clarineta_sib")
+            estatisticas = cache.estatisticas()
+        status = "✅" if primeiro == segundo == esperado and estatisticas["acertos_memoria"] == 1 else "❌"
+        print(f"   {status} Acerto em memória: {segundo} ({estatisticas['taxa_acertos']:.0%} de acertos)")
+        assert status == "✅"
+        
+        with CacheResultados(transpositor, caminho) as cache:
+            resultado = cache.transpor_cifra(cifra, "violao", "clarineta_sib")
+            estatisticas = cache.estatisticas()
+        status = "✅" if resultado == esperado and estatisticas["acertos_disco"] == 1 else "❌"
+        print(f"   {status} Acerto em disco após reabrir o cache")
+        assert status == "✅"
+        
+        transpositor.adicionar_instrumento("clarineta_sib", "Clarineta Sib", ["D3"], "C")
+        with CacheResultados(transpositor, caminho) as cache:
+            resultado = cache.transpor_cifra(cifra, "violao", "clarineta_sib")
+            estatisticas = cache.estatisticas()
+        esperado = transpositor.transpor_cifra(cifra, "violao", "clarineta_sib")
+        status = "✅" if resultado == esperado and estatisticas["falhas"] == 1 else "❌"
+        print(f"   {status} Cache invalidado quando o catálogo muda: {resultado}")
+        assert status == "✅"
+
+def test_servidor_http():
+    """Testa o serviço HTTP local com duas requisições na mesma conexão"""
+    print("\n🌐 Testando servidor HTTP...")
+    
+    import asyncio
+    import json
+    from servidor import ServidorTranspositor
+    
+    async def requisitar(leitor, escritor, metodo, caminho, dados=None):
+        corpo = json.dumps(dados).encode("utf-8") if dados is not None else b""
+        escritor.write(f"{metodo} {caminho} HTTP/1.1\r\nHost: teste\r\n"
+                       f"Content-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo)
+        cabecalho = (await leitor.readuntil(b"\r\n\r\n")).decode("latin-1")
+        tamanho = int(cabecalho.lower().split("content-length:")[1].split("\r\n")[0])
+        return cabecalho.split(" ")[1], json.loads(await leitor.readexactly(tamanho))
+    
+    async def cenario():
+        servidor = ServidorTranspositor()
+        rede = await asyncio.start_server(servidor.atender, "127.0.0.1", 0)
+        porta = rede.sockets[0].getsockname()[1]
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+        try:
+            unico = await requisitar(leitor, escritor, "POST", "/api/transpor",
+                                     {"cifra": "C G Am F", "origem": "violao", "destino": "clarineta_sib"})
+            lote = await requisitar(leitor, escritor, "POST", "/api/lote",
+                                    {"requisicoes": [{"cifra": "C", "semitons": 2}, {"cifra": "C", "origem": "?"}]})
+            invalidos = []
+            for tamanho in ("-5", "abc"):
+                leitor_ruim, escritor_ruim = await asyncio.open_connection("127.0.0.1", porta)
+                escritor_ruim.write(f"POST /api/transpor HTTP/1.1\r\nContent-Length: {tamanho}\r\n\r\n".encode("latin-1"))
+                invalidos.append((await leitor_ruim.readuntil(b"\r\n\r\n")).decode("latin-1").split(" ")[1])
+                await leitor_ruim.read()  # o servidor fecha a conexão
+                escritor_ruim.close()
+                await escritor_ruim.wait_closed()
+            
+            # Corpo menor que o Content-Length: o servidor só fecha a conexão
+            erros = []
+            asyncio.get_running_loop().set_exception_handler(lambda laco, contexto: erros.append(contexto))
+            leitor_ruim, escritor_ruim = await asyncio.open_connection("127.0.0.1", porta)
+            escritor_ruim.write(b"POST /api/transpor HTTP/1.1\r\nContent-Length: 50\r\n\r\n{}")
+            escritor_ruim.write_eof()
+            invalidos.append(await leitor_ruim.read())
+            escritor_ruim.close()
+            await escritor_ruim.wait_closed()
+            await asyncio.sleep(0.05)
+            invalidos.append(len(erros))
+        finally:
+            escritor.close()
+            await escritor.wait_closed()
+            rede.close()
+            await rede.wait_closed()
+        return unico, lote, invalidos
+    
+    transpositor = TranspositorMusical()
+    (status, unico), (status_lote, lote), invalidos = asyncio.run(cenario())
+    
+    esperado = transpositor.transpor_cifra("C G Am F", "violao", "clarineta_sib")
+    ok = status == "200" and unico["resultado"] == esperado
+    print(f"   {'✅' if ok else '❌'} /api/transpor: {unico.get('resultado')} (esperado: {esperado})")
+    assert ok
+    
+    resultados = lote.get("resultados", [])
+    ok = status_lote == "200" and resultados[0].get("resultado") == "D" and "erro" in resultados[1]
+    print(f"   {'✅' if ok else '❌'} /api/lote na mesma conexão: {resultados}")
+    assert ok
+
+    ok = invalidos[:2] == ["400", "400"]
+    print(f"   {'✅' if ok else '❌'} Content-Length negativo ou não numérico: {invalidos[:2]}")
+    assert ok, invalidos
+    
+    ok = invalidos[2:] == [b"", 0]
+    print(f"   {'✅' if ok else '❌'} Corpo incompleto fecha a conexão sem erro no servidor")
+    assert ok, invalidos
+    
+    from servidor import ErroRequisicao
+    servidor = ServidorTranspositor()
+    recusados = []
+    for semitons in (2.7, True, "2", float("inf")):
+        try:
+            servidor.transpor({"cifra": "C", "semitons": semitons})
+        except ErroRequisicao as e:
+            recusados.append(e.status)
+    ok = recusados == [400] * 4 and servidor.transpor({"cifra": "C", "semitons": 2.0})["resultado"] == "D"
+    print(f"   {'✅' if ok else '❌'} Semitons validados como no modo em lote: {recusados}")
+    assert ok, recusados
+    
+    class ServidorComFalha(ServidorTranspositor):
+        def transpor(self, pedido):
+            if pedido.get("falhar"):
+                raise RuntimeError("falha simulada")
+            return super().transpor(pedido)
+    
+    lote = ServidorComFalha().transpor_lote({"requisicoes": [{"falhar": True}, {"cifra": "C", "semitons": 2}]})
+    resultados = lote["resultados"]
+    ok = "erro" in resultados[0] and resultados[1].get("resultado") == "D"
+    print(f"   {'✅' if ok else '❌'} Erro inesperado fica isolado no item: {resultados}")
+    assert ok, resultados
+
+def test_modo_lote_jsonl():
+    """Testa o modo não interativo com pedidos em JSON lines"""
+    print("\n📦 Testando modo em lote (JSON lines)...")
+    
+    import io
+    import json
+    
+    pedidos = [
+        {"id": 1, "operacao": "transpor", "cifra": "C G Am F", "semitons": 2},
+        {"id": 2, "operacao": "notas", "notas": ["C4", "Bb5"], "origem": "violao", "destino": "violao"},
+        {"id": 3, "operacao": "transpor", "cifra": "C", "origem": "violao", "destino": "inexistente"},
+    ]
+    entrada = io.StringIO("".join(json.dumps(p) + "\n" for p in pedidos) + "{quebrado\n")
+    saida = io.StringIO()
+    total = processar_jsonl(entrada, saida)
+    respostas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+    
+    status = "✅" if total == 4 and len(respostas) == 4 else "❌"
+    print(f"   {status} {len(respostas)} respostas para {total} pedidos")
+    assert status == "✅"
+    
+    testes = [
+        (respostas[0].get("resultado"), "D A Bm G"),
+        (respostas[1].get("resultado"), ["C4", "A#5"]),
+        (respostas[2].get("ok"), False),
+        (respostas[3].get("ok"), False),
+    ]
+    for resultado, esperado in testes:
+        status = "✅" if resultado == esperado else "❌"
+        print(f"   {status} {resultado} (esperado: {esperado})")
+        assert status == "✅"
+    
+    status = "✅" if all("tempo_us" in r for r in respostas[:3]) else "❌"
+    print(f"   {status} Tempo registrado em cada resposta")
+    assert status == "✅"
+
+    import tempfile
+
+    invalidos = (
+        '{"id": 5, "cifra": 5, "semitons": 1}\n'
+        '{"id": 6, "cifra": "C", "semitons": 1e400}\n'
+        '{"id": 7, "operacao": "notas", "notas": ["C4", 3], "semitons": 1}\n'
+        '{"id": 8, "cifra": "C", "semitons": 2}\n'
+    )
+    for processos in (1, 2):
+        saida = io.StringIO()
+        total = processar_jsonl(io.StringIO(invalidos), saida, processos)
+        respostas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+        ok = (total == 4 and [r.get("ok") for r in respostas] == [False, False, False, True]
+              and respostas[3].get("resultado") == "D")
+        print(f"   {'✅' if ok else '❌'} Pedidos inválidos não interrompem o lote ({processos} processo(s))")
+        assert ok, respostas
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "banda.json")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump({"instrumentos": [
+                {"id": "cavaquinho", "nome": "Cavaquinho", "familia": "cordas",
+                 "afinacao": ["D4", "G4", "B4", "D5"], "apelidos": ["cavaco"]},
+                {"id": "sax_baritono", "nome": "Saxofone Barítono", "familia": "madeiras",
+                 "afinacao": ["Db2"], "tonalidade": "Eb"},
+            ]}, arquivo)
+        pedido = '{"operacao": "diferenca", "origem": "cavaco", "destino": "sax_baritono"}\n'
+        for processos in (1, 2):
+            saida = io.StringIO()
+            processar_jsonl(io.StringIO(pedido), saida, processos, caminho)
+            resposta = json.loads(saida.getvalue())
+            print(f"   {'✅' if resposta.get('ok') else '❌'} Catálogo próprio usado em {processos} processo(s)")
+            assert resposta.get("ok"), resposta
+
+def test_classificador_linhas():
+    """Testa o pré-filtro que separa linhas de acordes, letra, tablatura e seção"""
+    print("\n🔎 Testando classificador de linhas...")
+    
+    from main import classificar_linha
+    
+    transpositor = TranspositorMusical()
+    
+    testes_linhas = [
+        ("C   G/B   Am7   F", "acordes"),
+        ("Intro: C7(9) Bb7M F#m7b5 (2x)", "acordes"),
+        ("Amor, Deus e Bem", "letra"),
+        ("E o sol vai brilhar", "letra"),
+        ("e|---0---3---|", "tablatura"),
+        ("[Refrão]", "secao"),
+        ("   ", "vazia"),
+    ]
+    for linha, esperado in testes_linhas:
+        resultado = classificar_linha(linha)
+        status = "✅" if resultado == esperado else "❌"
+        print(f"   {status} {linha!r} = {resultado} (esperado: {esperado})")
+        assert status == "✅"
+    
+    resultado = transpositor.transpor_cifra("Amor Deus Bem", "violao", "ukulele_soprano")
+    status = "✅" if resultado == "Amor Deus Bem" else "❌"
+    print(f"   {status} Letra preservada: {resultado}")
+    assert status == "✅"
+    
+    cifra = "[Refrão]\nC   G\nAmor Deus e Bem\nvai brilhar\n"
+    analise = transpositor.analisar_cifra(cifra)
+    status = "✅" if analise["linhas"]["acordes"] == 1 and analise["linhas_ignoradas"] == 0.75 else "❌"
+    print(f"   {status} Linhas ignoradas: {analise['linhas_ignoradas']:.0%}, tokens ignorados: {analise['tokens_ignorados']:.0%}")
+    assert status == "✅"
+
+def test_vocabulario_acordes():
+    """Testa a qualidade mais longa reconhecida nas grafias brasileiras"""
+    print("\n📖 Testando vocabulário de qualidades de acordes...")
+    
+    transpositor = TranspositorMusical()
+    
+    testes_acordes = [
+        ("Bbm7b5", "Sib meio-diminuto"),
+        ("C7M", "Dó sétima maior"),
+        ("D7(9)", "Ré sétima com nona"),
+        ("Cadd9", "Dó com nona adicionada"),
+        ("A°", "Lá diminuto"),
+        ("Am7/G", "Lá menor sétima com baixo em Sol"),
+        ("(C", "Dó maior"),
+        ("F)", "Fá maior"),
+        ("Amor", None),
+    ]
+    for acorde, esperado in testes_acordes:
+        explicacao = transpositor.explicar_acorde(acorde)
+        status = "✅" if explicacao == esperado else "❌"
+        print(f"   {status} {acorde} = {explicacao} (esperado: {esperado})")
+        assert status == "✅"
+    
+    resultado = transpositor.converter_cifra_portugues("Am7 F7M amor")
+    esperado = "Lá menor sétima | Fá sétima maior | amor"
+    status = "✅" if resultado == esperado else "❌"
+    print(f"   {status} Cifra em português: {resultado}")
+    assert status == "✅"
+
+def test_transpor_e_explicar():
+    """Testa a transposição com explicação numa única passada"""
+    print("\n🔗 Testando transposição com explicação...")
+    
+    transpositor = TranspositorMusical()
+    cifra = "C G/B Am7 F7M"
+    
+    semitons = transpositor.calcular_diferenca_afinacao("violao", "trompete_sib")
+    resultado = transpositor.transpor_e_explicar(cifra, semitons)
+    esperado = transpositor.transpor_cifra(cifra, "violao", "trompete_sib")
+    status = "✅" if resultado.cifra == esperado and resultado.semitons == semitons else "❌"
+    print(f"   {status} Cifra: {resultado.cifra} ({resultado.semitons} semitons)")
+    assert status == "✅"
+    
+    status = "✅" if resultado.explicacao == transpositor.converter_cifra_portugues(esperado) else "❌"
+    print(f"   {status} Explicação: {resultado.explicacao}")
+    assert status == "✅"
+    
+    tokens = list(transpositor.fluxo_transposicao("Am  F\nAmor", 2))
+    status = "✅" if [t.transposto for t in tokens] == ["Bm", "G", "Amor"] and tokens[2].explicacao is None else "❌"
+    print(f"   {status} Fluxo por token: {[(t.transposto, t.explicacao) for t in tokens]}")
+    assert status == "✅"
+    
+    resultado = transpositor.transpor_e_explicar("(C G Am F)", 2)
+    esperado = "Ré maior | Lá maior | Si menor | Sol maior"
+    status = "✅" if resultado.cifra == "(D A Bm G)" and resultado.explicacao == esperado else "❌"
+    print(f"   {status} Intro entre parênteses: {resultado.cifra} = {resultado.explicacao}")
+    assert status == "✅"
+
+def test_melhores_tonalidades():
+    """Testa a busca da melhor tonalidade para um instrumento"""
+    print("\n🔑 Testando busca da melhor tonalidade...")
+    
+    transpositor = TranspositorMusical()
+    
+    opcoes = transpositor.melhores_tonalidades("Bb Gm Eb F Bb", "violao")
+    status = "✅" if len(opcoes) == 12 and opcoes[0].tonalidade in ("G", "C", "D") else "❌"
+    print(f"   {status} Violão: {[(o.tonalidade, o.semitons) for o in opcoes[:3]]}")
+    assert status == "✅"
+    
+    melhor = opcoes[0]
+    resultado = transpositor.transpor_cifra_compilada(
+        transpositor.compilar_cifra("Bb Gm Eb F Bb"), melhor.semitons, melhor.usar_bemois)
+    status = "✅" if resultado.split()[0] == melhor.tonalidade else "❌"
+    print(f"   {status} Cifra na tonalidade sugerida: {resultado}")
+    assert status == "✅"
+    
+    melodia = ["C6", "E6", "G6", "C7"]
+    melhor = transpositor.melhores_tonalidades(melodia, "trompete_sib", 1)[0]
+    status = "✅" if melhor.fora_da_extensao == 0 else "❌"
+    print(f"   {status} Melodia aguda no trompete: {melhor.semitons:+d} semitons ({melhor.tonalidade})")
+    assert status == "✅"
+
+def test_sessao_incremental():
+    """Testa a sessão de edição que só retransforma as linhas alteradas"""
+    print("\n✏️ Testando sessão de edição incremental...")
+    
+    from sessao_cifra import SessaoCifra
+    
+    transpositor = TranspositorMusical()
+    sessao = SessaoCifra("C   G\nAmor demais\nAm  F", 2, transpositor=transpositor)
+    status = "✅" if sessao.resultado == "D   A\nAmor demais\nBm  G" else "❌"
+    print(f"   {status} Transposição inicial: {sessao.resultado!r}")
+    assert status == "✅"
+    
+    alteracoes = sessao.editar(1, 2, "Am   Em\nnova letra")
+    status = "✅" if alteracoes == [(1, 2, ["Bm   F#m", "nova letra"])] else "❌"
+    print(f"   {status} Edição: {alteracoes}")
+    assert status == "✅"
+    
+    alteracoes = sessao.atualizar("C   G\nAm   Em\nnova letra mudou\nAm  F")
+    status = "✅" if alteracoes == [(2, 3, ["nova letra mudou"])] else "❌"
+    print(f"   {status} Texto completo: {alteracoes}")
+    assert status == "✅"
+    
+    esperado = transpositor.transpor_cifra_compilada(transpositor.compilar_cifra(sessao.texto), 2)
+    status = "✅" if sessao.resultado.split() == esperado.split() else "❌"
+    print(f"   {status} Igual à transposição completa")
+    assert status == "✅"
+
+def test_cancioneiro():
+    """Testa a transposição de um diretório de cifras com processos"""
+    print("\n📚 Testando transposição de cancioneiro...")
+    
+    import tempfile
+    from cancioneiro import transpor_cancioneiro
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        entrada = os.path.join(pasta, "cifras")
+        os.makedirs(os.path.join(entrada, "samba"))
+        with open(os.path.join(entrada, "samba", "a.txt"), "w", encoding="utf-8") as arquivo:
+            arquivo.write("C   G\nAmor demais\n")
+        with open(os.path.join(entrada, "b.txt"), "w", encoding="utf-8") as arquivo:
+            arquivo.write("Am  F\n")
+        with open(os.path.join(entrada, "ruim.txt"), "wb") as arquivo:
+            arquivo.write(b"\xff C G\n")
+        
+        saida = os.path.join(pasta, "saida")
+        resumo = transpor_cancioneiro(entrada, saida, 2, processos=2)
+        with open(os.path.join(saida, "samba", "a.txt"), encoding="utf-8") as arquivo:
+            resultado = arquivo.read()
+        
+        status = "✅" if resultado == "D   A\nAmor demais\n" else "❌"
+        print(f"   {status} Árvore espelhada: {resultado!r}")
+        assert status == "✅"
+        status = "✅" if resumo["arquivos"] == 3 and list(resumo["erros"]) == ["ruim.txt"] else "❌"
+        print(f"   {status} Erro isolado por arquivo: {list(resumo['erros'])}")
+        assert status == "✅"
+        status = "✅" if not os.path.exists(os.path.join(saida, "ruim.txt")) else "❌"
+        print(f"   {status} Sem saída parcial do arquivo com erro")
+        assert status == "✅"
+
+def test_uso_concorrente():
+    """Testa uma única instância compartilhada por várias threads"""
+    print("\n🧵 Testando uso concorrente...")
+    
+    from concurrent.futures import ThreadPoolExecutor
+    from main import CacheLimitado, InstrumentoDesconhecido, NotaInvalida
+    
+    transpositor = TranspositorMusical()
+    cifras = [f"C G/B Am{i % 7} F7M Dm7 E7(9) Bb{i}" for i in range(100)]
+    esperados = [transpositor.transpor_e_explicar(cifra, i % 12) for i, cifra in enumerate(cifras)]
+    
+    # Caches pequenos para forçar descartes enquanto as threads leem
+    originais = (TranspositorMusical._acordes_compilados, TranspositorMusical._explicacoes)
+    TranspositorMusical._acordes_compilados = CacheLimitado(16)
+    TranspositorMusical._explicacoes = CacheLimitado(16)
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            resultados = list(executor.map(
+                lambda i: transpositor.transpor_e_explicar(cifras[i % 100], i % 100 % 12), range(1000)))
+        limite_respeitado = len(TranspositorMusical._acordes_compilados) <= 16
+    finally:
+        TranspositorMusical._acordes_compilados, TranspositorMusical._explicacoes = originais
+    
+    status = "✅" if all(r == esperados[i % 100] for i, r in enumerate(resultados)) else "❌"
+    print(f"   {status} 1000 transposições em 8 threads iguais às sequenciais")
+    assert status == "✅"
+    status = "✅" if limite_respeitado else "❌"
+    print(f"   {status} Cache limitado a 16 entradas")
+    assert status == "✅"
+    
+    erros = []
+    for funcao in (lambda: transpositor.calcular_diferenca_afinacao("violao", "banjo"),
+                   lambda: transpositor.transpor_nota("H4", 1)):
+        try:
+            funcao()
+        except (InstrumentoDesconhecido, NotaInvalida) as e:
+            erros.append(type(e).__name__)
+    status = "✅" if erros == ["InstrumentoDesconhecido", "NotaInvalida"] else "❌"
+    print(f"   {status} Erros tipados: {erros}")
+    assert status == "✅"
+
+def test_arquivo_midi():
+    """Testa a transposição de arquivos MIDI byte a byte"""
+    print("\n🎹 Testando arquivos MIDI...")
+    
+    import struct
+    from arquivo_midi import transpor_buffer
+    
+    def trilha(eventos):
+        return b"MTrk" + struct.pack(">I", len(eventos)) + bytes(eventos)
+    
+    # Tempo (meta), nota com running status, sysex, bateria e nota no limite
+    eventos = [0, 0xFF, 0x51, 3, 7, 0xA1, 0x20, 0, 0x90, 60, 100, 0x60, 60, 0,
+               0, 0xF0, 2, 1, 0xF7, 0, 0x99, 36, 100, 0, 0x90, 125, 90, 0, 0xFF, 0x2F, 0]
+    original = b"MThd" + struct.pack(">IHHH", 6, 0, 1, 96) + trilha(eventos)
+    
+    dados = bytearray(original)
+    relatorio = transpor_buffer(dados, 3)
+    notas = (dados[31], dados[34], dados[43], dados[47])
+    status = "✅" if notas == (63, 63, 36, 116) else "❌"
+    print(f"   {status} Notas gravadas (bateria mantida): {notas}")
+    assert status == "✅"
+    status = "✅" if relatorio.fora_do_limite == [(0, 0, 125, 116)] else "❌"
+    print(f"   {status} Fora do limite: {relatorio.fora_do_limite}")
+    assert status == "✅"
+    
+    truncado = bytearray(original[:-2])
+    try:
+        transpor_buffer(truncado, 3)
+        status = "❌"
+    except ValueError:
+        status = "✅" if truncado == original[:-2] else "❌"
+    print(f"   {status} Arquivo corrompido fica intacto")
+    assert status == "✅"
+
+    # Dados sem status logo depois de um meta-evento (texto): o running status já acabou
+    eventos = [0, 0x90, 60, 100, 0, 0xFF, 0x01, 1, 65, 0, 60, 0, 0, 0xFF, 0x2F, 0]
+    sem_status = bytearray(b"MThd" + struct.pack(">IHHH", 6, 0, 1, 96) + trilha(eventos))
+    try:
+        transpor_buffer(sem_status, 3)
+        rejeitado = False
+    except ValueError:
+        rejeitado = True
+    print(f"   {'✅' if rejeitado else '❌'} Meta-evento cancela o running status")
+    assert rejeitado
+    
+    import argparse
+    from arquivo_midi import _semitons_por_canal
+    recusados = []
+    for valor in ("0=3", "17=3"):
+        try:
+            _semitons_por_canal(valor)
+        except argparse.ArgumentTypeError:
+            recusados.append(valor)
+    ok = recusados == ["0=3", "17=3"] and _semitons_por_canal("16=-2") == (15, -2)
+    print(f"   {'✅' if ok else '❌'} Canais fora de 1-16 são recusados: {recusados}")
+    assert ok
+
+def test_tabelas_harmonicas():
+    """Testa as tabelas de escalas e de notas dos acordes"""
+    print("\n🎼 Testando escalas e notas dos acordes...")
+    
+    from main import FORMULAS_ACORDES, TIPOS_ACORDES
+    transpositor = TranspositorMusical()
+    
+    testes_escalas = [
+        (("D", "dorico"), ('D', 'E', 'F', 'G', 'A', 'B', 'C')),
+        (("Bb", "mixolidio"), ('Bb', 'C', 'D', 'Eb', 'F', 'G', 'Ab')),
+        (("A", "menor_harmonica"), ('A', 'B', 'C', 'D', 'E', 'F', 'G#')),
+        ((1, "maior"), ('Db', 'Eb', 'F', 'Gb', 'Ab', 'Bb', 'C')),
+        (("E", "pentatonica_menor"), ('E', 'G', 'A', 'B', 'D')),
+    ]
+    for argumentos, esperado in testes_escalas:
+        escala = transpositor.escala(*argumentos)
+        status = "✅" if escala == esperado else "❌"
+        print(f"   {status} {argumentos}: {escala}")
+        assert status == "✅"
+    
+    testes_acordes = [
+        ("F7M", ('F', 'A', 'C', 'E')),
+        ("Bbm7(b5)", ('Bb', 'Db', 'Fb', 'Ab')),
+        ("Am7/G", ('G', 'A', 'C', 'E')),
+        ("D/F#", ('F#', 'A', 'D')),
+        ("C/Bb", ('Bb', 'C', 'E', 'G')),
+        ("(C", ('C', 'E', 'G')),
+        ("F)", ('F', 'A', 'C')),
+        ("Amor", None),
+    ]
+    for acorde, esperado in testes_acordes:
+        notas = transpositor.notas_acorde(acorde)
+        status = "✅" if notas == esperado else "❌"
+        print(f"   {status} {acorde}: {notas}")
+        assert status == "✅"
+    
+    formula = transpositor.formula_acorde("(Am7")
+    status = "✅" if formula == ('A', ('1', 'b3', '5', 'b7'), None) else "❌"
+    print(f"   {status} Fórmula de (Am7: {formula}")
+    assert status == "✅"
+    
+    sem_formula = set(TIPOS_ACORDES.values()) - set(FORMULAS_ACORDES)
+    status = "✅" if not sem_formula else "❌"
+    print(f"   {status} Todas as qualidades têm notas definidas {sorted(sem_formula)}")
+    assert status == "✅"
+
+def test_braco_instrumentos():
+    """Testa o índice do braço e a busca de digitações"""
+    print("\n🎸 Testando digitações no braço...")
+    
+    from braco import braco_instrumento, formatar_casas
+    transpositor = TranspositorMusical()
+    
+    violao = braco_instrumento("violao")
+    posicoes = violao.posicoes_nota("E4")
+    status = "✅" if (5, 0) in posicoes and (4, 5) in posicoes and (3, 9) in posicoes else "❌"
+    print(f"   {status} E4 no violão: {posicoes[:4]}")
+    assert status == "✅"
+    
+    testes = [
+        ("violao", "C", "x32010"),
+        ("violao", "E7", "020100"),
+        ("violao", "Am7/G", "302010"),
+        ("ukulele_soprano", "C", "0003"),
+        ("ukulele_soprano", "F", "2010"),
+    ]
+    for instrumento_id, acorde, esperado in testes:
+        formas = braco_instrumento(instrumento_id).digitacoes_acorde(acorde)
+        casas = formatar_casas(formas[0].casas) if formas else None
+        status = "✅" if casas == esperado else "❌"
+        print(f"   {status} {acorde} ({instrumento_id}): {casas}")
+        assert status == "✅"
+    
+    digitacoes = transpositor.digitacoes_cifra("C   G/B   Am\nAmor demais", "ukulele_soprano", 2)
+    status = "✅" if list(digitacoes) == ["D", "A/C#", "Bm"] and all(digitacoes.values()) else "❌"
+    print(f"   {status} Acordes distintos da cifra transposta: {list(digitacoes)}")
+    assert status == "✅"
+    
+    status = "✅" if violao.digitacoes_acorde("Amor") == () else "❌"
+    print(f"   {status} Palavra que não é acorde não tem digitação")
+    assert status == "✅"
+    
+    digitacoes = transpositor.digitacoes_cifra("Intro: (C G Am F)", "violao")
+    casas = {acorde: formatar_casas(formas[0].casas) for acorde, formas in digitacoes.items() if formas}
+    status = "✅" if casas.get("(C") == "x32010" and len(casas) == 4 else "❌"
+    print(f"   {status} Intro entre parênteses: {casas}")
+    assert status == "✅"
+    assert status == "✅"
+
+    proprio = TranspositorMusical()
+    proprio.adicionar_instrumento("viola_cebolao", "Viola Cebolão", ["E3", "B3", "E4", "G#4", "B4"])
+    braco = braco_instrumento("viola_cebolao", proprio)
+    status = "✅" if braco.transpositor is proprio else "❌"
+    print(f"   {status} Braço montado com o transpositor informado")
+    assert braco.transpositor is proprio
+
+def test_catalogo_instrumentos():
+    """Testa o catálogo de instrumentos em JSON, com apelidos e índices"""
+    print("\n🗂️  Testando catálogo de instrumentos...")
+    
+    import json
+    import tempfile
+    from main import CatalogoInvalido, _caminho_cache_catalogo
+    
+    transpositor = TranspositorMusical()
+    semitons = transpositor.calcular_diferenca_afinacao("violao", "sax_alto")
+    esperado = transpositor.calcular_diferenca_afinacao("violao", "saxofone_alto")
+    status = "✅" if semitons == esperado else "❌"
+    print(f"   {status} Apelido sax_alto = saxofone_alto ({semitons} semitons)")
+    assert status == "✅"
+    
+    metais_sib = [instr["id"] for instr in transpositor.listar_instrumentos("metais", "Bb")]
+    status = "✅" if metais_sib == ["trompete_sib", "tuba_sib"] else "❌"
+    print(f"   {status} Metais em Sib: {metais_sib}")
+    assert status == "✅"
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "banda.json")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump({"instrumentos": [
+                {"id": "cavaquinho", "nome": "Cavaquinho", "familia": "cordas",
+                 "afinacao": ["D4", "G4", "B4", "D5"], "apelidos": ["cavaco"]},
+                {"id": "sax_baritono", "nome": "Saxofone Barítono", "familia": "madeiras",
+                 "afinacao": ["Db2"], "tonalidade": "Eb"},
+            ]}, arquivo)
+        
+        proprio = TranspositorMusical(caminho)
+        info = proprio.mostrar_info_instrumento("cavaco")
+        status = "✅" if info and info["id"] == "cavaquinho" and len(proprio.instrumentos) == 2 else "❌"
+        print(f"   {status} Catálogo próprio carregado: {list(proprio.instrumentos)}")
+        assert status == "✅"
+        status = "✅" if os.path.exists(_caminho_cache_catalogo(caminho)) else "❌"
+        print(f"   {status} Versão compilada gravada em __pycache__")
+        assert status == "✅"
+        
+        proprio.adicionar_instrumento("cavaquinho", "Cavaquinho", ["D4", "G4", "B4", "E5"])
+        status = "✅" if proprio.instrumentos.resolver("cavaco") == "cavaquinho" else "❌"
+        print(f"   {status} Substituição mantém os apelidos")
+        assert status == "✅"
+        
+        invalido = os.path.join(pasta, "invalido.json")
+        with open(invalido, "w", encoding="utf-8") as arquivo:
+            json.dump({"instrumentos": [{"id": "x", "nome": "X", "afinacao": ["H2"]}]}, arquivo)
+        try:
+            len(TranspositorMusical(invalido).instrumentos)
+            status = "❌"
+        except CatalogoInvalido:
+            status = "✅"
+        print(f"   {status} Catálogo inválido é rejeitado")
+        assert status == "✅"
+
+def test_tabelas_front():
+    """Testa as tabelas exportadas para a página e a transposição feita nela"""
+    print("\n🌐 Testando tabelas da página web...")
+    
+    import json
+    import shutil
+    import subprocess
+    from exportar_tabelas import CAMINHO_FRONT, serializar, tabelas_front
+    
+    transpositor = TranspositorMusical()
+    tabelas = tabelas_front(transpositor)
+    grafias_ok = all(
+        tabelas["grafias"][classe] == list(transpositor.compilar_acorde(nota).grafias)
+        for classe, nota in enumerate(transpositor.notas)
+    )
+    status = "✅" if grafias_ok else "❌"
+    print(f"   {status} Grafias das 12 transposições iguais às de AcordeCompilado")
+    assert status == "✅"
+    
+    indice, intervalos = tabelas["indice"], tabelas["intervalos"]
+    semitons = intervalos[indice["violao"]][indice["sax_alto"]]
+    status = "✅" if semitons == transpositor.calcular_diferenca_afinacao("violao", "saxofone_alto") else "❌"
+    print(f"   {status} Matriz de intervalos com apelidos (violão → sax alto: {semitons})")
+    assert status == "✅"
+    
+    with open(CAMINHO_FRONT, encoding="utf-8") as arquivo:
+        atualizado = arquivo.read() == serializar(tabelas)
+    status = "✅" if atualizado else "❌"
+    print(f"   {status} front/tabelas.js atualizado (python exportar_tabelas.py)")
+    assert status == "✅"
+    
+    if shutil.which("node") is None:
+        print("   ⏭️  Node.js não encontrado: comparação com o JavaScript ignorada")
+        return
+    cifra = "Intro: C G/B Am7(9) | F7M (2x)\nA casa é bela Em\n(Dm) C#m7b5 Bbº/Ab D7/9 N.C."
+    pedidos = [{"cifra": cifra, "origem": origem, "destino": destino, "usar_bemois": bemois}
+               for origem, destino in (("violao", "sax_alto"), ("violao", "trompete"), ("flauta", "tuba_sib"))
+               for bemois in (False, True)]
+    frente = os.path.join(os.path.dirname(os.path.abspath(__file__)), "front")
+    script = (
+        "global.window = {};"
+        f"require({json.dumps(os.path.join(frente, 'tabelas.js'))});"
+        f"const {{ TranspositorLocal }} = require({json.dumps(os.path.join(frente, 'transposicao_local.js'))});"
+        "const local = new TranspositorLocal(window.TABELAS_TRANSPOSITOR);"
+        f"console.log(JSON.stringify({json.dumps(pedidos)}.map(p => local.transpor(p))));"
+    )
+    saida = subprocess.run(["node", "-e", script], capture_output=True, text=True, encoding="utf-8")
+    esperado = []
+    for pedido in pedidos:
+        resultado = transpositor.transpor_cifra(cifra, pedido["origem"], pedido["destino"], pedido["usar_bemois"])
+        esperado.append({
+            "resultado": resultado,
+            "semitons": transpositor.calcular_diferenca_afinacao(pedido["origem"], pedido["destino"]),
+            "explicacao": transpositor.converter_cifra_portugues(resultado),
+        })
+    status = "✅" if saida.returncode == 0 and json.loads(saida.stdout) == esperado else "❌"
+    print(f"   {status} Página transpõe e explica igual ao Python ({len(pedidos)} pedidos)")
+    assert status == "✅"
+
+def test_indice_progressoes():
+    """Testa o índice de progressões em qualquer tom, com atualização e persistência"""
+    print("\n🔎 Testando índice de progressões...")
+    
+    import tempfile
+    from indice_progressoes import IndiceProgressoes, carregar_indice
+    from main import ErroTransposicao
+    
+    with tempfile.TemporaryDirectory() as pasta:
+        cifras = {
+            "pop.txt": "Intro: C  G\nAmor que vem\nAm7  F\nC G/B Am F",
+            "rock.txt": "[Refrão]\nD  D  A/C#\nE a letra segue\nBm7 G",
+            "samba.txt": "Dm7 G7 C7M\nA7 Dm7 G7 C",
+        }
+        for nome, cifra in cifras.items():
+            with open(os.path.join(pasta, nome), "w", encoding="utf-8") as arquivo:
+                arquivo.write(cifra)
+        
+        indice = IndiceProgressoes()
+        atualizacao = indice.atualizar_diretorio(pasta)
+        status = "✅" if atualizacao.adicionadas == 3 and not atualizacao.erros else "❌"
+        print(f"   {status} {len(indice)} músicas indexadas")
+        assert status == "✅"
+        
+        ocorrencias = [(o.musica, o.posicao, o.linha, o.tonalidade) for o in indice.buscar("I–V–vi–IV")]
+        esperado = [("pop.txt", 0, 1, "C"), ("pop.txt", 4, 4, "C"), ("rock.txt", 0, 2, "D")]
+        status = "✅" if ocorrencias == esperado else "❌"
+        print(f"   {status} I–V–vi–IV em qualquer tom: {ocorrencias}")
+        assert status == "✅"
+        
+        por_acordes = [(o.musica, o.tonalidade, o.semitons) for o in indice.buscar("Em C G D")]
+        status = "✅" if por_acordes == [("pop.txt", "Am", 5)] else "❌"
+        print(f"   {status} Busca por acordes (vi IV I V): {por_acordes}")
+        assert status == "✅"
+        
+        ii_v_i = [(o.musica, o.linha, o.tonalidade) for o in indice.buscar("ii-V-I")]
+        status = "✅" if ii_v_i == [("samba.txt", 1, "C"), ("samba.txt", 2, "C")] else "❌"
+        print(f"   {status} ii-V-I (curta, pelos prefixos): {ii_v_i}")
+        assert status == "✅"
+
+        finais = IndiceProgressoes()
+        finais.adicionar("a", "D Em A7 Bm F C G")
+        finais.adicionar("b", "C G")
+        finais.adicionar("c", "F C G Am")
+        ocorrencias = [(o.musica, o.posicao) for o in finais.buscar("C G")]
+        esperado = [("a", 4), ("a", 5), ("b", 0), ("c", 0), ("c", 1)]
+        status = "✅" if ocorrencias == esperado else "❌"
+        print(f"   {status} Progressão no fim da música e música menor que o n-grama: {ocorrencias}")
+        assert ocorrencias == esperado, ocorrencias
+        ocorrencias = [(o.musica, o.posicao) for o in finais.buscar("A7 Bm F C G")]
+        status = "✅" if ocorrencias == [("a", 2)] else "❌"
+        print(f"   {status} Progressão longa terminando no último acorde: {ocorrencias}")
+        assert ocorrencias == [("a", 2)], ocorrencias
+
+        caminho = os.path.join(pasta, "cancioneiro.iprg")
+        indice.salvar(caminho)
+        os.remove(os.path.join(pasta, "rock.txt"))
+        with open(os.path.join(pasta, "samba.txt"), "w", encoding="utf-8") as arquivo:
+            arquivo.write("Bb F Gm Eb")
+        reaberto = carregar_indice(caminho)
+        atualizacao = reaberto.atualizar_diretorio(pasta)
+        resumo = (atualizacao.adicionadas, atualizacao.atualizadas, atualizacao.removidas, atualizacao.inalteradas)
+        status = "✅" if resumo == (0, 1, 1, 1) else "❌"
+        print(f"   {status} Atualização incremental (novas, atualizadas, removidas, inalteradas): {resumo}")
+        assert status == "✅"
+        
+        reaberto.salvar(caminho)
+        musicas = sorted({o.musica for o in carregar_indice(caminho).buscar("I V vi IV")})
+        status = "✅" if musicas == ["pop.txt", "samba.txt"] else "❌"
+        print(f"   {status} Índice regravado e reaberto: {musicas}")
+        assert status == "✅"
+        
+        try:
+            indice.buscar("C C")
+            status = "❌"
+        except ErroTransposicao:
+            status = "✅"
+        print(f"   {status} Progressão de um acorde só é rejeitada")
+        assert status == "✅"
+
 def test_exemplos_praticos():
     """Exemplos práticos de uso com notas em português"""
     print("\n🎵 EXEMPLOS PRÁTICOS COM NOTAS EM PORTUGUÊS:")
@@ -155,4 +1206,29 @@ if __name__ == "__main__":
     test_notas_naturais()
     test_explicacao_acordes() 
     test_transpositor()
+    test_acordes_compilados()
+    test_transposicao_em_fluxo()
+    test_partes_por_instrumento()
+    test_matriz_intervalos()
+    test_tabelas_compartilhadas()
+    test_gerador_sintetico()
+    test_perfil_desempenho()
+    test_transposicao_em_lote()
+    test_formato_binario()
+    test_cache_resultados()
+    test_servidor_http()
+    test_modo_lote_jsonl()
+    test_classificador_linhas()
+    test_vocabulario_acordes()
+    test_transpor_e_explicar()
+    test_melhores_tonalidades()
+    test_sessao_incremental()
+    test_cancioneiro()
+    test_uso_concorrente()
+    test_arquivo_midi()
+    test_tabelas_harmonicas()
+    test_braco_instrumentos()
+    test_catalogo_instrumentos()
+    test_tabelas_front()
+    test_indice_progressoes()
     test_exemplos_praticos()
\ No newline at end of file
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Transposição de arquivos MIDI (Standard MIDI File) sem dependências externas
+Só os bytes de nota são alterados; o resto do arquivo é copiado como está
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import ErroTransposicao, TranspositorMusical
+
+CANAL_BATERIA = 9  # canal 10 na numeração 1-16
+
+# Mensagens de canal cujo primeiro byte de dados é uma nota
+# (note-off, note-on e aftertouch polifônico)
+_COM_NOTA = frozenset((0x80, 0x90, 0xA0))
+# Mensagens de canal com um único byte de dados (program change e channel pressure)
+_UM_BYTE = frozenset((0xC0, 0xD0))
+
+_CABECALHO = struct.Struct(">4sIHHH")
+_BLOCO = struct.Struct(">4sI")
+
+# Resultado de uma transposição: ``fora_do_limite`` lista (trilha, canal,
+# nota original, nota gravada) das notas que passariam de 0-127 e foram
+# trazidas de volta por oitavas
+RelatorioMidi = namedtuple("RelatorioMidi", [
+    "formato", "trilhas", "divisao", "notas_transpostas", "notas_ignoradas", "fora_do_limite",
+])
+
+
+def _tabelas_canais(semitons, canais_ignorados):
+    """Monta, para cada canal, o deslocamento e a tabela nota -> nova nota
+
+    A tabela é None nos canais ignorados ou sem transposição.
+    """
+    deslocamentos = []
+    tabelas = []
+    for canal in range(16):
+        deslocamento = 0
+        if canal not in canais_ignorados:
+            deslocamento = semitons.get(canal, 0) if isinstance(semitons, dict) else semitons
+        deslocamentos.append(deslocamento)
+        tabela = []
+        for nota in range(128):
+            nova = nota + deslocamento
+            while nova > 127:
+                nova -= 12
+            while nova < 0:
+                nova += 12
+            tabela.append(nova)
+        tabelas.append(bytes(tabela) if deslocamento else None)
+    return deslocamentos, tabelas
+
+
+def transpor_buffer(dados, semitons, canais_ignorados=(CANAL_BATERIA,)):
+    """Transpõe as notas de um MIDI carregado num buffer gravável, no próprio buffer
+
+    ``dados`` pode ser um bytearray ou um mmap. ``semitons`` é um inteiro
+    ou um dicionário {canal (0-15): semitons}. Retorna um RelatorioMidi.
+    Se o arquivo estiver corrompido, as notas já alteradas são restauradas
+    antes do ValueError, então o buffer nunca fica transposto pela metade.
+    """
+    tamanho_total = len(dados)
+    if tamanho_total < _CABECALHO.size:
+        raise ValueError("Arquivo MIDI inválido: cabeçalho incompleto")
+    marca, tamanho, formato, quantidade, divisao = _CABECALHO.unpack_from(dados, 0)
+    if marca != b"MThd" or tamanho < 6:
+        raise ValueError("Arquivo MIDI inválido: cabeçalho MThd não encontrado")
+
+    deslocamentos, tabelas = _tabelas_canais(semitons, frozenset(canais_ignorados))
+    ignorados = frozenset(canal for canal in range(16) if canal in canais_ignorados)
+    transpostas = 0
+    ignoradas = 0
+    fora_do_limite = []
+    trilha = 0
+    # Posição e valor original de cada nota alterada, para desfazer em caso de erro
+    alteradas = array('Q')
+    originais = bytearray()
+
+    try:
+        pos = 8 + tamanho
+        while pos + _BLOCO.size <= tamanho_total:
+            tipo_bloco, tamanho = _BLOCO.unpack_from(dados, pos)
+            pos += _BLOCO.size
+            fim = pos + tamanho
+            if fim > tamanho_total:
+                raise ValueError(f"Arquivo MIDI inválido: trilha {trilha} termina após o fim do arquivo")
+            if tipo_bloco != b"MTrk":
+                pos = fim  # blocos desconhecidos são preservados
+                continue
+
+            status = 0
+            try:
+                while pos < fim:
+                    # Tempo delta: só precisa ser pulado
+                    while dados[pos] & 0x80:
+                        pos += 1
+                    pos += 1
+
+                    byte = dados[pos]
+                    if byte >= 0xF0:
+                        pos += 1
+                        if byte == 0xFF:
+                            pos += 1  # tipo do meta-evento
+                        elif byte not in (0xF0, 0xF7):
+                            raise ValueError(f"Arquivo MIDI inválido: status {byte:#x} na trilha {trilha}")
+                        comprimento = 0
+                        while True:
+                            byte = dados[pos]
+                            pos += 1
+                            comprimento = (comprimento << 7) | (byte & 0x7F)
+                            if byte < 0x80:
+                                break
+                        pos += comprimento
+                        status = 0  # meta-eventos e sysex cancelam o running status
+                        continue
+
+                    if byte & 0x80:
+                        status = byte
+                        pos += 1
+                    elif not status:
+                        raise ValueError(f"Arquivo MIDI inválido: running status sem status na trilha {trilha}")
+
+                    tipo = status & 0xF0
+                    if tipo in _COM_NOTA:
+                        canal = status & 0x0F
+                        tabela = tabelas[canal]
+                        if tabela is not None:
+                            nota = dados[pos]
+                            nova = tabela[nota]
+                            dados[pos] = nova
+                            alteradas.append(pos)
+                            originais.append(nota)
+                            transpostas += 1
+                            if nova != nota + deslocamentos[canal]:
+                                fora_do_limite.append((trilha, canal, nota, nova))
+                        elif canal in ignorados:
+                            ignoradas += 1
+                        pos += 2
+                    elif tipo in _UM_BYTE:
+                        pos += 1
+                    else:
+                        pos += 2
+            except IndexError:
+                raise ValueError(f"Arquivo MIDI inválido: evento incompleto na trilha {trilha}") from None
+
+            if pos != fim:
+                raise ValueError(f"Arquivo MIDI inválido: evento atravessa o fim da trilha {trilha}")
+            trilha += 1
+
+        if trilha < quantidade:
+            raise ValueError(f"Arquivo MIDI inválido: {quantidade} trilhas anunciadas, {trilha} encontradas")
+    except ValueError:
+        for pos, nota in zip(alteradas, originais):
+            dados[pos] = nota
+        raise
+    return RelatorioMidi(formato, trilha, divisao, transpostas, ignoradas, fora_do_limite)
+
+
+def transpor_midi(entrada, saida, semitons, canais_ignorados=(CANAL_BATERIA,)):
+    """Transpõe um arquivo MIDI; com ``saida`` None o arquivo é alterado no lugar
+
+    No lugar, o arquivo é mapeado em memória (mmap) e só os bytes de nota são
+    regravados. Caso contrário ele é lido uma vez num bytearray, alterado e
+    gravado em ``saida``.
+    """
+    if saida is None:
+        with open(entrada, "r+b") as arquivo:
+            with mmap.mmap(arquivo.fileno(), 0) as mapa:
+                relatorio = transpor_buffer(mapa, semitons, canais_ignorados)
+                mapa.flush()
+        return relatorio
+
+    with open(entrada, "rb") as arquivo:
+        dados = bytearray(os.fstat(arquivo.fileno()).st_size)
+        arquivo.readinto(dados)
+    relatorio = transpor_buffer(dados, semitons, canais_ignorados)
+    with open(saida, "wb") as arquivo:
+        arquivo.write(dados)
+    return relatorio
+
+
+def _semitons_por_canal(valor):
+    canal, _, semitons = valor.partition("=")
+    try:
+        canal, semitons = int(canal), int(semitons)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"use CANAL=SEMITONS (ex: 2=-3), não {valor!r}")
+    if not 1 <= canal <= 16:
+        raise argparse.ArgumentTypeError(f"canal deve ir de 1 a 16, não {canal}")
+    return canal - 1, semitons
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transpõe as notas de um arquivo MIDI")
+    parser.add_argument("entrada", help="Arquivo .mid")
+    parser.add_argument("saida", nargs="?", help="Arquivo de saída (padrão: altera a entrada no lugar)")
+    parser.add_argument("-s", "--semitons", type=int, help="Semitons para transpor")
+    parser.add_argument("--origem", help="ID do instrumento de origem")
+    parser.add_argument("--destino", help="ID do instrumento de destino")
+    parser.add_argument("-c", "--canal", type=_semitons_por_canal, action="append", default=[],
+                        metavar="CANAL=SEMITONS", help="Transposição própria de um canal (1-16)")
+    parser.add_argument("--bateria", action="store_true", help="Transpõe também o canal 10 (bateria)")
+    args = parser.parse_args(argv)
+
+    if args.semitons is not None:
+        semitons = args.semitons
+    elif args.origem and args.destino:
+        try:
+            semitons = TranspositorMusical().calcular_diferenca_afinacao(args.origem, args.destino)
+        except ErroTransposicao as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+    elif args.canal:
+        semitons = 0
+    else:
+        parser.error("informe --semitons, --origem e --destino ou --canal")
+
+    if args.canal:
+        semitons = dict.fromkeys(range(16), semitons)
+        semitons.update(args.canal)
+    ignorados = () if args.bateria else (CANAL_BATERIA,)
+
+    relatorio = transpor_midi(args.entrada, args.saida, semitons, ignorados)
+    print(f"🎹 {relatorio.trilhas} trilhas, {relatorio.notas_transpostas} notas transpostas, "
+          f"{relatorio.notas_ignoradas} da bateria mantidas")
+    for trilha, canal, nota, nova in relatorio.fora_do_limite[:20]:
+        print(f"⚠️  Trilha {trilha}, canal {canal + 1}: nota {nota} sairia de 0-127, gravada como {nova}")
+    if len(relatorio.fora_do_limite) > 20:
+        print(f"⚠️  ... e mais {len(relatorio.fora_do_limite) - 20} notas fora do limite")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
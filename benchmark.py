@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do Transpositor Musical
+Gera cifras sintéticas e mede os caminhos críticos da transposição
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import TranspositorMusical, medir_inicializacao
+
+TAMANHOS_PADRAO = (10, 100, 1000, 10000, 100000, 1000000)
+
+# Vocabulário usado na geração das cifras sintéticas
+RAIZES = ('C', 'C#', 'Db', 'D', 'D#', 'Eb', 'E', 'F', 'F#', 'Gb', 'G', 'G#', 'Ab', 'A', 'A#', 'Bb', 'B')
+QUALIDADES = ('', '', '', 'm', 'm', '7', 'm7', 'maj7', '7M', 'dim', 'aug', 'sus2', 'sus4',
+              '6', '9', 'add9', 'm7b5', '7(9)', '7(b9)', 'm6', '13')
+PALAVRAS_LETRA = ('amor', 'coração', 'Deus', 'Bem', 'Amanhã', 'vida', 'sol', 'mar', 'noite',
+                  'você', 'saudade', 'Eu', 'cantar', 'luz', 'caminho', 'Céu')
+
+# Funções medidas chamada a chamada (latência individual)
+AMOSTRA_POR_CHAMADA = 20000
+
+
+def gerar_acorde(aleatorio):
+    """Gera um símbolo de acorde aleatório (às vezes com baixo invertido)"""
+    acorde = aleatorio.choice(RAIZES) + aleatorio.choice(QUALIDADES)
+    if aleatorio.random() < 0.15:
+        acorde += '/' + aleatorio.choice(RAIZES)
+    return acorde
+
+
+def gerar_cifra_sintetica(quantidade_tokens, semente=0, proporcao_letra=0.4):
+    """Gera uma cifra com ``quantidade_tokens`` tokens misturando acordes e letra"""
+    aleatorio = random.Random(semente)
+    tokens = []
+    for _ in range(quantidade_tokens):
+        if aleatorio.random() < proporcao_letra:
+            tokens.append(aleatorio.choice(PALAVRAS_LETRA))
+        else:
+            tokens.append(gerar_acorde(aleatorio))
+    return ' '.join(tokens)
+
+
+def gerar_notas_sinteticas(quantidade, semente=0):
+    """Gera notas com oitava (ex: C4, Bb5) para os testes de transposição de notas"""
+    aleatorio = random.Random(semente)
+    return [f"{aleatorio.choice(RAIZES)}{aleatorio.randint(1, 6)}" for _ in range(quantidade)]
+
+
+def _percentis(amostras):
+    """Calcula p50/p90/p99/máximo de uma lista de durações em segundos"""
+    ordenadas = sorted(amostras)
+    ultimo = len(ordenadas) - 1
+
+    def percentil(p):
+        return ordenadas[min(ultimo, int(round(p / 100 * ultimo)))]
+
+    return {
+        "p50_us": percentil(50) * 1e6,
+        "p90_us": percentil(90) * 1e6,
+        "p99_us": percentil(99) * 1e6,
+        "max_us": ordenadas[-1] * 1e6,
+    }
+
+
+def _pico_memoria(funcao):
+    """Executa a função uma vez medindo o pico de memória alocada"""
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico
+
+
+def medir_em_lote(nome, funcao, tokens, repeticoes):
+    """Mede uma função que processa a cifra inteira de uma vez"""
+    duracoes = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        duracoes.append(time.perf_counter() - inicio)
+
+    mediana = sorted(duracoes)[len(duracoes) // 2]
+    return {
+        "funcao": nome,
+        "tokens": tokens,
+        "repeticoes": repeticoes,
+        "tokens_por_segundo": tokens / mediana if mediana else None,
+        "latencia": _percentis(duracoes),
+        "pico_memoria_bytes": _pico_memoria(funcao),
+    }
+
+
+def medir_por_chamada(nome, funcao, argumentos):
+    """Mede uma função chamada uma vez por token, registrando cada latência"""
+    relogio = time.perf_counter
+    duracoes = []
+    for argumento in argumentos:
+        inicio = relogio()
+        funcao(argumento)
+        duracoes.append(relogio() - inicio)
+
+    total = sum(duracoes)
+    return {
+        "funcao": nome,
+        "tokens": len(argumentos),
+        "repeticoes": 1,
+        "tokens_por_segundo": len(argumentos) / total if total else None,
+        "latencia": _percentis(duracoes),
+        "pico_memoria_bytes": _pico_memoria(lambda: [funcao(a) for a in argumentos]),
+    }
+
+
+def executar_benchmarks(tamanhos=TAMANHOS_PADRAO, semente=0, origem="violao", destino="saxofone_alto"):
+    """Executa todos os benchmarks e retorna o relatório como dicionário"""
+    transpositor = TranspositorMusical()
+    resultados = []
+
+    for tamanho in tamanhos:
+        cifra = gerar_cifra_sintetica(tamanho, semente)
+        palavras = cifra.split()
+        amostra = palavras[:AMOSTRA_POR_CHAMADA]
+        notas = gerar_notas_sinteticas(len(amostra), semente)
+        repeticoes = max(3, min(50, 1000000 // tamanho))
+
+        print(f"📏 {tamanho} tokens...", file=sys.stderr)
+        medidas = [
+            medir_em_lote("transpor_cifra",
+                          lambda: transpositor.transpor_cifra(cifra, origem, destino),
+                          tamanho, repeticoes),
+            medir_em_lote("converter_cifra_portugues",
+                          lambda: transpositor.converter_cifra_portugues(cifra),
+                          tamanho, repeticoes),
+            medir_por_chamada("transpor_acorde",
+                              lambda acorde: transpositor.transpor_acorde(acorde, 3),
+                              amostra),
+            medir_por_chamada("explicar_acorde", transpositor.explicar_acorde, amostra),
+            medir_por_chamada("transpor_nota",
+                              lambda nota: transpositor.transpor_nota(nota, 3),
+                              notas),
+        ]
+        for medida in medidas:
+            medida["tamanho_cifra"] = tamanho
+            resultados.append(medida)
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semente": semente,
+        "inicializacao": medir_inicializacao(10000),
+        "resultados": resultados,
+    }
+
+
+def comparar(relatorio, referencia, tolerancia=0.10):
+    """Lista as medidas cuja vazão caiu mais que ``tolerancia`` em relação à referência"""
+    base = {
+        (r["funcao"], r["tamanho_cifra"]): r["tokens_por_segundo"]
+        for r in referencia["resultados"]
+    }
+    regressoes = []
+    for resultado in relatorio["resultados"]:
+        anterior = base.get((resultado["funcao"], resultado["tamanho_cifra"]))
+        atual = resultado["tokens_por_segundo"]
+        if anterior and atual and atual < anterior * (1 - tolerancia):
+            regressoes.append({
+                "funcao": resultado["funcao"],
+                "tamanho_cifra": resultado["tamanho_cifra"],
+                "antes": anterior,
+                "depois": atual,
+                "variacao": atual / anterior - 1,
+            })
+    return regressoes
+
+
+def imprimir_relatorio(relatorio):
+    """Mostra um resumo legível do relatório"""
+    inicializacao = relatorio["inicializacao"]
+    print(f"⏱️  Importação: {inicializacao['importacao_ms']:.3f} ms | "
+          f"Instância: {inicializacao['instancia_us']:.3f} µs")
+    print(f"{'função':<28}{'tokens':>10}{'tokens/s':>14}{'p50 µs':>12}{'p99 µs':>12}{'pico KiB':>12}")
+    for r in relatorio["resultados"]:
+        print(f"{r['funcao']:<28}{r['tokens']:>10}{r['tokens_por_segundo'] or 0:>14.0f}"
+              f"{r['latencia']['p50_us']:>12.2f}{r['latencia']['p99_us']:>12.2f}"
+              f"{r['pico_memoria_bytes'] / 1024:>12.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Transpositor Musical")
+    parser.add_argument("-t", "--tamanhos", default=",".join(map(str, TAMANHOS_PADRAO)),
+                        help="Quantidades de tokens separadas por vírgula")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador sintético")
+    parser.add_argument("-o", "--saida", help="Arquivo JSON onde gravar os resultados")
+    parser.add_argument("-c", "--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Queda de vazão tolerada antes de acusar regressão (padrão: 0.10)")
+    args = parser.parse_args(argv)
+
+    tamanhos = [int(t) for t in args.tamanhos.split(",")]
+    relatorio = executar_benchmarks(tamanhos, args.semente)
+    imprimir_relatorio(relatorio)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as arquivo:
+            referencia = json.load(arquivo)
+        regressoes = comparar(relatorio, referencia, args.tolerancia)
+        for r in regressoes:
+            print(f"❌ Regressão em {r['funcao']} ({r['tamanho_cifra']} tokens): {r['variacao']:+.1%}")
+        if regressoes:
+            return 1
+        print("✅ Nenhuma regressão encontrada")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
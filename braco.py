@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Braço dos instrumentos de cordas: onde cada nota fica e como tocar cada acorde
+Índice nota -> (corda, casa) por afinação e busca de digitações com poda
+"""
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+from types import MappingProxyType
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import (
+    CacheLimitado, ErroTransposicao, INDICE_NOTAS, INTERVALOS, InstrumentoDesconhecido,
+    TranspositorMusical, grafar_graus,
+)
+
+CASAS = 15            # casas consideradas em cada corda (0 = corda solta)
+ABERTURA_MAXIMA = 4   # casas alcançadas sem mudar a mão de posição
+DEDOS = 4             # dedos para pressionar as cordas (a pestana conta como um)
+
+# Ordem de importância dos graus: quando o acorde tem mais notas do que o
+# instrumento tem cordas, ficam de fora os últimos (a quinta primeiro)
+PRIORIDADE_GRAUS = (
+    '1', '3', 'b3', '4', '2', 'b5', '#5', '7', 'b7', 'bb7', '6',
+    '13', 'b13', '#11', '11', '9', 'b9', '#9', '5',
+)
+
+# Peso de cada critério no custo de uma digitação (menor custo = melhor)
+PESOS_DIGITACAO = MappingProxyType({
+    "posicao": 0.5,     # casa mais baixa pressionada (perto da pestana é mais fácil)
+    "abertura": 1.0,    # distância entre a casa mais baixa e a mais alta pressionadas
+    "dedos": 0.5,       # dedos necessários
+    "abafadas": 0.75,   # cordas graves não tocadas
+    "omitidas": 1.0,    # notas opcionais do acorde que ficaram de fora
+})
+
+Posicao = namedtuple("Posicao", ["corda", "casa"])
+
+# Uma forma de tocar o acorde: ``casas`` e ``notas`` têm um item por corda, na
+# ordem da afinação do catálogo (None = corda abafada)
+Digitacao = namedtuple("Digitacao", ["casas", "notas", "custo"])
+
+
+class BracoInstrumento:
+    """Braço de um instrumento de cordas com uma afinação
+
+    O índice nota -> posições e as casas de cada classe de altura por corda
+    são montados uma vez; as digitações já buscadas ficam em cache por acorde.
+    Use braco_afinacao para compartilhar o braço de cada afinação.
+    """
+
+    def __init__(self, afinacao, casas=CASAS, transpositor=None):
+        self.transpositor = transpositor or TranspositorMusical()
+        self.afinacao = tuple(afinacao)
+        self.casas = casas
+        self.soltas = tuple(self.transpositor.nota_para_numero(nota) for nota in self.afinacao)
+        # Afinações como a do ukulele (G4 C4 E4 A4) não vão da corda mais grave à mais aguda
+        self.reentrante = list(self.soltas) != sorted(self.soltas)
+
+        posicoes = {}
+        for corda, solta in enumerate(self.soltas):
+            for casa in range(casas + 1):
+                posicoes.setdefault(solta + casa, []).append(Posicao(corda, casa))
+        self.posicoes = MappingProxyType({numero: tuple(lista) for numero, lista in posicoes.items()})
+
+        # casas_por_classe[corda][classe] -> casas da corda com essa classe de altura
+        self.casas_por_classe = tuple(
+            tuple(tuple(range((classe - solta) % 12, casas + 1, 12)) for classe in range(12))
+            for solta in self.soltas
+        )
+        self._digitacoes = CacheLimitado()
+
+    def posicoes_nota(self, nota):
+        """Posições (corda, casa) de uma nota com oitava ('E4') ou de uma classe ('E')"""
+        classe = INDICE_NOTAS.get(nota)
+        if classe is None:
+            return self.posicoes.get(self.transpositor.nota_para_numero(nota), ())
+        return tuple(sorted(
+            (Posicao(corda, casa) for corda, por_classe in enumerate(self.casas_por_classe)
+             for casa in por_classe[classe]),
+            key=lambda posicao: (posicao.casa, posicao.corda),
+        ))
+
+    def digitacoes_acorde(self, acorde, limite=3, abertura=ABERTURA_MAXIMA):
+        """Até ``limite`` digitações do acorde, da mais fácil para a mais difícil
+
+        Retorna uma tupla vazia se o símbolo não for um acorde ou se não houver
+        forma tocável dentro da ``abertura``.
+        """
+        chave = (acorde, limite, abertura)
+        digitacoes = self._digitacoes.get(chave)
+        if digitacoes is None:
+            digitacoes = self._digitacoes.guardar(chave, self._buscar(acorde, limite, abertura))
+        return digitacoes
+
+    def _buscar(self, acorde, limite, abertura):
+        try:
+            formula = self.transpositor.formula_acorde(acorde)
+        except ErroTransposicao:
+            formula = None  # símbolo sem fundamental utilizável: fica sem digitação
+        if formula is None:
+            return ()
+        raiz, graus, baixo = formula
+
+        # Classes de altura do acorde e a grafia de cada uma
+        fundamental = INDICE_NOTAS[raiz]
+        grafias = {}
+        for grau, nome in zip(graus, grafar_graus(raiz, graus)):
+            grafias[(fundamental + INTERVALOS[grau][1]) % 12] = nome
+        essenciais = sorted(set(graus), key=PRIORIDADE_GRAUS.index)[:len(self.soltas)]
+        if len(graus) > 3 and '5' in essenciais:
+            essenciais.remove('5')
+        obrigatorias = {(fundamental + INTERVALOS[grau][1]) % 12 for grau in essenciais}
+        classe_baixo = fundamental
+        if baixo is not None:
+            classe_baixo = INDICE_NOTAS[baixo]
+            grafias[classe_baixo] = baixo
+            obrigatorias.add(classe_baixo)
+
+        encontradas = []
+        self._percorrer(tuple(grafias), frozenset(obrigatorias), classe_baixo, abertura, encontradas)
+        encontradas.sort()
+        return tuple(
+            Digitacao(casas, tuple(None if casa is None else grafias[(solta + casa) % 12]
+                                   for solta, casa in zip(self.soltas, casas)), custo)
+            for custo, _, casas in encontradas[:limite]
+        )
+
+    def _percorrer(self, classes, obrigatorias, classe_baixo, abertura, encontradas):
+        """Busca em profundidade, corda a corda, podando pela abertura da mão
+
+        Cordas só podem ser abafadas do lado grave, antes da primeira tocada, e
+        a primeira tocada tem de dar o baixo; nas afinações reentrantes todas
+        as cordas soam e o baixo não é exigido.
+        """
+        cordas = len(self.soltas)
+        casas_por_classe = self.casas_por_classe
+        escolha = [None] * cordas
+        pesos = PESOS_DIGITACAO
+
+        def avaliar(presentes):
+            pressionadas = [casa for casa in escolha if casa]
+            dedos = len(pressionadas)
+            menor = maior = 0
+            if pressionadas:
+                menor = min(pressionadas)
+                maior = max(pressionadas)
+                na_pestana = pressionadas.count(menor)
+                if dedos > DEDOS and na_pestana > 1:
+                    dedos -= na_pestana - 1
+                if dedos > DEDOS:
+                    return
+            if not self.reentrante:
+                soando = min(solta + casa for solta, casa in zip(self.soltas, escolha) if casa is not None)
+                if soando % 12 != classe_baixo:
+                    return
+            custo = (pesos["posicao"] * menor + pesos["abertura"] * (maior - menor)
+                     + pesos["dedos"] * dedos + pesos["abafadas"] * escolha.count(None)
+                     + pesos["omitidas"] * (len(classes) - len(presentes)))
+            encontradas.append((round(custo, 4), len(encontradas), tuple(escolha)))
+
+        def buscar(corda, menor, maior, presentes):
+            if len(obrigatorias - presentes) > cordas - corda:
+                return
+            if corda == cordas:
+                avaliar(presentes)
+                return
+            tocando = corda and escolha[corda - 1] is not None
+            if not tocando and not self.reentrante:
+                escolha[corda] = None
+                buscar(corda + 1, menor, maior, presentes)
+            candidatas = classes if tocando or self.reentrante else (classe_baixo,)
+            for classe in candidatas:
+                for casa in casas_por_classe[corda][classe]:
+                    novo_menor, novo_maior = menor, maior
+                    if casa:
+                        novo_menor = min(menor, casa)
+                        novo_maior = max(maior, casa)
+                        if novo_maior - novo_menor >= abertura:
+                            continue
+                    escolha[corda] = casa
+                    buscar(corda + 1, novo_menor, novo_maior, presentes | {classe})
+            escolha[corda] = None
+
+        buscar(0, self.casas + 1, -1, frozenset())
+
+
+def formatar_casas(casas):
+    """Casas em notação compacta: 'x32010' (com '-' entre elas a partir da casa 10)"""
+    simbolos = ['x' if casa is None else str(casa) for casa in casas]
+    separador = '-' if any(casa is not None and casa > 9 for casa in casas) else ''
+    return separador.join(simbolos)
+
+
+def desenhar(digitacao, linhas=ABERTURA_MAXIMA):
+    """Diagrama em texto: cordas na vertical (a primeira da afinação à esquerda)"""
+    casas = digitacao.casas
+    pressionadas = [casa for casa in casas if casa]
+    inicio = min(pressionadas) if pressionadas and max(pressionadas) > linhas else 1
+    desenho = [' '.join('x' if casa is None else 'o' if casa == 0 else ' ' for casa in casas)]
+    for casa in range(inicio, inicio + linhas):
+        linha = ' '.join('●' if atual == casa else '|' for atual in casas)
+        desenho.append(f"{linha}  {casa}ª" if casa == inicio and inicio > 1 else linha)
+    return '\n'.join(desenho)
+
+
+# Braços já montados, por (afinação, casas)
+_bracos = {}
+
+
+def braco_afinacao(afinacao, casas=CASAS, transpositor=None):
+    """Braço compartilhado de uma afinação (montado na primeira consulta, com ``transpositor``)"""
+    chave = (tuple(afinacao), casas)
+    braco = _bracos.get(chave)
+    if braco is None:
+        braco = _bracos.setdefault(chave, BracoInstrumento(afinacao, casas, transpositor))
+    return braco
+
+
+def braco_instrumento(instrumento_id, transpositor=None):
+    """Braço do instrumento de cordas do catálogo"""
+    transpositor = transpositor or TranspositorMusical()
+    instrumento = transpositor.instrumentos.get(instrumento_id)
+    if instrumento is None:
+        raise InstrumentoDesconhecido(instrumento_id)
+    if len(instrumento["afinacao"]) < 2:
+        raise ErroTransposicao(f"{instrumento['nome']} não é um instrumento de cordas")
+    return braco_afinacao(instrumento["afinacao"], transpositor=transpositor)
+
+
+def digitacoes_cifra(cifra, instrumento_id, semitons=0, usar_bemois=False, limite=1, transpositor=None):
+    """Digitações de cada acorde distinto da cifra transposta: {acorde: (Digitacao, ...)}"""
+    transpositor = transpositor or TranspositorMusical()
+    braco = braco_instrumento(instrumento_id, transpositor)
+    digitacoes = {}
+    for token in transpositor.compilar_cifra(cifra):
+        if token.e_acorde:
+            acorde = token.transpor(semitons, usar_bemois)
+            if acorde not in digitacoes:
+                digitacoes[acorde] = braco.digitacoes_acorde(acorde, limite)
+    return digitacoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mostra como tocar os acordes de uma cifra num instrumento de cordas")
+    parser.add_argument("entrada", help="Arquivo de cifra ('-' para stdin)")
+    parser.add_argument("-i", "--instrumento", default="violao", help="ID do instrumento (padrão: violao)")
+    parser.add_argument("-s", "--semitons", type=int, default=0, help="Semitons para transpor antes")
+    parser.add_argument("-b", "--bemois", action="store_true", help="Usar bemóis")
+    parser.add_argument("-n", "--quantidade", type=int, default=1, help="Digitações por acorde (padrão: 1)")
+    parser.add_argument("-d", "--diagramas", action="store_true", help="Desenha os diagramas")
+    args = parser.parse_args(argv)
+
+    if args.entrada == "-":
+        cifra = sys.stdin.read()
+    else:
+        with open(args.entrada, 'r', encoding='utf-8') as arquivo:
+            cifra = arquivo.read()
+
+    try:
+        digitacoes = digitacoes_cifra(cifra, args.instrumento, args.semitons, args.bemois, args.quantidade)
+    except ErroTransposicao as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    for acorde, formas in digitacoes.items():
+        if not formas:
+            print(f"{acorde:<10} sem digitação encontrada")
+            continue
+        print(f"{acorde:<10} {'  '.join(formatar_casas(forma.casas) for forma in formas)}")
+        if args.diagramas:
+            for forma in formas:
+                print(desenhar(forma))
+                print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
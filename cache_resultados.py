@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Cache persistente de resultados do Transpositor Musical
+Memória (LRU) + disco (SQLite), chaveado pelo conteúdo da cifra
+"""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import TranspositorMusical
+
+CAPACIDADE_MEMORIA_PADRAO = 4096
+LIMITE_DISCO_PADRAO = 64 * 1024 * 1024  # bytes de resultados guardados em disco
+
+
+class CacheResultados:
+    """Cache em dois níveis para transpor_cifra e converter_cifra_portugues
+
+    A chave combina o hash da cifra, a operação, os instrumentos, ``usar_bemois``
+    e a assinatura do catálogo/tabelas (``assinatura_catalogo``). Quando o
+    catálogo ou as tabelas mudam, a assinatura muda: as entradas antigas deixam
+    de ser encontradas e são descartadas do disco na próxima abertura ou
+    assim que a mudança é percebida.
+    """
+
+    def __init__(self, transpositor=None, caminho=None,
+                 capacidade_memoria=CAPACIDADE_MEMORIA_PADRAO, limite_disco=LIMITE_DISCO_PADRAO):
+        self.transpositor = transpositor or TranspositorMusical()
+        self.capacidade_memoria = capacidade_memoria
+        self.limite_disco = limite_disco
+
+        self._memoria = OrderedDict()
+        self._trava = threading.Lock()
+        self._assinatura = None
+        self._acesso = 0
+
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+        self._banco = None
+        self._bytes_disco = 0
+        if caminho is not None:
+            self._banco = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+            self._banco.execute("PRAGMA journal_mode=WAL")
+            self._banco.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " chave TEXT PRIMARY KEY, assinatura TEXT NOT NULL, valor TEXT NOT NULL,"
+                " tamanho INTEGER NOT NULL, acesso INTEGER NOT NULL)")
+            self._banco.execute("CREATE INDEX IF NOT EXISTS resultados_acesso ON resultados (acesso)")
+            self._verificar_assinatura()
+
+    def fechar(self):
+        """Fecha o arquivo do cache em disco"""
+        if self._banco is not None:
+            self._banco.close()
+            self._banco = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def _verificar_assinatura(self):
+        """Descarta tudo que foi calculado com outro catálogo ou outras tabelas"""
+        assinatura = self.transpositor.assinatura_catalogo()
+        if assinatura == self._assinatura:
+            return assinatura
+
+        with self._trava:
+            self._memoria.clear()
+            self._assinatura = assinatura
+            if self._banco is not None:
+                self._banco.execute("DELETE FROM resultados WHERE assinatura != ?", (assinatura,))
+                tamanho, acesso = self._banco.execute(
+                    "SELECT COALESCE(SUM(tamanho), 0), COALESCE(MAX(acesso), 0) FROM resultados").fetchone()
+                self._bytes_disco = tamanho
+                self._acesso = acesso
+        return assinatura
+
+    def _chave(self, operacao, cifra, *parametros):
+        assinatura = self._verificar_assinatura()
+        resumo = hashlib.blake2b(cifra.encode("utf-8"), digest_size=16).hexdigest()
+        return "|".join((assinatura, operacao, resumo) + tuple(str(p) for p in parametros))
+
+    def _obter(self, chave):
+        with self._trava:
+            valor = self._memoria.get(chave)
+            if valor is not None:
+                self._memoria.move_to_end(chave)
+                self.acertos_memoria += 1
+                return valor
+
+            if self._banco is not None:
+                linha = self._banco.execute(
+                    "SELECT valor FROM resultados WHERE chave = ?", (chave,)).fetchone()
+                if linha is not None:
+                    self._acesso += 1
+                    self._banco.execute(
+                        "UPDATE resultados SET acesso = ? WHERE chave = ?", (self._acesso, chave))
+                    self.acertos_disco += 1
+                    self._guardar_memoria(chave, linha[0])
+                    return linha[0]
+
+            self.falhas += 1
+            return None
+
+    def _guardar_memoria(self, chave, valor):
+        self._memoria[chave] = valor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.capacidade_memoria:
+            self._memoria.popitem(last=False)
+            self.remocoes += 1
+
+    def _guardar(self, chave, valor):
+        with self._trava:
+            self._guardar_memoria(chave, valor)
+            if self._banco is None:
+                return
+
+            tamanho = len(valor.encode("utf-8"))
+            if tamanho > self.limite_disco:
+                return
+            self._acesso += 1
+            anterior = self._banco.execute(
+                "SELECT tamanho FROM resultados WHERE chave = ?", (chave,)).fetchone()
+            self._banco.execute(
+                "INSERT OR REPLACE INTO resultados (chave, assinatura, valor, tamanho, acesso)"
+                " VALUES (?, ?, ?, ?, ?)", (chave, self._assinatura, valor, tamanho, self._acesso))
+            self._bytes_disco += tamanho - (anterior[0] if anterior else 0)
+
+            # Remove as entradas acessadas há mais tempo até caber no limite
+            while self._bytes_disco > self.limite_disco:
+                antigas = self._banco.execute(
+                    "SELECT chave, tamanho FROM resultados ORDER BY acesso LIMIT 64").fetchall()
+                if not antigas:
+                    break
+                for chave_antiga, tamanho_antigo in antigas:
+                    if self._bytes_disco <= self.limite_disco:
+                        break
+                    self._banco.execute("DELETE FROM resultados WHERE chave = ?", (chave_antiga,))
+                    self._bytes_disco -= tamanho_antigo
+                    self.remocoes += 1
+
+    def transpor_cifra(self, cifra, instrumento_origem_id, instrumento_destino_id, usar_bemois=False):
+        """Mesmo resultado de TranspositorMusical.transpor_cifra, consultando o cache antes"""
+        chave = self._chave("transpor_cifra", cifra, instrumento_origem_id, instrumento_destino_id,
+                            int(bool(usar_bemois)))
+        resultado = self._obter(chave)
+        if resultado is None:
+            resultado = self.transpositor.transpor_cifra(
+                cifra, instrumento_origem_id, instrumento_destino_id, usar_bemois)
+            self._guardar(chave, resultado)
+        return resultado
+
+    def converter_cifra_portugues(self, cifra):
+        """Mesmo resultado de TranspositorMusical.converter_cifra_portugues, com cache"""
+        chave = self._chave("converter_cifra_portugues", cifra)
+        resultado = self._obter(chave)
+        if resultado is None:
+            resultado = self.transpositor.converter_cifra_portugues(cifra)
+            self._guardar(chave, resultado)
+        return resultado
+
+    def limpar(self):
+        """Esvazia os dois níveis do cache"""
+        with self._trava:
+            self._memoria.clear()
+            if self._banco is not None:
+                self._banco.execute("DELETE FROM resultados")
+                self._bytes_disco = 0
+
+    def estatisticas(self):
+        """Retorna contadores de acertos, falhas e ocupação"""
+        consultas = self.acertos_memoria + self.acertos_disco + self.falhas
+        acertos = self.acertos_memoria + self.acertos_disco
+        return {
+            "acertos_memoria": self.acertos_memoria,
+            "acertos_disco": self.acertos_disco,
+            "falhas": self.falhas,
+            "taxa_acertos": acertos / consultas if consultas else 0.0,
+            "entradas_memoria": len(self._memoria),
+            "bytes_disco": self._bytes_disco,
+            "remocoes": self.remocoes,
+            "assinatura": self._assinatura,
+        }
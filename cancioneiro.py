@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Transposição de cancioneiros inteiros (diretórios de cifras .txt)
+Distribui os arquivos entre processos e grava uma árvore espelhada de saída
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import ErroTransposicao, TranspositorMusical
+
+EXTENSOES_PADRAO = (".txt",)
+
+# Arquivos pequenos são agrupados até somar cerca de TAMANHO_GRUPO bytes (ou
+# ARQUIVOS_POR_GRUPO arquivos) para diluir o custo de cada envio ao processo
+TAMANHO_GRUPO = 256 * 1024
+ARQUIVOS_POR_GRUPO = 64
+
+_trabalho = None  # (transpositor, semitons, usar_bemois) de cada processo trabalhador
+
+
+def listar_cifras(diretorio, extensoes=EXTENSOES_PADRAO):
+    """Gera (caminho relativo, tamanho em bytes) das cifras do diretório, em ordem"""
+    for raiz, subdiretorios, arquivos in os.walk(diretorio):
+        subdiretorios.sort()
+        for nome in sorted(arquivos):
+            if nome.endswith(extensoes):
+                completo = os.path.join(raiz, nome)
+                yield os.path.relpath(completo, diretorio), os.path.getsize(completo)
+
+
+def agrupar(cifras, tamanho_grupo=TAMANHO_GRUPO, arquivos_por_grupo=ARQUIVOS_POR_GRUPO):
+    """Agrupa (caminho, tamanho) em listas de caminhos de tamanho parecido"""
+    grupo = []
+    acumulado = 0
+    for caminho, tamanho in cifras:
+        grupo.append(caminho)
+        acumulado += tamanho
+        if acumulado >= tamanho_grupo or len(grupo) >= arquivos_por_grupo:
+            yield grupo
+            grupo = []
+            acumulado = 0
+    if grupo:
+        yield grupo
+
+
+def _iniciar_trabalhador(semitons, usar_bemois):
+    global _trabalho
+    _trabalho = (TranspositorMusical(), semitons, usar_bemois)
+
+
+def _transpor_grupo(argumentos):
+    """Transpõe um grupo de arquivos; erros ficam registrados por arquivo"""
+    entrada_dir, saida_dir, caminhos = argumentos
+    transpositor, semitons, usar_bemois = _trabalho
+    resultados = []
+    for caminho in caminhos:
+        entrada = os.path.join(entrada_dir, caminho)
+        saida = os.path.join(saida_dir, caminho)
+        temporario = saida + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(saida), exist_ok=True)
+            linhas = transpositor.transpor_arquivo(entrada, temporario, semitons, usar_bemois)
+            os.replace(temporario, saida)
+            resultados.append((caminho, os.path.getsize(entrada), linhas, None))
+        except (OSError, UnicodeError, ValueError) as e:
+            # Não deixa saída parcial para trás
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            resultados.append((caminho, 0, 0, f"{type(e).__name__}: {e}"))
+    return resultados
+
+
+def transpor_cancioneiro(entrada, saida, semitons, usar_bemois=False, processos=None,
+                         extensoes=EXTENSOES_PADRAO, progresso=None):
+    """Transpõe todas as cifras de ``entrada`` gravando a mesma árvore em ``saida``
+
+    ``processos`` é o número de processos trabalhadores (padrão: um por
+    núcleo; 1 processa no próprio processo). ``progresso(feitos, total)`` é
+    chamado a cada grupo concluído. Retorna um resumo com contagens, erros
+    por arquivo e vazão.
+    """
+    inicio = time.perf_counter()
+    cifras = list(listar_cifras(entrada, extensoes))
+    grupos = [(entrada, saida, grupo) for grupo in agrupar(cifras)]
+    processos = processos or os.cpu_count() or 1
+
+    resumo = {"arquivos": 0, "linhas": 0, "bytes": 0, "erros": {}}
+
+    def registrar(resultados):
+        for caminho, tamanho, linhas, erro in resultados:
+            resumo["arquivos"] += 1
+            if erro is None:
+                resumo["bytes"] += tamanho
+                resumo["linhas"] += linhas
+            else:
+                resumo["erros"][caminho] = erro
+        if progresso is not None:
+            progresso(resumo["arquivos"], len(cifras))
+
+    if processos > 1 and len(grupos) > 1:
+        with multiprocessing.Pool(processos, _iniciar_trabalhador, (semitons, usar_bemois)) as pool:
+            for resultados in pool.imap_unordered(_transpor_grupo, grupos):
+                registrar(resultados)
+    else:
+        _iniciar_trabalhador(semitons, usar_bemois)
+        for grupo in grupos:
+            registrar(_transpor_grupo(grupo))
+
+    duracao = time.perf_counter() - inicio
+    resumo["processos"] = processos
+    resumo["duracao_s"] = duracao
+    resumo["arquivos_por_segundo"] = resumo["arquivos"] / duracao if duracao else 0.0
+    resumo["mb_por_segundo"] = resumo["bytes"] / duracao / 1e6 if duracao else 0.0
+    return resumo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transpõe um cancioneiro (diretório de cifras)")
+    parser.add_argument("entrada", help="Diretório com as cifras")
+    parser.add_argument("saida", help="Diretório onde gravar as cifras transpostas")
+    parser.add_argument("-s", "--semitons", type=int, help="Semitons para transpor")
+    parser.add_argument("--origem", help="ID do instrumento de origem")
+    parser.add_argument("--destino", help="ID do instrumento de destino")
+    parser.add_argument("-b", "--bemois", action="store_true", help="Usar bemóis")
+    parser.add_argument("-j", "--processos", type=int, help="Processos trabalhadores (padrão: núcleos)")
+    args = parser.parse_args(argv)
+
+    if args.semitons is not None:
+        semitons = args.semitons
+    elif args.origem and args.destino:
+        try:
+            semitons = TranspositorMusical().calcular_diferenca_afinacao(args.origem, args.destino)
+        except ErroTransposicao as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+    else:
+        parser.error("informe --semitons ou --origem e --destino")
+
+    def progresso(feitos, total):
+        print(f"\r📚 {feitos}/{total} cifras", end="", file=sys.stderr, flush=True)
+
+    resumo = transpor_cancioneiro(args.entrada, args.saida, semitons, args.bemois,
+                                  args.processos, progresso=progresso)
+    print(file=sys.stderr)
+    print(f"✅ {resumo['arquivos'] - len(resumo['erros'])} cifras em {resumo['duracao_s']:.2f} s "
+          f"({resumo['arquivos_por_segundo']:.0f} cifras/s, {resumo['mb_por_segundo']:.1f} MB/s, "
+          f"{resumo['processos']} processos)")
+    for caminho, erro in sorted(resumo["erros"].items()):
+        print(f"❌ {caminho}: {erro}")
+    return 1 if resumo["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Formato binário compacto para coleções de cifras
+Guarda as cifras já analisadas e as abre por mapeamento de memória (mmap)
+
+Estrutura do arquivo (little-endian):
+
+    cabeçalho   MAGICO, versão, nº de músicas, nº de tokens, nº de textos
+    músicas     (nome, primeiro token, nº de tokens, espaço final) por música
+    tokens      (raiz, baixo, qualidade, texto, espaço anterior) por token
+    textos      deslocamentos (nº de textos + 1) seguidos dos bytes UTF-8
+
+Acordes simples (raiz + qualidade + baixo opcional) são guardados só com
+classes de altura e o id da qualidade, então transpor não exige análise de
+texto. Os demais tokens ficam na tabela de textos: os de linhas de acordes
+(acordes com prefixo, marcações) passam pelo cache de acordes compilados na
+leitura, e as palavras de linhas de letra, seção ou tablatura são gravadas
+como literais (baixo = LITERAL) e nunca são transpostas, como no texto.
+"""
+
+import argparse
+import mmap
+import os
+import re
+import struct
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import NOTAS_BEMOIS, NOTAS_SUSTENIDOS, TranspositorMusical
+
+MAGICO = b"CIFB"
+VERSAO = 2
+EXTENSAO = ".cifb"
+
+_CABECALHO = struct.Struct("<4sHHIII")   # mágico, versão, reservado, músicas, tokens, textos
+_MUSICA = struct.Struct("<IIII")         # nome, primeiro token, nº de tokens, espaço final
+_TOKEN = struct.Struct("<BBHII")         # raiz, baixo, qualidade, texto, espaço anterior
+_DESLOCAMENTO = struct.Struct("<I")
+
+# Codificação das notas nos campos raiz/baixo
+SEM_NOTA = 0xFF
+BEMOL = 0x80
+LITERAL = 0xFE  # no campo baixo de um texto: palavra fora de linha de acordes
+MAXIMO_QUALIDADES = 0xFFFF
+
+_NAO_ESPACO = re.compile(r'\S+')
+
+
+def _codificar_nota(nome, classe):
+    """Codifica a classe de altura preservando a grafia original (ou None)"""
+    if nome == NOTAS_SUSTENIDOS[classe]:
+        return classe
+    if nome == NOTAS_BEMOIS[classe]:
+        return classe | BEMOL
+    return None
+
+
+def _codificar_acorde(transpositor, palavra, textos):
+    """Retorna (raiz, baixo, id_qualidade) para acordes simples, ou None"""
+    acorde = transpositor.compilar_acorde(palavra)
+    segmentos = acorde.segmentos
+    if not acorde.e_acorde or len(segmentos) > 2:
+        return None
+
+    prefixo, classe, qualidade = segmentos[0]
+    if prefixo or classe is None:
+        return None
+    partes = palavra.split('/', 1)
+    raiz = _codificar_nota(partes[0][:len(partes[0]) - len(qualidade)], classe)
+    if raiz is None:
+        return None
+
+    baixo = SEM_NOTA
+    if len(segmentos) == 2:
+        prefixo_baixo, classe_baixo, resto_baixo = segmentos[1]
+        if prefixo_baixo or resto_baixo or classe_baixo is None:
+            return None
+        baixo = _codificar_nota(partes[1], classe_baixo)
+        if baixo is None:
+            return None
+
+    id_qualidade = textos.id(qualidade)
+    if id_qualidade > MAXIMO_QUALIDADES:
+        return None
+    return raiz, baixo, id_qualidade
+
+
+class _TabelaTextos:
+    """Tabela de strings deduplicadas usada na gravação"""
+
+    def __init__(self):
+        self.indices = {"": 0}
+        self.textos = [""]
+
+    def id(self, texto):
+        indice = self.indices.get(texto)
+        if indice is None:
+            indice = self.indices[texto] = len(self.textos)
+            self.textos.append(texto)
+        return indice
+
+
+def gravar_corpus(caminho, musicas, transpositor=None):
+    """Grava um corpus binário a partir de pares (nome, texto) ou de um dicionário
+
+    Retorna (nº de músicas, nº de tokens).
+    """
+    transpositor = transpositor or TranspositorMusical()
+    if isinstance(musicas, dict):
+        musicas = musicas.items()
+
+    textos = _TabelaTextos()
+    diretorio = []
+    tokens = bytearray()
+    total_tokens = 0
+    codificados = {}
+
+    for nome, texto in musicas:
+        primeiro = total_tokens
+        posicao = 0
+        inicio_linha = 0
+        # Cada linha passa pelo mesmo classificador de compilar_cifra
+        for linha in texto.splitlines(keepends=True):
+            encontrados = list(_NAO_ESPACO.finditer(linha))
+            compilados = transpositor._compilar_linha([token.group() for token in encontrados])
+            for token, compilado in zip(encontrados, compilados):
+                inicio, fim = token.span()
+                palavra = token.group()
+                espaco = textos.id(texto[posicao:inicio_linha + inicio])
+
+                if not compilado.e_acorde:
+                    tokens += _TOKEN.pack(SEM_NOTA, LITERAL, 0, textos.id(palavra), espaco)
+                else:
+                    codigo = codificados.get(palavra)
+                    if codigo is None:
+                        codigo = codificados[palavra] = _codificar_acorde(transpositor, palavra, textos) or ()
+                    if codigo:
+                        tokens += _TOKEN.pack(codigo[0], codigo[1], codigo[2], 0, espaco)
+                    else:
+                        tokens += _TOKEN.pack(SEM_NOTA, SEM_NOTA, 0, textos.id(palavra), espaco)
+
+                total_tokens += 1
+                posicao = inicio_linha + fim
+            inicio_linha += len(linha)
+        diretorio.append((textos.id(nome), primeiro, total_tokens - primeiro, textos.id(texto[posicao:])))
+
+    blobs = [texto.encode("utf-8") for texto in textos.textos]
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(_CABECALHO.pack(MAGICO, VERSAO, 0, len(diretorio), total_tokens, len(blobs)))
+        for entrada in diretorio:
+            arquivo.write(_MUSICA.pack(*entrada))
+        arquivo.write(tokens)
+        deslocamento = 0
+        for blob in blobs:
+            arquivo.write(_DESLOCAMENTO.pack(deslocamento))
+            deslocamento += len(blob)
+        arquivo.write(_DESLOCAMENTO.pack(deslocamento))
+        for blob in blobs:
+            arquivo.write(blob)
+
+    return len(diretorio), total_tokens
+
+
+class CorpusBinario:
+    """Leitor de um corpus binário aberto por mmap
+
+    Só as páginas dos tokens e textos efetivamente usados são lidas do disco.
+    Use como gerenciador de contexto ou chame ``fechar()``.
+    """
+
+    def __init__(self, caminho, transpositor=None):
+        self.transpositor = transpositor or TranspositorMusical()
+        self._arquivo = open(caminho, "rb")
+        try:
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._arquivo.close()
+            raise ValueError(f"Corpus vazio: {caminho}")
+
+        magico, versao, _, n_musicas, n_tokens, n_textos = _CABECALHO.unpack_from(self._mapa, 0)
+        if magico != MAGICO:
+            self.fechar()
+            raise ValueError(f"Arquivo não é um corpus de cifras: {caminho}")
+        if versao != VERSAO:
+            self.fechar()
+            raise ValueError(f"Versão de corpus não suportada: {versao}")
+
+        self._inicio_musicas = _CABECALHO.size
+        self._inicio_tokens = self._inicio_musicas + n_musicas * _MUSICA.size
+        self._inicio_deslocamentos = self._inicio_tokens + n_tokens * _TOKEN.size
+        self._inicio_textos = self._inicio_deslocamentos + (n_textos + 1) * _DESLOCAMENTO.size
+        self._textos = {}
+
+        self._musicas = {}
+        for i in range(n_musicas):
+            id_nome, primeiro, quantidade, espaco_final = _MUSICA.unpack_from(
+                self._mapa, self._inicio_musicas + i * _MUSICA.size)
+            self._musicas[self.texto(id_nome)] = (primeiro, quantidade, espaco_final)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def __len__(self):
+        return len(self._musicas)
+
+    def __contains__(self, nome):
+        return nome in self._musicas
+
+    def fechar(self):
+        """Libera o mapeamento de memória e o arquivo"""
+        self._mapa.close()
+        self._arquivo.close()
+
+    def nomes(self):
+        """Nomes das músicas do corpus, na ordem de gravação"""
+        return list(self._musicas)
+
+    def texto(self, id_texto):
+        """Decodifica (com cache) uma entrada da tabela de textos"""
+        texto = self._textos.get(id_texto)
+        if texto is None:
+            inicio, fim = struct.unpack_from(
+                "<II", self._mapa, self._inicio_deslocamentos + id_texto * _DESLOCAMENTO.size)
+            texto = self._textos[id_texto] = self._mapa[self._inicio_textos + inicio:
+                                                        self._inicio_textos + fim].decode("utf-8")
+        return texto
+
+    def _tokens(self, nome):
+        primeiro, quantidade, espaco_final = self._musicas[nome]
+        inicio = self._inicio_tokens + primeiro * _TOKEN.size
+        return _TOKEN.iter_unpack(self._mapa[inicio:inicio + quantidade * _TOKEN.size]), espaco_final
+
+    def transpor(self, nome, semitons, usar_bemois=False):
+        """Reconstrói a música transposta preservando o layout original"""
+        deslocamento = semitons % 12
+        indice = deslocamento + (12 if usar_bemois else 0)
+        compilar = self.transpositor.compilar_acorde
+        return self._reconstruir(nome, lambda palavra: compilar(palavra).grafias[indice],
+                                 deslocamento, usar_bemois, False)
+
+    def ler(self, nome):
+        """Retorna o texto original da música, byte a byte igual ao gravado"""
+        return self._reconstruir(nome, lambda palavra: palavra, 0, False, True)
+
+    def _reconstruir(self, nome, converter_texto, deslocamento, usar_bemois, grafia_original):
+        texto = self.texto
+        grafados = {}
+        partes = []
+        tokens, espaco_final = self._tokens(nome)
+        for registro in tokens:
+            raiz, baixo, id_qualidade, id_texto, id_espaco = registro
+            partes.append(texto(id_espaco))
+            if raiz == SEM_NOTA:
+                partes.append(texto(id_texto) if baixo == LITERAL else converter_texto(texto(id_texto)))
+                continue
+
+            chave = registro[:3]
+            acorde = grafados.get(chave)
+            if acorde is None:
+                acorde = grafados[chave] = self._grafar(raiz, baixo, texto(id_qualidade), deslocamento,
+                                                        usar_bemois, grafia_original)
+            partes.append(acorde)
+
+        partes.append(texto(espaco_final))
+        return ''.join(partes)
+
+    @staticmethod
+    def _grafar(raiz, baixo, qualidade, deslocamento, usar_bemois, grafia_original=False):
+        """Escreve o acorde a partir das classes de altura"""
+        def nome(codigo):
+            if grafia_original:
+                nomes = NOTAS_BEMOIS if codigo & BEMOL else NOTAS_SUSTENIDOS
+            else:
+                nomes = NOTAS_BEMOIS if usar_bemois else NOTAS_SUSTENIDOS
+            return nomes[((codigo & ~BEMOL) + deslocamento) % 12]
+
+        acorde = nome(raiz) + qualidade
+        if baixo != SEM_NOTA:
+            acorde += '/' + nome(baixo)
+        return acorde
+
+    def converter_portugues(self, nome):
+        """Explica a música em português (mesmo formato de converter_cifra_portugues)
+
+        Como em transpor_e_explicar, palavras de linhas de letra ficam como estão.
+        """
+        explicar = self.transpositor.explicar_acorde
+        explicados = {}
+        resultado = []
+        tokens, _ = self._tokens(nome)
+        for raiz, baixo, id_qualidade, id_texto, _ in tokens:
+            if raiz == SEM_NOTA:
+                palavra = self.texto(id_texto)
+                if baixo == LITERAL:
+                    resultado.append(palavra)
+                    continue
+            else:
+                palavra = self._grafar(raiz, baixo, self.texto(id_qualidade), 0, False, True)
+            explicacao = explicados.get(palavra)
+            if explicacao is None:
+                explicacao = explicados[palavra] = explicar(palavra) or palavra
+            resultado.append(explicacao)
+        return ' | '.join(resultado)
+
+
+def _ler_arquivos(caminhos):
+    """Gera (nome, texto) para arquivos .txt e diretórios de cifras"""
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, _, arquivos in os.walk(caminho):
+                for nome_arquivo in sorted(arquivos):
+                    if nome_arquivo.endswith(".txt"):
+                        completo = os.path.join(raiz, nome_arquivo)
+                        with open(completo, "r", encoding="utf-8", newline="") as arquivo:
+                            yield os.path.relpath(completo, caminho), arquivo.read()
+        else:
+            with open(caminho, "r", encoding="utf-8", newline="") as arquivo:
+                yield os.path.basename(caminho), arquivo.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversão entre cifras em texto e o formato binário")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_compilar = subcomandos.add_parser("compilar", help="Converte arquivos/diretórios de cifras em um corpus binário")
+    p_compilar.add_argument("saida", help=f"Arquivo do corpus (ex: cancioneiro{EXTENSAO})")
+    p_compilar.add_argument("entradas", nargs="+", help="Arquivos .txt ou diretórios")
+
+    p_listar = subcomandos.add_parser("listar", help="Lista as músicas de um corpus")
+    p_listar.add_argument("corpus")
+
+    p_extrair = subcomandos.add_parser("extrair", help="Converte músicas do corpus de volta para texto")
+    p_extrair.add_argument("corpus")
+    p_extrair.add_argument("-n", "--nome", help="Música a extrair (padrão: todas)")
+    p_extrair.add_argument("-s", "--semitons", type=int, default=0, help="Semitons para transpor")
+    p_extrair.add_argument("-b", "--bemois", action="store_true", help="Usar bemóis")
+    p_extrair.add_argument("-d", "--diretorio", help="Grava cada música em um arquivo (padrão: stdout)")
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "compilar":
+        musicas, tokens = gravar_corpus(args.saida, _ler_arquivos(args.entradas))
+        print(f"💾 {musicas} músicas ({tokens} tokens) gravadas em {args.saida}")
+
+    elif args.comando == "listar":
+        with CorpusBinario(args.corpus) as corpus:
+            for nome in corpus.nomes():
+                print(nome)
+
+    elif args.comando == "extrair":
+        with CorpusBinario(args.corpus) as corpus:
+            nomes = [args.nome] if args.nome else corpus.nomes()
+            for nome in nomes:
+                if args.semitons or args.bemois:
+                    texto = corpus.transpor(nome, args.semitons, args.bemois)
+                else:
+                    texto = corpus.ler(nome)
+                if args.diretorio:
+                    destino = os.path.join(args.diretorio, nome)
+                    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+                    with open(destino, "w", encoding="utf-8", newline="") as arquivo:
+                        arquivo.write(texto)
+                else:
+                    sys.stdout.write(texto)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Exporta as tabelas pré-calculadas do TranspositorMusical para a página web
+Gera front/tabelas.js (ou JSON): com ele o navegador transpõe só com consultas
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import (
+    ACORDE_VALIDO, ALTERACOES, CLASSES_NATURAIS, INDICE_NOTAS, NOTAS_BEMOIS, NOTAS_PORTUGUES,
+    NOTAS_SUSTENIDOS, TIPOS_ACORDES, VERSAO_TABELAS, TranspositorMusical, _TOKEN_NEUTRO,
+)
+
+CAMINHO_FRONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "front", "tabelas.js")
+VARIAVEL_JS = "TABELAS_TRANSPOSITOR"
+
+# Construções do re do Python que o RegExp do JavaScript (com a flag 'u') escreve
+# de outro jeito; \d vem por último porque aparece dentro das anteriores
+_EQUIVALENTES_JS = (
+    (r"[^\W\d_]", r"\p{L}"),
+    (r"[\w-]", r"[\p{L}\p{N}_-]"),
+    (r"\d", r"\p{Nd}"),
+)
+
+
+def _regex_js(padrao):
+    """Padrão do re (Unicode) reescrito para RegExp com a flag 'u'"""
+    for python, js in _EQUIVALENTES_JS:
+        padrao = padrao.replace(python, js)
+    return padrao
+
+
+def _classe_caracteres(caracteres):
+    """Classe de caracteres do RegExp em faixas ([\\u0009-\\u000d...])"""
+    codigos = sorted(ord(c) for c in caracteres)
+    faixas = []
+    for codigo in codigos:
+        if faixas and faixas[-1][1] == codigo - 1:
+            faixas[-1][1] = codigo
+        else:
+            faixas.append([codigo, codigo])
+    return "[" + "".join(
+        f"\\u{inicio:04x}" if inicio == fim else f"\\u{inicio:04x}-\\u{fim:04x}"
+        for inicio, fim in faixas
+    ) + "]"
+
+
+def _separadores():
+    """Espaços de str.split() e quebras de str.splitlines(), iguais aos do Python"""
+    espacos = [chr(c) for c in range(sys.maxunicode + 1) if chr(c).isspace()]
+    quebras = [c for c in espacos if len(f"a{c}b".splitlines()) == 2]
+    return _classe_caracteres(espacos) + "+", r"\r\n|" + _classe_caracteres(quebras)
+
+
+def tabelas_front(transpositor=None):
+    """Tabelas usadas pela página para transpor e explicar cifras sem o serviço
+
+    - ``intervalos``: matriz de semitons entre os instrumentos de ``instrumentos``;
+      ``indice`` leva ids e apelidos à linha/coluna da matriz
+    - ``grafias``: para cada classe de altura, as 24 grafias (12 transposições
+      com sustenidos, depois com bemóis), na mesma ordem de AcordeCompilado
+    - ``qualidades`` e ``notas_portugues``: léxico das explicações em português
+    - ``gramatica``: padrões de classificação dos tokens, já no formato do RegExp
+    """
+    transpositor = transpositor or TranspositorMusical()
+    ids, matriz = transpositor.matriz_intervalos()
+    instrumentos = transpositor.instrumentos
+    indice = {}
+    for posicao, instrumento_id in enumerate(ids):
+        indice[instrumento_id] = posicao
+        for apelido in instrumentos[instrumento_id]["apelidos"]:
+            indice.setdefault(apelido, posicao)
+
+    espacos, quebras = _separadores()
+    return {
+        "versao": VERSAO_TABELAS,
+        "assinatura": transpositor.assinatura_catalogo(),
+        "instrumentos": [
+            {"id": instr["id"], "nome": instr["nome"], "familia": instr["familia"],
+             "afinacao": list(instr["afinacao"]), "tonalidade": instr["tonalidade"],
+             "apelidos": list(instr["apelidos"])}
+            for instr in (instrumentos[instrumento_id] for instrumento_id in ids)
+        ],
+        "indice": indice,
+        "intervalos": [list(linha) for linha in matriz],
+        "naturais": dict(CLASSES_NATURAIS),
+        "alteracoes": dict(ALTERACOES),
+        "indice_notas": dict(INDICE_NOTAS),
+        "grafias": [
+            [nomes[(classe + semitons) % 12] for nomes in (NOTAS_SUSTENIDOS, NOTAS_BEMOIS)
+             for semitons in range(12)]
+            for classe in range(12)
+        ],
+        "qualidades": dict(TIPOS_ACORDES),
+        "notas_portugues": dict(NOTAS_PORTUGUES),
+        "gramatica": {
+            "acorde": _regex_js(ACORDE_VALIDO.pattern),
+            "neutro": _regex_js(_TOKEN_NEUTRO.pattern),
+            "espacos": espacos,
+            "quebras": quebras,
+        },
+    }
+
+
+def serializar(tabelas, formato="js"):
+    """Texto compacto do artefato: JSON puro ou script que define a variável global"""
+    texto = json.dumps(tabelas, ensure_ascii=False, separators=(",", ":"))
+    if formato == "json":
+        return texto + "\n"
+    return (f"// Gerado por exportar_tabelas.py (tabelas v{tabelas['versao']}, "
+            f"catálogo {tabelas['assinatura']}). Não edite à mão.\n"
+            f"window.{VARIAVEL_JS} = {texto};\n")
+
+
+def exportar_tabelas(caminho=CAMINHO_FRONT, formato=None, transpositor=None):
+    """Grava o artefato (o formato sai da extensão se não for informado); retorna o tamanho"""
+    if formato is None:
+        formato = "json" if caminho.endswith(".json") else "js"
+    texto = serializar(tabelas_front(transpositor), formato)
+    with open(caminho, "w", encoding="utf-8", newline="\n") as arquivo:
+        arquivo.write(texto)
+    return len(texto.encode("utf-8"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta as tabelas de transposição para a página web")
+    parser.add_argument("-o", "--saida", default=CAMINHO_FRONT, help="Arquivo gerado (padrão: front/tabelas.js)")
+    parser.add_argument("-f", "--formato", choices=("js", "json"), help="Formato (padrão: pela extensão)")
+    parser.add_argument("--catalogo", help="Catálogo de instrumentos em JSON (padrão: instrumentos.json)")
+    args = parser.parse_args(argv)
+
+    tamanho = exportar_tabelas(args.saida, args.formato, TranspositorMusical(args.catalogo))
+    print(f"📦 Tabelas gravadas em {args.saida} ({tamanho / 1024:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
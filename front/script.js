@@ -1,32 +1,64 @@
 // Transpositor Musical - Frontend JavaScript
 class TranspositorFrontend {
     constructor() {
-        this.instruments = {
-            violao: { nome: "Violão", afinacao: "E-A-D-G-B-E", tonalidade: "C" },
-            guitarra: { nome: "Guitarra", afinacao: "E-A-D-G-B-E", tonalidade: "C" },
-            baixo: { nome: "Baixo", afinacao: "E-A-D-G", tonalidade: "C" },
-            ukulele: { nome: "Ukulele", afinacao: "G-C-E-A", tonalidade: "C" },
-            violino: { nome: "Violino", afinacao: "G-D-A-E", tonalidade: "C" },
-            flauta: { nome: "Flauta", afinacao: "C", tonalidade: "C" },
-            clarineta: { nome: "Clarineta", afinacao: "D", tonalidade: "Bb" },
-            sax_alto: { nome: "Saxofone Alto", afinacao: "Db", tonalidade: "Eb" },
-            sax_tenor: { nome: "Saxofone Tenor", afinacao: "Ab", tonalidade: "Bb" },
-            trompete: { nome: "Trompete", afinacao: "C", tonalidade: "Bb" },
-            trombone: { nome: "Trombone", afinacao: "E", tonalidade: "C" }
-        };
+        // Com as tabelas geradas por exportar_tabelas.py (tabelas.js) a página
+        // transpõe sozinha; sem elas, chama o serviço local (servidor.py).
+        this.local = window.TABELAS_TRANSPOSITOR && typeof TranspositorLocal !== 'undefined'
+            ? new TranspositorLocal(window.TABELAS_TRANSPOSITOR) : null;
+        this.apiUrl = this.descobrirApi();
+        this.instruments = {};
+        this.init();
+    }
+
+    descobrirApi() {
+        const params = new URLSearchParams(window.location.search);
+        const configurada = params.get('api') || localStorage.getItem('transpositor-api');
+        if (configurada) {
+            localStorage.setItem('transpositor-api', configurada);
+            return configurada.replace(/\/$/, '');
+        }
+        // Servida pelo próprio servidor.py: mesma origem
+        if (window.location.protocol.startsWith('http') &&
+            ['localhost', '127.0.0.1'].includes(window.location.hostname)) {
+            return '';
+        }
+        return 'http://127.0.0.1:8080';
+    }
 
-        this.transposicoes = {
-            'C': 0, 'Bb': -2, 'Eb': -9, 'F': -7
+    async chamarApi(rota, corpo) {
+        const opcoes = corpo === undefined ? {} : {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(corpo)
         };
+        const resposta = await fetch(`${this.apiUrl}/api/${rota}`, opcoes);
+        const dados = await resposta.json();
+        if (!resposta.ok) {
+            throw new Error(dados.erro || `HTTP ${resposta.status}`);
+        }
+        return dados;
+    }
 
-        this.notas = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B'];
-        this.init();
+    async carregarInstrumentos() {
+        try {
+            const dados = this.local ? this.local.tabelas : await this.chamarApi('instrumentos');
+            for (const instr of dados.instrumentos) {
+                this.instruments[instr.id] = {
+                    nome: instr.nome,
+                    afinacao: instr.afinacao.join('-'),
+                    tonalidade: instr.tonalidade
+                };
+            }
+            this.updateInstrumentInfo();
+        } catch (error) {
+            this.showToast('Serviço de transposição indisponível (python servidor.py)', 'error');
+        }
     }
 
     init() {
         this.setupEventListeners();
         this.hideLoading();
-        this.updateInstrumentInfo();
+        this.carregarInstrumentos();
     }
 
     setupEventListeners() {
@@ -78,14 +110,15 @@ class TranspositorFrontend {
     }
 
     updateInstrumentInfo() {
-        const origin = document.getElementById('instrument-origin').value;
-        const destination = document.getElementById('instrument-destination').value;
+        const origin = this.instruments[document.getElementById('instrument-origin').value];
+        const destination = this.instruments[document.getElementById('instrument-destination').value];
+        if (!origin || !destination) return;
 
         document.getElementById('origin-info').innerHTML = 
-            `<span class="tuning">Afinação: ${this.instruments[origin].afinacao}</span>`;
+            `<span class="tuning">Afinação: ${origin.afinacao}</span>`;
         
         document.getElementById('destination-info').innerHTML = 
-            `<span class="tuning">Afinação: ${this.instruments[destination].afinacao}</span>`;
+            `<span class="tuning">Afinação: ${destination.afinacao}</span>`;
     }
 
     async transposeMusic() {
@@ -100,14 +133,14 @@ class TranspositorFrontend {
         const useFlats = document.getElementById('use-flats').checked;
         const showPortuguese = document.getElementById('show-portuguese').checked;
 
-        // Simular processamento
-        this.showToast('Processando transposição...', 'info');
-
         try {
-            // Simular delay de processamento
-            await new Promise(resolve => setTimeout(resolve, 1000));
-
-            const resultado = this.calcularTransposicao(chordInput, origin, destination, useFlats);
+            const pedido = {
+                cifra: this.converterParaIngles(chordInput),
+                origem: origin,
+                destino: destination,
+                usar_bemois: useFlats
+            };
+            const resultado = this.local ? this.local.transpor(pedido) : await this.chamarApi('transpor', pedido);
             this.mostrarResultado(resultado, showPortuguese);
             
             this.showToast('Transposição concluída!', 'success');
@@ -116,24 +149,6 @@ class TranspositorFrontend {
         }
     }
 
-    calcularTransposicao(cifra, origem, destino, usarBemois) {
-        const semitons = this.calcularDiferencaInstrumentos(origem, destino);
-        
-        // Converter cifra para inglês se estiver em português
-        let cifraIngles = this.converterParaIngles(cifra);
-        
-        // Transpor acordes
-        const palavras = cifraIngles.split(/\s+/);
-        const resultado = palavras.map(palavra => {
-            if (this.eAcorde(palavra)) {
-                return this.transporAcorde(palavra, semitons, usarBemois);
-            }
-            return palavra;
-        }).join(' ');
-
-        return resultado;
-    }
-
     converterParaIngles(cifra) {
         const conversoes = {
             'Dó': 'C', 'Ré': 'D', 'Mi': 'E', 'Fá': 'F', 
@@ -151,99 +166,32 @@ class TranspositorFrontend {
         return cifraIngles;
     }
 
-    eAcorde(palavra) {
-        return /^[A-G][#b]?(m|7|m7|maj7|dim|aug|sus2|sus4|6|9)?(\/[A-G][#b]?)?$/.test(palavra);
-    }
-
-    transporAcorde(acorde, semitons, usarBemois) {
-        // Encontrar nota base
-        const match = acorde.match(/^([A-G][#b]?)/);
-        if (!match) return acorde;
-
-        const notaBase = match[1];
-        const resto = acorde.slice(notaBase.length);
-
-        try {
-            const notaCompleta = notaBase + '4'; // Oitava de referência
-            const novaNota = this.transporNota(notaCompleta, semitons, usarBemois);
-            const novaNotaBase = novaNota.slice(0, -1); // Remove oitava
-
-            return novaNotaBase + resto;
-        } catch (error) {
-            return acorde;
-        }
-    }
-
-    transporNota(nota, semitons, usarBemois) {
-        // Implementação simplificada da transposição
-        const idx = this.notas.indexOf(nota.slice(0, -1));
-        if (idx === -1) return nota;
-
-        const novaIdx = (idx + semitons + 12) % 12;
-        let novaNota = this.notas[novaIdx];
-
-        if (usarBemois) {
-            const bemols = {'C#': 'Db', 'D#': 'Eb', 'F#': 'Gb', 'G#': 'Ab', 'A#': 'Bb'};
-            novaNota = bemols[novaNota] || novaNota;
-        }
-
-        return novaNota + nota.slice(-1);
-    }
-
-    calcularDiferencaInstrumentos(origem, destino) {
-        const instrOrigem = this.instruments[origem];
-        const instrDestino = this.instruments[destino];
-        
-        const transOrigem = this.transposicoes[instrOrigem.tonalidade] || 0;
-        const transDestino = this.transposicoes[instrDestino.tonalidade] || 0;
-        
-        return transDestino - transOrigem;
-    }
-
     mostrarResultado(resultado, showPortuguese) {
         document.getElementById('results-section').style.display = 'block';
         
         // Cifra transposta
-        document.getElementById('transposed-chords').textContent = resultado;
+        document.getElementById('transposed-chords').textContent = resultado.resultado;
         
         // Explicação em português
-        const explicacao = showPortuguese ? this.converterParaPortugues(resultado) : resultado;
+        const explicacao = showPortuguese ? resultado.explicacao : resultado.resultado;
         document.getElementById('portuguese-explanation').textContent = explicacao;
         
         // Detalhes
-        const origem = document.getElementById('instrument-origin').value;
-        const destino = document.getElementById('instrument-destination').value;
-        const semitons = this.calcularDiferencaInstrumentos(origem, destino);
+        const origem = this.instruments[document.getElementById('instrument-origin').value] || {};
+        const destino = this.instruments[document.getElementById('instrument-destination').value] || {};
         
         document.getElementById('transposition-details').innerHTML = `
-            <p><strong>Origem:</strong> ${this.instruments[origem].nome}</p>
-            <p><strong>Destino:</strong> ${this.instruments[destino].nome}</p>
-            <p><strong>Diferença:</strong> ${semitons} semitons</p>
-            <p><strong>Afinação origem:</strong> ${this.instruments[origem].afinacao}</p>
-            <p><strong>Afinação destino:</strong> ${this.instruments[destino].afinacao}</p>
+            <p><strong>Origem:</strong> ${origem.nome}</p>
+            <p><strong>Destino:</strong> ${destino.nome}</p>
+            <p><strong>Diferença:</strong> ${resultado.semitons} semitons</p>
+            <p><strong>Afinação origem:</strong> ${origem.afinacao}</p>
+            <p><strong>Afinação destino:</strong> ${destino.afinacao}</p>
         `;
 
         // Scroll para resultados
         document.getElementById('results-section').scrollIntoView({ behavior: 'smooth' });
     }
 
-    converterParaPortugues(cifra) {
-        const conversoes = {
-            'C': 'Dó', 'D': 'Ré', 'E': 'Mi', 'F': 'Fá', 'G': 'Sol', 'A': 'Lá', 'B': 'Si',
-            'Cm': 'Dó m', 'Dm': 'Ré m', 'Em': 'Mi m', 'Fm': 'Fá m', 'Gm': 'Sol m', 'Am': 'Lá m', 'Bm': 'Si m',
-            'C#': 'Dó#', 'D#': 'Ré#', 'F#': 'Fá#', 'G#': 'Sol#', 'A#': 'Lá#',
-            'Db': 'Réb', 'Eb': 'Mib', 'Gb': 'Solb', 'Ab': 'Láb', 'Bb': 'Sib'
-        };
-
-        let cifraPortugues = cifra;
-        for (const [en, pt] of Object.entries(conversoes)) {
-            const regex = new RegExp('\\b' + en + '\\b', 'g');
-            cifraPortugues = cifraPortugues.replace(regex, pt);
-        }
-
-        return cifraPortugues;
-    }
-
     autoTranspose() {
         const chordInput = document.getElementById('chord-input').value.trim();
         if (chordInput && document.getElementById('auto-transpose').checked) {
@@ -353,7 +301,7 @@ function loadExample(exampleId) {
 }
 
 function showAbout() {
-    alert(`🎵 Transpositor Musical v1.0\n\nDesenvolvido para músicos que precisam transpor cifras entre diferentes instrumentos.\n\nFuncionalidades:\n• Transposição entre 10+ instrumentos\n• Suporte a acordes complexos\n• Interface moderna e responsiva\n• Trabalha 100% no navegador\n• Totalmente gratuito!`);
+    alert(`🎵 Transpositor Musical v1.0\n\nDesenvolvido para músicos que precisam transpor cifras entre diferentes instrumentos.\n\nFuncionalidades:\n• Transposição entre 10+ instrumentos\n• Suporte a acordes complexos\n• Interface moderna e responsiva\n• Funciona offline com as tabelas do transpositor (tabelas.js)\n• Totalmente gratuito!`);
 }
 
 function showShortcuts() {
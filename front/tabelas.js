@@ -0,0 +1,2 @@
+// Gerado por exportar_tabelas.py (tabelas v3, catálogo 6cdae30edaebad0b). Não edite à mão.
+window.TABELAS_TRANSPOSITOR = {"versao":3,"assinatura":"6cdae30edaebad0b","instrumentos":[{"id":"violao","nome":"Violão","familia":"cordas","afinacao":["E2","A2","D3","G3","B3","E4"],"tonalidade":"C","apelidos":["violão"]},{"id":"guitarra","nome":"Guitarra","familia":"cordas","afinacao":["E2","A2","D3","G3","B3","E4"],"tonalidade":"C","apelidos":["guitarra_eletrica"]},{"id":"baixo","nome":"Baixo","familia":"cordas","afinacao":["E1","A1","D2","G2"],"tonalidade":"C","apelidos":["contrabaixo","baixo_eletrico"]},{"id":"ukulele_soprano","nome":"Ukulele Soprano","familia":"cordas","afinacao":["G4","C4","E4","A4"],"tonalidade":"C","apelidos":["ukulele"]},{"id":"violino","nome":"Violino","familia":"cordas","afinacao":["G3","D4","A4","E5"],"tonalidade":"C","apelidos":[]},{"id":"flauta_transversal","nome":"Flauta Transversal","familia":"madeiras","afinacao":["C4"],"tonalidade":"C","apelidos":["flauta"]},{"id":"clarineta_sib","nome":"Clarineta Sib","familia":"madeiras","afinacao":["D3"],"tonalidade":"Bb","apelidos":["clarineta","clarinete","clarinete_sib"]},{"id":"saxofone_alto","nome":"Saxofone Alto","familia":"madeiras","afinacao":["Db3"],"tonalidade":"Eb","apelidos":["sax_alto"]},{"id":"saxofone_tenor","nome":"Saxofone Tenor","familia":"madeiras","afinacao":["Ab2"],"tonalidade":"Bb","apelidos":["sax_tenor"]},{"id":"oboe","nome":"Oboé","familia":"madeiras","afinacao":["C4"],"tonalidade":"C","apelidos":["oboé"]},{"id":"trompete_sib","nome":"Trompete Sib","familia":"metais","afinacao":["C4"],"tonalidade":"Bb","apelidos":["trompete"]},{"id":"trompa_fa","nome":"Trompa em Fá","familia":"metais","afinacao":["F2"],"tonalidade":"F","apelidos":["trompa"]},{"id":"trombone","nome":"Trombone","familia":"metais","afinacao":["E2"],"tonalidade":"C","apelidos":[]},{"id":"tuba_sib","nome":"Tuba Sib","familia":"metais","afinacao":["Bb1"],"tonalidade":"Bb","apelidos":["tuba"]}],"indice":{"violao":0,"violão":0,"guitarra":1,"guitarra_eletrica":1,"baixo":2,"contrabaixo":2,"baixo_eletrico":2,"ukulele_soprano":3,"ukulele":3,"violino":4,"flauta_transversal":5,"flauta":5,"clarineta_sib":6,"clarineta":6,"clarinete":6,"clarinete_sib":6,"saxofone_alto":7,"sax_alto":7,"saxofone_tenor":8,"sax_tenor":8,"oboe":9,"oboé":9,"trompete_sib":10,"trompete":10,"trompa_fa":11,"trompa":11,"trombone":12,"tuba_sib":13,"tuba":13},"intervalos":[[0,0,-12,27,15,20,8,0,2,20,18,-6,0,-8],[0,0,-12,27,15,20,8,0,2,20,18,-6,0,-8],[12,12,0,39,27,32,20,12,14,32,30,6,12,4],[-27,-27,-39,0,-12,-7,-19,-27,-25,-7,-9,-33,-27,-35],[-15,-15,-27,12,0,5,-7,-15,-13,5,3,-21,-15,-23],[-20,-20,-32,7,-5,0,-12,-20,-18,0,-2,-26,-20,-28],[-8,-8,-20,19,7,12,0,-8,-6,12,10,-14,-8,-16],[0,0,-12,27,15,20,8,0,2,20,18,-6,0,-8],[-2,-2,-14,25,13,18,6,-2,0,18,16,-8,-2,-10],[-20,-20,-32,7,-5,0,-12,-20,-18,0,-2,-26,-20,-28],[-18,-18,-30,9,-3,2,-10,-18,-16,2,0,-24,-18,-26],[6,6,-6,33,21,26,14,6,8,26,24,0,6,-2],[0,0,-12,27,15,20,8,0,2,20,18,-6,0,-8],[8,8,-4,35,23,28,16,8,10,28,26,2,8,0]],"naturais":{"C":0,"D":2,"E":4,"F":5,"G":7,"A":9,"B":11},"alteracoes":{"#":1,"b":-1},"indice_notas":{"C":0,"C#":1,"Cb":11,"D":2,"D#":3,"Db":1,"E":4,"E#":5,"Eb":3,"F":5,"F#":6,"Fb":4,"G":7,"G#":8,"Gb":6,"A":9,"A#":10,"Ab":8,"B":11,"B#":0,"Bb":10},"grafias":[["C","C#","D","D#","E","F","F#","G","G#","A","A#","B","C","Db","D","Eb","E","F","Gb","G","Ab","A","Bb","B"],["C#","D","D#","E","F","F#","G","G#","A","A#","B","C","Db","D","Eb","E","F","Gb","G","Ab","A","Bb","B","C"],["D","D#","E","F","F#","G","G#","A","A#","B","C","C#","D","Eb","E","F","Gb","G","Ab","A","Bb","B","C","Db"],["D#","E","F","F#","G","G#","A","A#","B","C","C#","D","Eb","E","F","Gb","G","Ab","A","Bb","B","C","Db","D"],["E","F","F#","G","G#","A","A#","B","C","C#","D","D#","E","F","Gb","G","Ab","A","Bb","B","C","Db","D","Eb"],["F","F#","G","G#","A","A#","B","C","C#","D","D#","E","F","Gb","G","Ab","A","Bb","B","C","Db","D","Eb","E"],["F#","G","G#","A","A#","B","C","C#","D","D#","E","F","Gb","G","Ab","A","Bb","B","C","Db","D","Eb","E","F"],["G","G#","A","A#","B","C","C#","D","D#","E","F","F#","G","Ab","A","Bb","B","C","Db","D","Eb","E","F","Gb"],["G#","A","A#","B","C","C#","D","D#","E","F","F#","G","Ab","A","Bb","B","C","Db","D","Eb","E","F","Gb","G"],["A","A#","B","C","C#","D","D#","E","F","F#","G","G#","A","Bb","B","C","Db","D","Eb","E","F","Gb","G","Ab"],["A#","B","C","C#","D","D#","E","F","F#","G","G#","A","Bb","B","C","Db","D","Eb","E","F","Gb","G","Ab","A"],["B","C","C#","D","D#","E","F","F#","G","G#","A","A#","B","C","Db","D","Eb","E","F","Gb","G","Ab","A","Bb"]],"qualidades":{"":"maior","m":"menor","7":"sétima","m7":"menor sétima","maj7":"sétima maior","dim":"diminuto","aug":"aumentado","sus2":"suspenso 2ª","sus4":"suspenso 4ª","6":"sexta","9":"nona","M":"maior","min":"menor","-":"menor","5":"quinta (power chord)","4":"suspenso 4ª","sus":"suspenso 4ª","7M":"sétima maior","M7":"sétima maior","7+":"sétima maior","maj":"sétima maior","m7M":"menor com sétima maior","m(7M)":"menor com sétima maior","mM7":"menor com sétima maior","m(maj7)":"menor com sétima maior","min7":"menor sétima","-7":"menor sétima","°":"diminuto","º":"diminuto","dim7":"diminuto com sétima","°7":"diminuto com sétima","º7":"diminuto com sétima","ø":"meio-diminuto","ø7":"meio-diminuto","m7b5":"meio-diminuto","m7(b5)":"meio-diminuto","m7(5-)":"meio-diminuto","+":"aumentado","5+":"aumentado","(#5)":"aumentado","7(#5)":"sétima com quinta aumentada","7(5+)":"sétima com quinta aumentada","7(b5)":"sétima com quinta diminuta","7(5-)":"sétima com quinta diminuta","7sus4":"sétima suspenso 4ª","7(4)":"sétima com quarta","7(11)":"sétima com décima primeira","7(#11)":"sétima com décima primeira aumentada","7(11+)":"sétima com décima primeira aumentada","7(9)":"sétima com nona","7/9":"sétima com nona","7(b9)":"sétima com nona menor","7(9-)":"sétima com nona menor","7(#9)":"sétima com nona aumentada","7(9+)":"sétima com nona aumentada","7(13)":"sétima com décima terceira","7(b13)":"sétima com décima terceira menor","7M(9)":"sétima maior com nona","7M(#11)":"sétima maior com décima primeira aumentada","maj9":"sétima maior com nona","m6":"menor sexta","m(6)":"menor sexta","6(9)":"sexta com nona","6/9":"sexta com nona","m6(9)":"menor sexta com nona","add9":"com nona adicionada","(9)":"com nona adicionada","2":"com nona adicionada","add11":"com décima primeira adicionada","m(9)":"menor com nona adicionada","madd9":"menor com nona adicionada","m9":"menor nona","m7(9)":"menor sétima com nona","m7(11)":"menor sétima com décima primeira","m11":"menor décima primeira","11":"décima primeira","13":"décima terceira"},"notas_portugues":{"C":"Dó","D":"Ré","E":"Mi","F":"Fá","G":"Sol","A":"Lá","B":"Si","C#":"Dó#","D#":"Ré#","F#":"Fá#","G#":"Sol#","A#":"Lá#","Db":"Réb","Eb":"Mib","Gb":"Solb","Ab":"Láb","Bb":"Sib"},"gramatica":{"acorde":"\\(?[A-G][#b]?(?:maj|min|dim|aug|sus|add|no|m|M|º|°|ø|\\+|-|[#b+\\-]?(?:2|4|5|6|7|9|11|13)|\\((?:[#b+\\-]?(?:2|4|5|6|7|9|11|13)|[/,+\\-]|M|maj)+\\))*(?:/(?:[A-G][#b]?|[#b+\\-]?(?:2|4|5|6|7|9|11|13)))*\\)?","neutro":"(?:[|:%/.\\-]+|\\(?[xX]?\\p{Nd}+[xX]?\\)?|N\\.?C\\.?|\\p{L}[\\p{L}\\p{N}_-]*:)","espacos":"[\\u0009-\\u000d\\u001c-\\u0020\\u0085\\u00a0\\u1680\\u2000-\\u200a\\u2028-\\u2029\\u202f\\u205f\\u3000]+","quebras":"\\r\\n|[\\u000a-\\u000d\\u001c-\\u001e\\u0085\\u2028-\\u2029]"}};
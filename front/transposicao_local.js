@@ -0,0 +1,151 @@
+// Transpositor Musical - transposição na própria página
+// Usa só as tabelas geradas por exportar_tabelas.py (tabelas.js) e segue as
+// mesmas regras do TranspositorMusical em Python, com os mesmos resultados.
+class TranspositorLocal {
+    constructor(tabelas) {
+        this.tabelas = tabelas;
+        const gramatica = tabelas.gramatica;
+        this.acordeValido = new RegExp(`^(?:${gramatica.acorde})$`, 'u');
+        this.tokenNeutro = new RegExp(`^(?:${gramatica.neutro})$`, 'u');
+        this.espacos = new RegExp(gramatica.espacos, 'u');
+        this.quebras = new RegExp(gramatica.quebras, 'u');
+        this.maiorQualidade = Math.max(...Object.keys(tabelas.qualidades).map(q => q.length));
+
+        // Tokens já analisados (símbolo -> segmentos, null se não for acorde)
+        // e explicações já montadas (símbolo -> texto, '' se não for acorde)
+        this.acordes = new Map();
+        this.explicacoes = new Map();
+    }
+
+    instrumento(id) {
+        if (!Object.prototype.hasOwnProperty.call(this.tabelas.indice, id)) {
+            throw new Error(`Instrumento desconhecido: ${id}`);
+        }
+        return this.tabelas.indice[id];
+    }
+
+    diferenca(origem, destino) {
+        return this.tabelas.intervalos[this.instrumento(origem)][this.instrumento(destino)];
+    }
+
+    palavras(linha) {
+        return linha.split(this.espacos).filter(palavra => palavra);
+    }
+
+    // Separa um segmento em [prefixo, classe de altura, resto] (_analisar_segmento)
+    analisarSegmento(segmento) {
+        const { naturais, alteracoes } = this.tabelas;
+        for (let i = 0; i < Math.min(3, segmento.length); i++) {
+            let classe = naturais[segmento[i]];
+            if (classe !== undefined) {
+                let fim = i + 1;
+                if (fim < segmento.length && alteracoes[segmento[fim]] !== undefined) {
+                    classe += alteracoes[segmento[fim]];
+                    fim += 1;
+                }
+                return [segmento.slice(0, i), (classe + 12) % 12, segmento.slice(fim)];
+            }
+        }
+        return [segmento, null, ''];
+    }
+
+    compilar(simbolo) {
+        let segmentos = this.acordes.get(simbolo);
+        if (segmentos === undefined) {
+            segmentos = this.acordeValido.test(simbolo)
+                ? simbolo.split('/').map(parte => this.analisarSegmento(parte))
+                : null;
+            this.acordes.set(simbolo, segmentos);
+        }
+        return segmentos;
+    }
+
+    // Mesma regra de _compilar_linha: se os acordes não forem maioria entre as
+    // palavras que não são marcações ('|', '(2x)', 'Intro:'), a linha é letra
+    linhaDeAcordes(palavras, segmentos) {
+        const acordes = segmentos.filter(s => s !== null).length;
+        if (acordes * 2 > palavras.length) return true;
+        let letra = 0;
+        palavras.forEach((palavra, i) => {
+            if (segmentos[i] === null && !this.tokenNeutro.test(palavra)) letra += 1;
+        });
+        return acordes > letra;
+    }
+
+    transporCifra(cifra, semitons, usarBemois = false) {
+        const indice = ((semitons % 12) + 12) % 12 + (usarBemois ? 12 : 0);
+        const grafias = this.tabelas.grafias;
+        const saida = [];
+        for (const linha of cifra.split(this.quebras)) {
+            const palavras = this.palavras(linha);
+            const segmentos = palavras.map(palavra => this.compilar(palavra));
+            if (!this.linhaDeAcordes(palavras, segmentos)) {
+                saida.push(...palavras);
+                continue;
+            }
+            palavras.forEach((palavra, i) => {
+                const partes = segmentos[i];
+                saida.push(partes === null ? palavra : partes.map(([prefixo, classe, resto]) =>
+                    classe === null ? prefixo : prefixo + grafias[classe][indice] + resto
+                ).join('/'));
+            });
+        }
+        return saida.join(' ');
+    }
+
+    explicarAcorde(acorde) {
+        let explicacao = this.explicacoes.get(acorde);
+        if (explicacao === undefined) {
+            explicacao = this.explicar(acorde);
+            this.explicacoes.set(acorde, explicacao);
+        }
+        return explicacao || null;
+    }
+
+    explicar(acorde) {
+        if (!this.acordeValido.test(acorde)) return '';
+        const { qualidades, notas_portugues: portugues, indice_notas: notas, alteracoes } = this.tabelas;
+        // Parênteses de cada lado são independentes; o ')' final só sai se
+        // não fechar uma extensão, como em 'D7(9)'
+        if (acorde.startsWith('(')) acorde = acorde.slice(1);
+        const abertos = acorde.split('(').length, fechados = acorde.split(')').length;
+        if (acorde.endsWith(')') && abertos < fechados) acorde = acorde.slice(0, -1);
+
+        const tamanhoNota = alteracoes[acorde.slice(1, 2)] !== undefined ? 2 : 1;
+        const notaBase = acorde.slice(0, tamanhoNota);
+        const resto = acorde.slice(tamanhoNota);
+
+        // Qualidade mais longa conhecida; o que sobrar é baixo ou extensão extra
+        let tamanho = Math.min(this.maiorQualidade, resto.length);
+        while (!Object.prototype.hasOwnProperty.call(qualidades, resto.slice(0, tamanho))) {
+            tamanho -= 1;
+        }
+        const depois = resto.slice(tamanho);
+        const barra = depois.indexOf('/');
+        const sobra = barra < 0 ? depois : depois.slice(0, barra);
+
+        const partes = [portugues[notaBase] || notaBase, qualidades[resto.slice(0, tamanho)]];
+        if (sobra) partes.push(sobra);
+        if (barra >= 0) {
+            const baixo = depois.slice(barra + 1);
+            partes.push(Object.prototype.hasOwnProperty.call(notas, baixo)
+                ? `com baixo em ${portugues[baixo] || baixo}` : '/' + baixo);
+        }
+        return partes.join(' ');
+    }
+
+    converterCifraPortugues(cifra) {
+        return this.palavras(cifra).map(palavra => this.explicarAcorde(palavra) || palavra).join(' | ');
+    }
+
+    // Mesma resposta de POST /api/transpor
+    transpor({ cifra, origem, destino, usar_bemois: usarBemois = false }) {
+        const semitons = this.diferenca(origem, destino);
+        const resultado = this.transporCifra(cifra, semitons, usarBemois);
+        return { resultado, semitons, explicacao: this.converterCifraPortugues(resultado) };
+    }
+}
+
+if (typeof module !== 'undefined') {
+    module.exports = { TranspositorLocal };
+}
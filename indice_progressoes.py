@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Índice invertido de progressões de acordes de um cancioneiro, em qualquer tom
+Cada sequência de acordes vira n-gramas de intervalos entre fundamentais e de
+famílias de qualidade, então C G Am F e D A Bm G caem na mesma chave
+
+Estrutura do arquivo (little-endian):
+
+    cabeçalho   MAGICO, versão, VERSAO_TABELAS, tamanho do n-grama, nº de músicas, nº de chaves
+    músicas     deslocamentos dos nomes (nº de músicas + 1) e os nomes em UTF-8,
+                carimbos (mtime_ns, tamanho), nº de acordes, sequências relativas
+                (seguidas de n - 1 marcas de fim), fundamentais e linhas de cada acorde
+    chaves      chaves em ordem (n bytes cada), nº de ocorrências de cada uma e
+                as ocorrências ((id da música << 32) | posição), na mesma ordem
+
+Ids liberados por músicas removidas são gravados como músicas vazias, com o
+carimbo (-2, -2), para que as ocorrências não precisem ser renumeradas.
+"""
+
+import argparse
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from itertools import accumulate
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cancioneiro import EXTENSOES_PADRAO, listar_cifras
+from main import (
+    CacheLimitado, ErroTransposicao, NOTAS_BEMOIS, NOTAS_SUSTENIDOS, TONICAS_COM_BEMOIS,
+    VERSAO_TABELAS, TranspositorMusical,
+)
+
+MAGICO = b"IPRG"
+VERSAO = 2
+EXTENSAO = ".iprg"
+TAMANHO_NGRAMA = 4  # acordes por chave; progressões mais curtas usam os prefixos
+
+_CABECALHO = struct.Struct("<4sHHHHII")  # mágico, versão, tabelas, n-grama, reservado, músicas, chaves
+_SEM_CARIMBO = (-1, -1)
+_LIVRE = (-2, -2)
+
+# Famílias de qualidade comparadas na busca: extensões (7, 9, add9...) e baixo
+# não mudam a família, então Am7 conta como o vi de C tanto quanto Am
+FAMILIAS = ("maior", "menor", "diminuto", "meio-diminuto", "aumentado", "suspenso")
+MAIOR, MENOR, DIMINUTO, MEIO_DIMINUTO, AUMENTADO, SUSPENSO = range(len(FAMILIAS))
+FIM = 0x0F  # completa o fim de cada música, para que os últimos acordes também abram chaves
+
+# Graus romanos (I-V-vi-IV): maiúsculo = maior, minúsculo = menor; o sufixo
+# (°, ø, +, sus) escolhe outra família e extensões como 7 são ignoradas
+GRAUS_ROMANOS = {"I": 0, "II": 2, "III": 4, "IV": 5, "V": 7, "VI": 9, "VII": 11}
+_ROMANO = re.compile(r"([b#]?)(VII|VI|V|IV|III|II|I|vii|vi|v|iv|iii|ii|i)"
+                     r"(°|º|o|dim|ø|\+|aug|sus[24]?)?(?:maj7|M7|7M|7|9|11|13|6)?")
+_SUFIXOS_ROMANOS = {
+    "°": DIMINUTO, "º": DIMINUTO, "o": DIMINUTO, "dim": DIMINUTO, "ø": MEIO_DIMINUTO,
+    "+": AUMENTADO, "aug": AUMENTADO, "sus": SUSPENSO, "sus2": SUSPENSO, "sus4": SUSPENSO,
+}
+_SEPARADORES_ROMANOS = re.compile(r"[\s,|–—\-]+")
+_SEPARADORES_ACORDES = re.compile(r"[\s,|–—]+")
+
+MusicaIndexada = namedtuple("MusicaIndexada", ["nome", "carimbo", "relativos", "raizes", "linhas"])
+
+# Uma ocorrência da progressão: ``posicao`` é o índice do primeiro acorde na
+# sequência da música (repetições seguidas contam uma vez), ``linha`` começa
+# em 1, ``tonalidade`` é a tônica em que a progressão aparece e ``semitons``
+# a distância da progressão consultada até ela
+Ocorrencia = namedtuple("Ocorrencia", ["musica", "posicao", "linha", "tonalidade", "semitons"])
+
+AtualizacaoIndice = namedtuple("AtualizacaoIndice", ["adicionadas", "atualizadas", "removidas", "inalteradas", "erros"])
+
+
+def familia_graus(graus):
+    """Família de qualidade (índice em FAMILIAS) dos graus de um acorde"""
+    if '3' in graus:
+        return AUMENTADO if '#5' in graus else MAIOR
+    if 'b3' in graus:
+        if 'b5' in graus:
+            return MEIO_DIMINUTO if 'b7' in graus else DIMINUTO
+        return MENOR
+    if '2' in graus or '4' in graus:
+        return SUSPENSO
+    return MAIOR  # quinta (power chord)
+
+
+def _sequencia_relativa(raizes, familias):
+    """Família do primeiro acorde e, para cada seguinte, (intervalo << 4) | família"""
+    relativos = bytearray((familias[0],))
+    for anterior, raiz, familia in zip(raizes, raizes[1:], familias[1:]):
+        relativos.append((raiz - anterior) % 12 << 4 | familia)
+    return relativos
+
+
+def _nome_tonalidade(tonica, menor):
+    maior_relativa = (tonica + 3) % 12 if menor else tonica
+    nomes = NOTAS_BEMOIS if maior_relativa in TONICAS_COM_BEMOIS else NOTAS_SUSTENIDOS
+    return nomes[tonica] + ("m" if menor else "")
+
+
+def _ler_array(tipo, dados, inicio, quantidade):
+    valores = array(tipo)
+    fim = inicio + quantidade * valores.itemsize
+    valores.frombytes(dados[inicio:fim])
+    if sys.byteorder == "big":
+        valores.byteswap()
+    return valores, fim
+
+
+def _bytes_array(valores):
+    if sys.byteorder == "big":
+        valores = array(valores.typecode, valores)
+        valores.byteswap()
+    return valores.tobytes()
+
+
+class IndiceProgressoes:
+    """Índice de progressões independente de tonalidade
+
+    Cada música é guardada como a sequência de acordes já reduzida (fundamental
+    e família, sem repetições seguidas) e cada n-grama dessa sequência, em
+    intervalos, aponta para (música, posição). Buscar é consultar uma chave:
+    progressões do tamanho do n-grama saem direto da lista de ocorrências, as
+    mais curtas dos prefixos das chaves e as mais longas da chave mais rara,
+    conferindo o resto na sequência da música.
+    """
+
+    def __init__(self, tamanho_ngrama=TAMANHO_NGRAMA, transpositor=None):
+        if tamanho_ngrama < 2:
+            raise ValueError("O n-grama precisa de pelo menos 2 acordes")
+        self.tamanho_ngrama = tamanho_ngrama
+        self._cauda = bytes((FIM,)) * (tamanho_ngrama - 1)  # marcas de fim de cada música
+        self.transpositor = transpositor or TranspositorMusical()
+        self.musicas = []           # id -> MusicaIndexada (None nos ids livres)
+        self.ids = {}               # nome -> id
+        self.ocorrencias = {}       # chave -> array('Q') de (id << 32) | posição
+        self._livres = []
+        # Ocorrências lidas do arquivo (todas, limites): até a chave ser usada,
+        # ``ocorrencias`` guarda só o número dela e a lista é fatiada no primeiro uso
+        self._gravadas = None
+        self._ordenadas = None      # chaves em ordem para as buscas por prefixo
+        self._familias = CacheLimitado()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, nome):
+        return nome in self.ids
+
+    def nomes(self):
+        return sorted(self.ids)
+
+    def _familia(self, simbolo):
+        familia = self._familias.get(simbolo)
+        if familia is None:
+            familia = self._familias.guardar(
+                simbolo, familia_graus(self.transpositor.formula_acorde(simbolo)[1]))
+        return familia
+
+    def acordes_cifra(self, cifra):
+        """(fundamentais, famílias, linhas) dos acordes da cifra, sem repetições seguidas
+
+        Só as linhas de acordes contam, com a mesma classificação da transposição.
+        """
+        compilar = self.transpositor.compilar_cifra
+        raizes = []
+        familias = []
+        linhas = array('I')
+        anterior = None
+        for numero, linha in enumerate(cifra.splitlines(), 1):
+            for token in compilar(linha):
+                if not token.e_acorde:
+                    continue
+                acorde = (token.raiz, self._familia(token.simbolo))
+                if acorde == anterior:
+                    continue
+                anterior = acorde
+                raizes.append(acorde[0])
+                familias.append(acorde[1])
+                linhas.append(numero)
+        return raizes, familias, linhas
+
+    def _lista(self, chave):
+        """Ocorrências da chave (None se ela não existir)"""
+        lista = self.ocorrencias.get(chave)
+        if type(lista) is int:
+            todas, limites = self._gravadas
+            lista = self.ocorrencias[chave] = todas[limites[lista]:limites[lista + 1]]
+        return lista
+
+    def _chaves(self, relativos):
+        """Gera (posição, chave) de cada n-grama da sequência relativa de uma música"""
+        tamanho = self.tamanho_ngrama
+        # As n - 1 marcas de fim garantem uma chave para cada acorde da música
+        for posicao in range(len(relativos) - tamanho + 1):
+            yield posicao, bytes((relativos[posicao] & 0x0F,)) + relativos[posicao + 1:posicao + tamanho]
+
+    def adicionar(self, nome, cifra, carimbo=None):
+        """Indexa (ou reindexa) uma música; retorna quantos acordes ela tem
+
+        ``carimbo`` identifica a versão indexada (ex: mtime e tamanho do arquivo).
+        """
+        self.remover(nome, ausente_ok=True)
+        raizes, familias, linhas = self.acordes_cifra(cifra)
+        relativos = _sequencia_relativa(raizes, familias) if raizes else bytearray()
+        relativos.extend(self._cauda)
+        musica = MusicaIndexada(nome, carimbo, bytes(relativos), bytes(raizes), linhas)
+
+        if self._livres:
+            id_musica = self._livres.pop()
+            self.musicas[id_musica] = musica
+        else:
+            id_musica = len(self.musicas)
+            self.musicas.append(musica)
+        self.ids[nome] = id_musica
+
+        base = id_musica << 32
+        for posicao, chave in self._chaves(musica.relativos):
+            lista = self._lista(chave)
+            if lista is None:
+                lista = self.ocorrencias[chave] = array('Q')
+                self._ordenadas = None
+            lista.append(base | posicao)
+        return len(raizes)
+
+    def remover(self, nome, ausente_ok=False):
+        """Tira uma música do índice"""
+        id_musica = self.ids.pop(nome, None)
+        if id_musica is None:
+            if ausente_ok:
+                return
+            raise KeyError(nome)
+        musica = self.musicas[id_musica]
+        for chave in {chave for _, chave in self._chaves(musica.relativos)}:
+            restantes = array('Q', (valor for valor in self._lista(chave) if valor >> 32 != id_musica))
+            if restantes:
+                self.ocorrencias[chave] = restantes
+            else:
+                del self.ocorrencias[chave]
+                self._ordenadas = None
+        self.musicas[id_musica] = None
+        self._livres.append(id_musica)
+
+    def atualizar_diretorio(self, diretorio, extensoes=EXTENSOES_PADRAO):
+        """Deixa o índice igual às cifras do diretório, relendo só o que mudou
+
+        Arquivos novos ou com outro mtime/tamanho são reindexados e os que
+        sumiram do diretório saem do índice. Erros de leitura ficam em ``erros``.
+        """
+        adicionadas = atualizadas = inalteradas = 0
+        erros = []
+        vistos = set()
+        for nome, _ in listar_cifras(diretorio, extensoes):
+            vistos.add(nome)
+            completo = os.path.join(diretorio, nome)
+            try:
+                estado = os.stat(completo)
+                carimbo = (estado.st_mtime_ns, estado.st_size)
+                id_musica = self.ids.get(nome)
+                if id_musica is not None and self.musicas[id_musica].carimbo == carimbo:
+                    inalteradas += 1
+                    continue
+                with open(completo, "r", encoding="utf-8") as arquivo:
+                    cifra = arquivo.read()
+            except (OSError, UnicodeError) as e:
+                erros.append((nome, f"{type(e).__name__}: {e}"))
+                continue
+            self.adicionar(nome, cifra, carimbo)
+            if id_musica is None:
+                adicionadas += 1
+            else:
+                atualizadas += 1
+
+        removidas = [nome for nome in self.ids if nome not in vistos]
+        for nome in removidas:
+            self.remover(nome)
+        return AtualizacaoIndice(adicionadas, atualizadas, len(removidas), inalteradas, erros)
+
+    def _consulta(self, progressao):
+        """(fundamentais, famílias, tônica de referência, menor) da progressão consultada
+
+        Aceita graus romanos ('I V vi IV', 'ii-V-I', 'i bVII bVI V') ou acordes
+        ('C G Am F'), num texto ou numa lista.
+        """
+        if isinstance(progressao, str):
+            tokens = [t for t in _SEPARADORES_ROMANOS.split(progressao) if t]
+            if not tokens or not all(_ROMANO.fullmatch(t) for t in tokens):
+                tokens = [t for t in _SEPARADORES_ACORDES.split(progressao) if t.strip("-")]
+        else:
+            tokens = list(progressao)
+
+        acordes = []
+        romanos = [_ROMANO.fullmatch(t) for t in tokens]
+        if tokens and all(romanos):
+            tonica = 0
+            for acidente, numeral, sufixo in (romano.groups() for romano in romanos):
+                grau = (GRAUS_ROMANOS[numeral.upper()] + {"": 0, "b": -1, "#": 1}[acidente]) % 12
+                if sufixo:
+                    familia = _SUFIXOS_ROMANOS[sufixo]
+                else:
+                    familia = MAIOR if numeral.isupper() else MENOR
+                acordes.append((grau, familia))
+            menor = (0, MENOR) in acordes
+        else:
+            for token in tokens:
+                compilado = self.transpositor.compilar_acorde(token)
+                if not compilado.e_acorde:
+                    raise ErroTransposicao(f"Acorde ou grau inválido na progressão: {token}")
+                acordes.append((compilado.raiz, self._familia(token)))
+            tonica = acordes[0][0] if acordes else 0
+            menor = bool(acordes) and acordes[0][1] == MENOR
+
+        reduzidos = [acorde for i, acorde in enumerate(acordes) if i == 0 or acorde != acordes[i - 1]]
+        if len(reduzidos) < 2:
+            raise ErroTransposicao("A progressão precisa de pelo menos 2 acordes diferentes")
+        raizes, familias = zip(*reduzidos)
+        return raizes, familias, tonica, menor
+
+    def _chaves_com_prefixo(self, prefixo):
+        """Chaves que começam com o prefixo (busca binária nas chaves em ordem)"""
+        ordenadas = self._ordenadas
+        if ordenadas is None:
+            ordenadas = self._ordenadas = sorted(self.ocorrencias)
+        # Nenhum byte das chaves passa de 0xBF, então o sucessor do prefixo existe
+        inicio = bisect_left(ordenadas, prefixo)
+        fim = bisect_left(ordenadas, prefixo[:-1] + bytes((prefixo[-1] + 1,)), inicio)
+        return ordenadas[inicio:fim]
+
+    def _posicoes(self, relativos):
+        """Valores (id << 32) | posição de onde a sequência relativa começa"""
+        tamanho = self.tamanho_ngrama
+        if len(relativos) == tamanho:
+            return self._lista(bytes(relativos)) or ()
+        if len(relativos) < tamanho:
+            encontradas = array('Q')
+            for chave in self._chaves_com_prefixo(bytes(relativos)):
+                encontradas.extend(self._lista(chave))
+            return encontradas
+
+        # Mais longa que o n-grama: parte da chave mais rara e confere o resto
+        candidatas = None
+        deslocamento = 0
+        for inicio in range(len(relativos) - tamanho + 1):
+            chave = bytes((relativos[inicio] & 0x0F,)) + relativos[inicio + 1:inicio + tamanho]
+            lista = self._lista(chave) or ()
+            if candidatas is None or len(lista) < len(candidatas):
+                candidatas, deslocamento = lista, inicio
+        primeira = relativos[0]
+        resto = bytes(relativos[1:])
+        musicas = self.musicas
+        encontradas = array('Q')
+        for valor in candidatas:
+            posicao = (valor & 0xFFFFFFFF) - deslocamento
+            if posicao < 0:
+                continue
+            sequencia = musicas[valor >> 32].relativos
+            if sequencia[posicao] & 0x0F == primeira and sequencia[posicao + 1:posicao + len(relativos)] == resto:
+                encontradas.append(valor - deslocamento)
+        return encontradas
+
+    def buscar(self, progressao, limite=None):
+        """Ocorrências da progressão em qualquer tom, agrupadas por música
+
+        Ex: buscar('I V vi IV') ou buscar('Am F C G'). Com graus romanos a
+        tonalidade é a do grau I (ou i); com acordes, a do primeiro acorde.
+        """
+        raizes, familias, tonica, menor = self._consulta(progressao)
+        valores = sorted(self._posicoes(_sequencia_relativa(raizes, familias)))
+        if limite is not None:
+            valores = valores[:limite]
+
+        musicas = self.musicas
+        primeira = raizes[0]
+        tonalidades = [_nome_tonalidade((tonica + semitons) % 12, menor) for semitons in range(12)]
+        nova = tuple.__new__
+        resultado = []
+        for valor in valores:
+            musica = musicas[valor >> 32]
+            posicao = valor & 0xFFFFFFFF
+            semitons = (musica.raizes[posicao] - primeira) % 12
+            resultado.append(nova(Ocorrencia, (
+                musica.nome, posicao, musica.linhas[posicao], tonalidades[semitons], semitons)))
+        return resultado
+
+    def contar(self, progressao):
+        """(ocorrências, músicas) da progressão, sem montar a lista"""
+        raizes, familias, _, _ = self._consulta(progressao)
+        valores = self._posicoes(_sequencia_relativa(raizes, familias))
+        return len(valores), len({valor >> 32 for valor in valores})
+
+    def salvar(self, caminho):
+        """Grava o índice (num arquivo temporário trocado no fim, sem meio-termo)"""
+        musicas = self.musicas
+        nomes = [b"" if musica is None else musica.nome.encode("utf-8") for musica in musicas]
+        deslocamentos = array('I', accumulate((len(nome) for nome in nomes), initial=0))
+        carimbos = array('q')
+        linhas = array('I')
+        for musica in musicas:
+            if musica is None:
+                carimbos.extend(_LIVRE)
+            else:
+                carimbos.extend(_SEM_CARIMBO if musica.carimbo is None else musica.carimbo)
+                linhas.extend(musica.linhas)
+
+        chaves = self._ordenadas = self._ordenadas or sorted(self.ocorrencias)
+        listas = [self._lista(chave) for chave in chaves]
+        todas = array('Q')
+        for lista in listas:
+            todas.extend(lista)
+
+        partes = [
+            _CABECALHO.pack(MAGICO, VERSAO, VERSAO_TABELAS, self.tamanho_ngrama, 0, len(musicas), len(chaves)),
+            _bytes_array(deslocamentos), b"".join(nomes), _bytes_array(carimbos),
+            _bytes_array(array('I', (0 if musica is None else len(musica.raizes) for musica in musicas))),
+            b"".join(self._cauda if musica is None else musica.relativos for musica in musicas),
+            b"".join(b"" if musica is None else musica.raizes for musica in musicas),
+            _bytes_array(linhas), b"".join(chaves),
+            _bytes_array(array('I', (len(lista) for lista in listas))), _bytes_array(todas),
+        ]
+        temporario = caminho + ".tmp"
+        with open(temporario, "wb") as arquivo:
+            arquivo.writelines(partes)
+        os.replace(temporario, caminho)
+
+
+def carregar_indice(caminho, transpositor=None):
+    """Abre um índice gravado com IndiceProgressoes.salvar"""
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    if len(dados) < _CABECALHO.size:
+        raise ValueError(f"Índice vazio: {caminho}")
+    magico, versao, versao_tabelas, tamanho, _, quantidade, quantidade_chaves = _CABECALHO.unpack_from(dados)
+    if magico != MAGICO:
+        raise ValueError(f"Arquivo não é um índice de progressões: {caminho}")
+    if versao != VERSAO:
+        raise ValueError(f"Versão de índice não suportada: {versao}")
+    if versao_tabelas != VERSAO_TABELAS:
+        raise ValueError(f"Índice feito com outras regras de análise (tabelas v{versao_tabelas}); refaça-o")
+
+    indice = IndiceProgressoes(tamanho, transpositor)
+    try:
+        deslocamentos, pos = _ler_array('I', dados, _CABECALHO.size, quantidade + 1)
+        inicio_nomes, pos = pos, pos + deslocamentos[-1]
+        carimbos, pos = _ler_array('q', dados, pos, 2 * quantidade)
+        acordes, pos = _ler_array('I', dados, pos, quantidade)
+        inicio_relativos = pos
+        cauda = tamanho - 1
+        inicio_raizes = inicio_relativos + sum(acordes) + quantidade * cauda
+        linhas, pos = _ler_array('I', dados, inicio_raizes + sum(acordes), sum(acordes))
+
+        inicio_linhas = 0
+        for id_musica in range(quantidade):
+            nome = dados[inicio_nomes + deslocamentos[id_musica]:inicio_nomes + deslocamentos[id_musica + 1]]
+            n = acordes[id_musica]
+            carimbo = tuple(carimbos[2 * id_musica:2 * id_musica + 2])
+            if carimbo == _LIVRE:
+                indice.musicas.append(None)
+                indice._livres.append(id_musica)
+            else:
+                musica = MusicaIndexada(
+                    nome.decode("utf-8"), None if carimbo == _SEM_CARIMBO else carimbo,
+                    dados[inicio_relativos:inicio_relativos + n + cauda], dados[inicio_raizes:inicio_raizes + n],
+                    linhas[inicio_linhas:inicio_linhas + n],
+                )
+                indice.musicas.append(musica)
+                indice.ids[musica.nome] = id_musica
+            inicio_relativos += n + cauda
+            inicio_raizes += n
+            inicio_linhas += n
+
+        inicio_chaves, pos = pos, pos + quantidade_chaves * tamanho
+        quantidades, pos = _ler_array('I', dados, pos, quantidade_chaves)
+        todas, pos = _ler_array('Q', dados, pos, sum(quantidades))
+        if pos != len(dados):
+            raise ValueError
+        chaves = [dados[i:i + tamanho] for i in range(inicio_chaves, inicio_chaves + quantidade_chaves * tamanho, tamanho)]
+        indice.ocorrencias = dict(zip(chaves, range(quantidade_chaves)))
+        indice._gravadas = (todas, array('Q', accumulate(quantidades, initial=0)))
+        indice._ordenadas = chaves
+    except (IndexError, UnicodeError, ValueError):
+        raise ValueError(f"Índice corrompido: {caminho}") from None
+    return indice
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca progressões de acordes num cancioneiro, em qualquer tom")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_indexar = subcomandos.add_parser("indexar", help="Cria ou atualiza o índice de um diretório de cifras")
+    p_indexar.add_argument("indice", help=f"Arquivo do índice (ex: cancioneiro{EXTENSAO})")
+    p_indexar.add_argument("diretorio", help="Diretório de cifras")
+
+    p_buscar = subcomandos.add_parser("buscar", help="Procura uma progressão ('I V vi IV' ou 'C G Am F')")
+    p_buscar.add_argument("indice")
+    p_buscar.add_argument("progressao")
+    p_buscar.add_argument("-n", "--quantidade", type=int, default=20, help="Ocorrências mostradas (padrão: 20)")
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "indexar":
+        indice = IndiceProgressoes()
+        if os.path.exists(args.indice):
+            try:
+                indice = carregar_indice(args.indice)
+            except ValueError as e:
+                print(f"⚠️  {e}: o índice será refeito", file=sys.stderr)
+        inicio = time.perf_counter()
+        atualizacao = indice.atualizar_diretorio(args.diretorio)
+        indice.salvar(args.indice)
+        print(f"🗂️  {len(indice)} músicas no índice: {atualizacao.adicionadas} novas, "
+              f"{atualizacao.atualizadas} atualizadas, {atualizacao.removidas} removidas, "
+              f"{atualizacao.inalteradas} inalteradas ({time.perf_counter() - inicio:.2f}s)")
+        for nome, erro in atualizacao.erros:
+            print(f"❌ {nome}: {erro}", file=sys.stderr)
+        return 1 if atualizacao.erros else 0
+
+    indice = carregar_indice(args.indice)
+    inicio = time.perf_counter()
+    try:
+        ocorrencias, musicas = indice.contar(args.progressao)
+        primeiras = indice.buscar(args.progressao, args.quantidade)
+    except ErroTransposicao as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    decorrido = (time.perf_counter() - inicio) * 1000
+    print(f"🔎 {ocorrencias} ocorrências em {musicas} músicas ({decorrido:.1f} ms)")
+    for ocorrencia in primeiras:
+        print(f"{ocorrencia.musica}:{ocorrencia.linha}  em {ocorrencia.tonalidade}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
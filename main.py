@@ -4,123 +4,830 @@ Sistema de Transposição Musical Offline
 Controle totalmente local sem dependências externas
 """
 
+import time
+
+_INICIO_IMPORTACAO = time.perf_counter()
+
+import argparse
+import hashlib
 import json
+import marshal
 import os
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from collections.abc import Mapping
+from itertools import islice
 from datetime import datetime
+from types import MappingProxyType
+
+# Grafias das 12 classes de altura (índice = semitons a partir de Dó)
+NOTAS_SUSTENIDOS = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+NOTAS_BEMOIS = ('C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B')
+CLASSES_NATURAIS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+ALTERACOES = {'#': 1, 'b': -1}
+NOTAS_NATURAIS = ('C', 'D', 'E', 'F', 'G', 'A', 'B')
+
+# Nome da nota (com ou sem acidente) -> classe de altura
+INDICE_NOTAS = MappingProxyType({
+    letra + acidente: (classe + ALTERACOES.get(acidente, 0)) % 12
+    for letra, classe in CLASSES_NATURAIS.items()
+    for acidente in ('', '#', 'b')
+})
+
+# Deslocamento de oitava para notas que atravessam o Dó (Cb4 = B3, B#3 = C4)
+_AJUSTE_OITAVA = MappingProxyType({'Cb': -12, 'B#': 12})
+
+BEMOL_PARA_SUSTENIDO = MappingProxyType({'Db': 'C#', 'Eb': 'D#', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#'})
+SUSTENIDO_PARA_BEMOL = MappingProxyType({'C#': 'Db', 'D#': 'Eb', 'F#': 'Gb', 'G#': 'Ab', 'A#': 'Bb'})
+
+NOTAS_PORTUGUES = MappingProxyType({
+    'C': 'Dó', 'D': 'Ré', 'E': 'Mi', 'F': 'Fá',
+    'G': 'Sol', 'A': 'Lá', 'B': 'Si',
+    'C#': 'Dó#', 'D#': 'Ré#', 'F#': 'Fá#', 'G#': 'Sol#', 'A#': 'Lá#',
+    'Db': 'Réb', 'Eb': 'Mib', 'Gb': 'Solb', 'Ab': 'Láb', 'Bb': 'Sib'
+})
+
+# Tipos de acordes suportados
+TIPOS_ACORDES = MappingProxyType({
+    '': 'maior',
+    'm': 'menor',
+    '7': 'sétima',
+    'm7': 'menor sétima',
+    'maj7': 'sétima maior',
+    'dim': 'diminuto',
+    'aug': 'aumentado',
+    'sus2': 'suspenso 2ª',
+    'sus4': 'suspenso 4ª',
+    '6': 'sexta',
+    '9': 'nona',
+    # Grafias comuns nas cifras brasileiras
+    'M': 'maior',
+    'min': 'menor',
+    '-': 'menor',
+    '5': 'quinta (power chord)',
+    '4': 'suspenso 4ª',
+    'sus': 'suspenso 4ª',
+    '7M': 'sétima maior',
+    'M7': 'sétima maior',
+    '7+': 'sétima maior',
+    'maj': 'sétima maior',
+    'm7M': 'menor com sétima maior',
+    'm(7M)': 'menor com sétima maior',
+    'mM7': 'menor com sétima maior',
+    'm(maj7)': 'menor com sétima maior',
+    'min7': 'menor sétima',
+    '-7': 'menor sétima',
+    '°': 'diminuto',
+    'º': 'diminuto',
+    'dim7': 'diminuto com sétima',
+    '°7': 'diminuto com sétima',
+    'º7': 'diminuto com sétima',
+    'ø': 'meio-diminuto',
+    'ø7': 'meio-diminuto',
+    'm7b5': 'meio-diminuto',
+    'm7(b5)': 'meio-diminuto',
+    'm7(5-)': 'meio-diminuto',
+    '+': 'aumentado',
+    '5+': 'aumentado',
+    '(#5)': 'aumentado',
+    '7(#5)': 'sétima com quinta aumentada',
+    '7(5+)': 'sétima com quinta aumentada',
+    '7(b5)': 'sétima com quinta diminuta',
+    '7(5-)': 'sétima com quinta diminuta',
+    '7sus4': 'sétima suspenso 4ª',
+    '7(4)': 'sétima com quarta',
+    '7(11)': 'sétima com décima primeira',
+    '7(#11)': 'sétima com décima primeira aumentada',
+    '7(11+)': 'sétima com décima primeira aumentada',
+    '7(9)': 'sétima com nona',
+    '7/9': 'sétima com nona',
+    '7(b9)': 'sétima com nona menor',
+    '7(9-)': 'sétima com nona menor',
+    '7(#9)': 'sétima com nona aumentada',
+    '7(9+)': 'sétima com nona aumentada',
+    '7(13)': 'sétima com décima terceira',
+    '7(b13)': 'sétima com décima terceira menor',
+    '7M(9)': 'sétima maior com nona',
+    '7M(#11)': 'sétima maior com décima primeira aumentada',
+    'maj9': 'sétima maior com nona',
+    'm6': 'menor sexta',
+    'm(6)': 'menor sexta',
+    '6(9)': 'sexta com nona',
+    '6/9': 'sexta com nona',
+    'm6(9)': 'menor sexta com nona',
+    'add9': 'com nona adicionada',
+    '(9)': 'com nona adicionada',
+    '2': 'com nona adicionada',
+    'add11': 'com décima primeira adicionada',
+    'm(9)': 'menor com nona adicionada',
+    'madd9': 'menor com nona adicionada',
+    'm9': 'menor nona',
+    'm7(9)': 'menor sétima com nona',
+    'm7(11)': 'menor sétima com décima primeira',
+    'm11': 'menor décima primeira',
+    '11': 'décima primeira',
+    '13': 'décima terceira',
+})
+
+
+def _compilar_trie(tipos):
+    """Monta a árvore de prefixos das qualidades (caractere -> nó; None -> nome)"""
+    raiz = {}
+    for sufixo, nome in tipos.items():
+        no = raiz
+        for caractere in sufixo:
+            no = no.setdefault(caractere, {})
+        no[None] = nome
+    return raiz
+
+
+def qualidade_mais_longa(sufixo, trie=None):
+    """Maior qualidade conhecida no início do sufixo: (qualidade, nome)
+
+    Percorre a árvore uma única vez, em O(len(sufixo)).
+    """
+    no = _TRIE_QUALIDADES if trie is None else trie
+    encontrada = (0, no.get(None))
+    for posicao, caractere in enumerate(sufixo, 1):
+        no = no.get(caractere)
+        if no is None:
+            break
+        if None in no:
+            encontrada = (posicao, no[None])
+    tamanho, nome = encontrada
+    return sufixo[:tamanho], nome
+
+
+_TRIE_QUALIDADES = _compilar_trie(TIPOS_ACORDES)
+
+# Intervalos a partir da fundamental: nome -> (letras acima, semitons acima)
+INTERVALOS = MappingProxyType({
+    '1': (0, 0), 'b2': (1, 1), '2': (1, 2), '#2': (1, 3), 'b3': (2, 3), '3': (2, 4),
+    '4': (3, 5), '#4': (3, 6), 'b5': (4, 6), '5': (4, 7), '#5': (4, 8), 'b6': (5, 8),
+    '6': (5, 9), 'bb7': (6, 9), 'b7': (6, 10), '7': (6, 11),
+    'b9': (1, 1), '9': (1, 2), '#9': (1, 3), '11': (3, 5), '#11': (3, 6), 'b13': (5, 8), '13': (5, 9),
+})
+
+# Escalas e modos suportados, como graus a partir da tônica
+ESCALAS = MappingProxyType({
+    'maior': ('1', '2', '3', '4', '5', '6', '7'),
+    'dorico': ('1', '2', 'b3', '4', '5', '6', 'b7'),
+    'frigio': ('1', 'b2', 'b3', '4', '5', 'b6', 'b7'),
+    'lidio': ('1', '2', '3', '#4', '5', '6', '7'),
+    'mixolidio': ('1', '2', '3', '4', '5', '6', 'b7'),
+    'menor': ('1', '2', 'b3', '4', '5', 'b6', 'b7'),
+    'locrio': ('1', 'b2', 'b3', '4', 'b5', 'b6', 'b7'),
+    'menor_harmonica': ('1', '2', 'b3', '4', '5', 'b6', '7'),
+    'menor_melodica': ('1', '2', 'b3', '4', '5', '6', '7'),
+    'pentatonica_maior': ('1', '2', '3', '5', '6'),
+    'pentatonica_menor': ('1', 'b3', '4', '5', 'b7'),
+    'blues': ('1', 'b3', '4', 'b5', '5', 'b7'),
+})
+
+# Notas de cada qualidade de TIPOS_ACORDES (pelo nome), como graus a partir da fundamental
+FORMULAS_ACORDES = MappingProxyType({
+    'maior': ('1', '3', '5'),
+    'menor': ('1', 'b3', '5'),
+    'sétima': ('1', '3', '5', 'b7'),
+    'menor sétima': ('1', 'b3', '5', 'b7'),
+    'sétima maior': ('1', '3', '5', '7'),
+    'diminuto': ('1', 'b3', 'b5'),
+    'aumentado': ('1', '3', '#5'),
+    'suspenso 2ª': ('1', '2', '5'),
+    'suspenso 4ª': ('1', '4', '5'),
+    'sexta': ('1', '3', '5', '6'),
+    'nona': ('1', '3', '5', 'b7', '9'),
+    'quinta (power chord)': ('1', '5'),
+    'menor com sétima maior': ('1', 'b3', '5', '7'),
+    'diminuto com sétima': ('1', 'b3', 'b5', 'bb7'),
+    'meio-diminuto': ('1', 'b3', 'b5', 'b7'),
+    'sétima com quinta aumentada': ('1', '3', '#5', 'b7'),
+    'sétima com quinta diminuta': ('1', '3', 'b5', 'b7'),
+    'sétima suspenso 4ª': ('1', '4', '5', 'b7'),
+    'sétima com quarta': ('1', '4', '5', 'b7'),
+    'sétima com décima primeira': ('1', '3', '5', 'b7', '11'),
+    'sétima com décima primeira aumentada': ('1', '3', '5', 'b7', '#11'),
+    'sétima com nona': ('1', '3', '5', 'b7', '9'),
+    'sétima com nona menor': ('1', '3', '5', 'b7', 'b9'),
+    'sétima com nona aumentada': ('1', '3', '5', 'b7', '#9'),
+    'sétima com décima terceira': ('1', '3', '5', 'b7', '13'),
+    'sétima com décima terceira menor': ('1', '3', '5', 'b7', 'b13'),
+    'sétima maior com nona': ('1', '3', '5', '7', '9'),
+    'sétima maior com décima primeira aumentada': ('1', '3', '5', '7', '#11'),
+    'menor sexta': ('1', 'b3', '5', '6'),
+    'sexta com nona': ('1', '3', '5', '6', '9'),
+    'menor sexta com nona': ('1', 'b3', '5', '6', '9'),
+    'com nona adicionada': ('1', '3', '5', '9'),
+    'com décima primeira adicionada': ('1', '3', '5', '11'),
+    'menor com nona adicionada': ('1', 'b3', '5', '9'),
+    'menor nona': ('1', 'b3', '5', 'b7', '9'),
+    'menor sétima com nona': ('1', 'b3', '5', 'b7', '9'),
+    'menor sétima com décima primeira': ('1', 'b3', '5', 'b7', '11'),
+    'menor décima primeira': ('1', 'b3', '5', 'b7', '9', '11'),
+    'décima primeira': ('1', '3', '5', 'b7', '9', '11'),
+    'décima terceira': ('1', '3', '5', 'b7', '9', '13'),
+})
+
+_POSICAO_LETRA = MappingProxyType({letra: i for i, letra in enumerate(NOTAS_NATURAIS)})
+
+
+def grafar_graus(tonica, graus):
+    """Grafa os graus a partir da tônica, uma letra por grau (em F, 'b7' é Eb e não D#)"""
+    classe = INDICE_NOTAS[tonica]
+    posicao = _POSICAO_LETRA[tonica[0]]
+    notas = []
+    for grau in graus:
+        letras, semitons = INTERVALOS[grau]
+        letra = NOTAS_NATURAIS[(posicao + letras) % 7]
+        acidente = (classe + semitons - CLASSES_NATURAIS[letra]) % 12
+        if acidente > 6:
+            acidente -= 12
+        notas.append(letra + ('#' * acidente if acidente > 0 else 'b' * -acidente))
+    return tuple(notas)
+
+
+def compilar_tabelas_harmonicas():
+    """Monta as tabelas (escalas, notas_acordes) para todas as tônicas e qualidades
+
+    ``escalas`` é indexada por (tônica, modo), com a tônica grafada ('F#',
+    'Gb') ou como classe de altura (0-11); nesse caso vale a grafia com menos
+    acidentes. ``notas_acordes`` é indexada por (fundamental, nome da qualidade).
+    """
+    escalas = {}
+    notas_acordes = {}
+    # Sustenidos antes de bemóis: em empate (F# x Gb) fica a grafia com sustenido
+    tonicas = sorted(INDICE_NOTAS, key=lambda nota: (len(nota), nota.endswith('b')))
+    for modo, graus in ESCALAS.items():
+        melhores = {}
+        for tonica in tonicas:
+            escala = escalas[tonica, modo] = grafar_graus(tonica, graus)
+            acidentes = sum(len(nota) - 1 for nota in escala)
+            classe = INDICE_NOTAS[tonica]
+            if classe not in melhores or acidentes < melhores[classe][0]:
+                melhores[classe] = (acidentes, escala)
+        for classe, (_, escala) in melhores.items():
+            escalas[classe, modo] = escala
+    for nome, graus in FORMULAS_ACORDES.items():
+        for tonica in tonicas:
+            notas_acordes[tonica, nome] = grafar_graus(tonica, graus)
+    return MappingProxyType(escalas), MappingProxyType(notas_acordes)
+
+
+# Números MIDI válidos (C-1 = 0, C4 = 60, G9 = 127) e suas grafias
+MIDI_MAXIMO = 127
+NOMES_MIDI_SUSTENIDOS = tuple(f"{NOTAS_SUSTENIDOS[n % 12]}{n // 12 - 1}" for n in range(MIDI_MAXIMO + 1))
+NOMES_MIDI_BEMOIS = tuple(f"{NOTAS_BEMOIS[n % 12]}{n // 12 - 1}" for n in range(MIDI_MAXIMO + 1))
+
+# NumPy é opcional e caro de importar: só é procurado no primeiro lote de notas
+_NUMPY = None  # (módulo ou None,) depois da primeira tentativa
+
+
+def _numpy():
+    """Módulo NumPy, ou None se não estiver instalado (a importação é tentada uma vez)"""
+    global _NUMPY
+    if _NUMPY is None:
+        try:
+            import numpy
+        except ImportError:  # sem ele os lotes usam array.array
+            numpy = None
+        _NUMPY = (numpy,)
+    return _NUMPY[0]
+
+# Resultado de uma transposição em lote: ``fora_do_limite`` marca as posições
+# inválidas ou fora de 0-127 (cujas ``notas`` ficam como None)
+LoteNotas = namedtuple("LoteNotas", ["notas", "numeros", "fora_do_limite"])
+
+# Resultado de transpor_e_explicar: cifra transposta, deslocamento e explicação
+ResultadoTransposicao = namedtuple("ResultadoTransposicao", ["cifra", "semitons", "explicacao"])
+
+# Registro por token gerado por fluxo_transposicao
+TokenTransposto = namedtuple("TokenTransposto", ["original", "transposto", "explicacao"])
+
+
+TRANSPOSICOES = MappingProxyType({
+    'C': 0,   # Não transpositor
+    'Bb': -2, # Soa 1 tom abaixo
+    'Eb': -9, # Soa 1 tom e meio abaixo
+    'F': -7,  # Soa 5ª justa abaixo
+    'A': -3   # Soa 1 tom e meio abaixo
+})
+
+# Extensão aproximada dos instrumentos: da nota mais grave da afinação até duas
+# oitavas acima da mais aguda
+ALCANCE_ACIMA_AFINACAO = 24
+
+# Busca da melhor tonalidade: classes de altura das teclas pretas, tamanho da
+# armadura de cada tonalidade maior (C=0 ... B=11) e tônicas maiores grafadas
+# com bemóis (Db, Eb, F, Ab, Bb)
+TECLAS_PRETAS = frozenset((1, 3, 6, 8, 10))
+ARMADURAS = (0, 5, 2, 3, 4, 1, 6, 1, 4, 3, 2, 5)
+TONICAS_COM_BEMOIS = frozenset((1, 3, 5, 8, 10))
+
+# Peso de cada critério no custo de uma tonalidade (menor custo = melhor)
+PESOS_TONALIDADE = MappingProxyType({
+    "armadura": 1.0,        # acidentes na armadura da tonalidade (0-6)
+    "acidentes": 1.0,       # proporção de acordes/notas em teclas pretas
+    "extensao": 4.0,        # proporção de notas fora da extensão do instrumento
+    "formas_abertas": 1.5,  # proporção de acordes sem forma aberta (cordas)
+})
+
+# Uma opção de tonalidade avaliada por melhores_tonalidades
+OpcaoTonalidade = namedtuple("OpcaoTonalidade", [
+    "semitons", "tonalidade", "usar_bemois", "custo",
+    "armadura", "acidentes", "fora_da_extensao", "formas_abertas",
+])
+
+# Versão das regras de transposição/explicação. Deve ser incrementada sempre que
+# uma mudança no código alterar resultados, para invalidar caches persistentes.
+VERSAO_TABELAS = 3
+
+# Limite de símbolos distintos mantidos no cache de acordes compilados
+LIMITE_CACHE_ACORDES = 65536
+
+# Tamanho aproximado (em caracteres) de cada bloco lido/escrito nos arquivos
+TAMANHO_BLOCO = 1 << 20
+
+_PALAVRA_ESPACO = re.compile(r'(\S+)([ \t]*)')
+
+# Gramática dos símbolos de acorde aceitos (ex: C, F#m7, Bb7M, D7(9), A/C#, (Am))
+_NOTA = r"[A-G][#b]?"
+_GRAU = r"[#b+\-]?(?:2|4|5|6|7|9|11|13)"
+_QUALIDADE = (r"(?:maj|min|dim|aug|sus|add|no|m|M|º|°|ø|\+|-|" + _GRAU
+              + r"|\((?:" + _GRAU + r"|[/,+\-]|M|maj)+\))*")
+ACORDE_VALIDO = re.compile(rf"\(?{_NOTA}{_QUALIDADE}(?:/(?:{_NOTA}|{_GRAU}))*\)?")
+
+# Tokens que podem aparecer em linhas de acordes sem serem acordes
+_TOKEN_NEUTRO = re.compile(r"(?:[|:%/.\-]+|\(?[xX]?\d+[xX]?\)?|N\.?C\.?|[^\W\d_][\w-]*:)")
+
+# Linhas de tablatura (ex: e|---0---3---|) e títulos de seção (ex: [Refrão], Intro)
+_TABLATURA = re.compile(r"\s*[A-Ga-g]?[#b]?\s*[|:][-\d|:hpbrx/\\~().*\s]*-[-\d|:hpbrx/\\~().*\s]*")
+_SECAO = re.compile(
+    r"\s*(?:\[[^\]]+\]|\(?(?:intro(?:dução)?|refrão|refrao|pré-refrão|pre-refrao|ponte|verso|"
+    r"estrofe|solo|final|fim|coda|interlúdio|interludio|parte|primeira parte|segunda parte)"
+    r"\b[\w\s]*\)?:?)\s*", re.IGNORECASE)
+
+# Tipos de linha reconhecidos pelo classificador
+LINHA_VAZIA = "vazia"
+LINHA_ACORDES = "acordes"
+LINHA_LETRA = "letra"
+LINHA_TABLATURA = "tablatura"
+LINHA_SECAO = "secao"
+TIPOS_LINHA = (LINHA_ACORDES, LINHA_LETRA, LINHA_TABLATURA, LINHA_SECAO, LINHA_VAZIA)
+
+
+def e_simbolo_acorde(token):
+    """Indica se o token segue a gramática de símbolos de acorde"""
+    return ACORDE_VALIDO.fullmatch(token) is not None
+
+
+def classificar_linha(linha):
+    """Classifica uma linha de cifra como acordes, letra, tablatura, seção ou vazia
+
+    Uma linha é de acordes quando a maioria dos seus tokens (ignorando
+    marcações como '|', '(2x)' ou 'Intro:') são símbolos de acorde válidos.
+    """
+    tokens = linha.split()
+    if not tokens:
+        return LINHA_VAZIA
+    if _TABLATURA.fullmatch(linha.rstrip('\r\n')):
+        return LINHA_TABLATURA
+    
+    acordes = palavras = 0
+    limite = len(tokens) // 2
+    acorde_valido = ACORDE_VALIDO.fullmatch
+    neutro = _TOKEN_NEUTRO.fullmatch
+    for token in tokens:
+        if acorde_valido(token):
+            acordes += 1
+        elif not neutro(token):
+            palavras += 1
+            if palavras > limite:
+                break
+    
+    if acordes > palavras:
+        return LINHA_ACORDES
+    if _SECAO.fullmatch(linha.rstrip('\r\n')):
+        return LINHA_SECAO
+    return LINHA_LETRA
+
+
+def _analisar_segmento(segmento):
+    """Separa um segmento de acorde em (prefixo, classe de altura, resto)"""
+    for i in range(min(3, len(segmento))):
+        classe = CLASSES_NATURAIS.get(segmento[i])
+        if classe is not None:
+            fim = i + 1
+            if fim < len(segmento) and segmento[fim] in ALTERACOES:
+                classe += ALTERACOES[segmento[fim]]
+                fim += 1
+            return (segmento[:i], classe % 12, segmento[fim:])
+    return (segmento, None, "")
+
+
+class ErroTransposicao(ValueError):
+    """Entrada inválida para o transpositor (nota, oitava ou instrumento)"""
+
+
+class NotaInvalida(ErroTransposicao):
+    """Nota que não pode ser interpretada ou que sai dos limites"""
+
+
+class InstrumentoDesconhecido(ErroTransposicao, KeyError):
+    """Instrumento que não existe no catálogo (também é um KeyError)"""
+
+    def __str__(self):
+        return f"Instrumento desconhecido: {self.args[0]}"
+
+
+class CatalogoInvalido(ErroTransposicao):
+    """Arquivo de catálogo de instrumentos malformado"""
+
+
+class CacheLimitado:
+    """Memo compartilhado entre threads, com número máximo de entradas
+
+    As consultas (``get``) não usam trava. Ao atingir o limite, a metade mais
+    antiga é descartada numa cópia que substitui o dicionário de uma só vez,
+    então leitores concorrentes nunca veem um dicionário pela metade.
+    """
+
+    __slots__ = ("dados", "get", "limite", "_trava")
+
+    def __init__(self, limite=None):
+        self.limite = limite or LIMITE_CACHE_ACORDES
+        self._trava = threading.Lock()
+        self._trocar({})
+
+    def _trocar(self, dados):
+        self.dados = dados
+        self.get = dados.get
+
+    def guardar(self, chave, valor):
+        """Guarda o valor (se outra thread já guardou, devolve o dela)"""
+        if len(self.dados) >= self.limite:
+            with self._trava:
+                dados = self.dados
+                if len(dados) >= self.limite:
+                    copia = dados.copy()
+                    self._trocar(dict(islice(copia.items(), len(copia) // 2, None)))
+        return self.dados.setdefault(chave, valor)
+
+    def limpar(self):
+        with self._trava:
+            self._trocar({})
+
+    def __len__(self):
+        return len(self.dados)
+
+    def __contains__(self, chave):
+        return chave in self.dados
+
+
+# Catálogo de instrumentos padrão; a versão compilada fica ao lado, em __pycache__
+CAMINHO_CATALOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instrumentos.json")
+VERSAO_CATALOGO = 1
+FAMILIA_PADRAO = "outros"
+
+_NOTA_COM_OITAVA = re.compile(_NOTA + r"-?\d+")
+
+# Dados de altura de um instrumento, compilados no primeiro uso: números das
+# notas da afinação, deslocamento da tonalidade e extensão (MIDI)
+AlturasInstrumento = namedtuple("AlturasInstrumento", ["afinacao", "deslocamento", "grave", "agudo"])
+
+# Índices de um catálogo: entrada por id e por id ou apelido, ids por família
+# e por tonalidade, e as entradas na ordem do arquivo
+IndicesCatalogo = namedtuple("IndicesCatalogo", ["por_id", "por_nome", "familias", "tonalidades", "entradas"])
+
+
+def _instrumento(instrumento_id, nome, afinacao, tonalidade="C", familia=FAMILIA_PADRAO, apelidos=()):
+    return MappingProxyType({
+        "id": instrumento_id, "nome": nome, "familia": familia,
+        "afinacao": tuple(afinacao), "tonalidade": tonalidade, "apelidos": tuple(apelidos),
+    })
+
+
+def _validar_catalogo(dados, origem):
+    """Confere o JSON do catálogo e devolve as entradas como tuplas"""
+    if not isinstance(dados, dict) or not isinstance(dados.get("instrumentos"), list):
+        raise CatalogoInvalido(f"{origem}: esperado um objeto com a lista 'instrumentos'")
+    entradas = []
+    for posicao, item in enumerate(dados["instrumentos"]):
+        if not isinstance(item, dict):
+            raise CatalogoInvalido(f"{origem}: instrumento {posicao} não é um objeto")
+        try:
+            entrada = (item["id"], item["nome"], tuple(item["afinacao"]), item.get("tonalidade", "C"),
+                       item.get("familia", FAMILIA_PADRAO), tuple(item.get("apelidos", ())))
+        except KeyError as e:
+            raise CatalogoInvalido(f"{origem}: instrumento {posicao} sem o campo {e.args[0]!r}") from None
+        afinacao = entrada[2]
+        if not afinacao or not all(isinstance(nota, str) and _NOTA_COM_OITAVA.fullmatch(nota) for nota in afinacao):
+            raise CatalogoInvalido(f"{origem}: afinação inválida em {entrada[0]!r}")
+        if entrada[3] not in TRANSPOSICOES:
+            raise CatalogoInvalido(f"{origem}: tonalidade desconhecida em {entrada[0]!r}: {entrada[3]}")
+        entradas.append(entrada)
+    return tuple(entradas)
+
+
+def _caminho_cache_catalogo(caminho):
+    pasta, nome = os.path.split(caminho)
+    return os.path.join(pasta, "__pycache__", f"{nome}.{sys.implementation.cache_tag}.cache")
+
+
+def _ler_catalogo(caminho):
+    """Lê as entradas do catálogo JSON, usando a versão compilada se estiver em dia
+
+    A versão compilada (marshal) é refeita quando o JSON muda de data ou
+    tamanho; se não puder ser gravada, o catálogo é lido do JSON toda vez.
+    """
+    estado = os.stat(caminho)
+    origem = (VERSAO_CATALOGO, estado.st_mtime_ns, estado.st_size)
+    cache = _caminho_cache_catalogo(caminho)
+    try:
+        with open(cache, "rb") as arquivo:
+            cabecalho, entradas = marshal.loads(arquivo.read())
+        if cabecalho == origem:
+            return entradas
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+
+    with open(caminho, encoding="utf-8") as arquivo:
+        try:
+            dados = json.load(arquivo)
+        except ValueError as e:
+            raise CatalogoInvalido(f"{caminho}: JSON inválido ({e})") from None
+    entradas = _validar_catalogo(dados, caminho)
+    temporario = f"{cache}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open(temporario, "wb") as arquivo:
+            arquivo.write(marshal.dumps((origem, entradas)))
+        os.replace(temporario, cache)
+    except OSError:
+        pass
+    return entradas
+
+
+def _indexar_instrumentos(entradas):
+    """Monta os índices de um catálogo a partir das entradas (tuplas ou mapeamentos)"""
+    por_id = {}
+    por_nome = {}
+    familias = {}
+    tonalidades = {}
+    for entrada in entradas:
+        if not isinstance(entrada, Mapping):
+            entrada = _instrumento(*entrada)
+        instrumento_id = entrada["id"]
+        for nome in (instrumento_id,) + entrada["apelidos"]:
+            if nome in por_nome:
+                raise CatalogoInvalido(f"Id ou apelido de instrumento repetido: {nome}")
+            por_nome[nome] = entrada
+        por_id[instrumento_id] = entrada
+        familias.setdefault(entrada["familia"], []).append(instrumento_id)
+        tonalidades.setdefault(entrada["tonalidade"], []).append(instrumento_id)
+    return IndicesCatalogo(
+        MappingProxyType(por_id), MappingProxyType(por_nome),
+        MappingProxyType({familia: tuple(ids) for familia, ids in familias.items()}),
+        MappingProxyType({tonalidade: tuple(ids) for tonalidade, ids in tonalidades.items()}),
+        tuple(por_id.values()),
+    )
+
+
+class CatalogoInstrumentos(Mapping):
+    """Catálogo de instrumentos somente leitura, indexado por id, apelido, família e tonalidade
+
+    ``catalogo[nome]`` aceita o id ou um apelido ('sax_alto'); a iteração passa
+    só pelos ids. Com ``caminho``, o arquivo só é lido no primeiro acesso.
+    Alterações devolvem um catálogo novo (com_instrumento, sem_instrumento).
+    """
+
+    __slots__ = ("caminho", "_indices", "alturas", "compilado")
+
+    def __init__(self, entradas=(), caminho=None):
+        self.caminho = caminho
+        self._indices = None if caminho is not None else _indexar_instrumentos(entradas)
+        # id -> AlturasInstrumento, preenchido sob demanda pelo transpositor
+        self.alturas = {}
+        # Matriz de intervalos compilada (ver TranspositorMusical._compilar_catalogo)
+        self.compilado = None
+
+    @property
+    def indices(self):
+        indices = self._indices
+        if indices is None:
+            indices = self._indices = _indexar_instrumentos(_ler_catalogo(self.caminho))
+        return indices
+
+    def __getitem__(self, nome):
+        return self.indices.por_nome[nome]
+
+    def __iter__(self):
+        return iter(self.indices.por_id)
+
+    def __len__(self):
+        return len(self.indices.por_id)
+
+    def __contains__(self, nome):
+        return nome in self.indices.por_nome
+
+    def get(self, nome, padrao=None):
+        return self.indices.por_nome.get(nome, padrao)
+
+    def resolver(self, nome):
+        """Id do instrumento a partir do id ou de um apelido (None se não existir)"""
+        entrada = self.indices.por_nome.get(nome)
+        return None if entrada is None else entrada["id"]
+
+    def listar(self, familia=None, tonalidade=None):
+        """Entradas do catálogo (opcionalmente de uma família e/ou tonalidade), sem cópias"""
+        indices = self.indices
+        if familia is None and tonalidade is None:
+            return indices.entradas
+        if familia is None:
+            ids = indices.tonalidades.get(tonalidade, ())
+        else:
+            ids = indices.familias.get(familia, ())
+            if tonalidade is not None:
+                ids = [i for i in ids if indices.por_id[i]["tonalidade"] == tonalidade]
+        return tuple(indices.por_id[i] for i in ids)
+
+    def familias(self):
+        return tuple(self.indices.familias)
+
+    def com_instrumento(self, entrada):
+        """Novo catálogo com o instrumento incluído (ou substituído no mesmo lugar)"""
+        entradas = [entrada if atual["id"] == entrada["id"] else atual for atual in self.indices.entradas]
+        if entrada["id"] not in self.indices.por_id:
+            entradas.append(entrada)
+        return CatalogoInstrumentos(entradas)
+
+    def sem_instrumento(self, instrumento_id):
+        """Novo catálogo sem o instrumento (e sem os apelidos dele)"""
+        return CatalogoInstrumentos(atual for atual in self.indices.entradas if atual["id"] != instrumento_id)
+
+
+# Catálogos carregados de arquivos, compartilhados por caminho
+_catalogos = {}
+
+
+def carregar_catalogo(caminho=CAMINHO_CATALOGO):
+    """Catálogo de um arquivo JSON, compartilhado entre instâncias e lido no primeiro acesso"""
+    caminho = os.path.abspath(caminho)
+    catalogo = _catalogos.get(caminho)
+    if catalogo is None:
+        catalogo = _catalogos.setdefault(caminho, CatalogoInstrumentos(caminho=caminho))
+    return catalogo
+
+
+INSTRUMENTOS_PADRAO = carregar_catalogo()
+
+
+class AcordeCompilado:
+    """Representação intermediária de um símbolo de acorde já analisado
+
+    Guarda os segmentos separados por '/' e a tabela com as 24 grafias
+    possíveis (12 transposições x sustenidos/bemóis), de modo que
+    transpor o símbolo é apenas uma consulta em ``grafias``.
+    """
+
+    __slots__ = ("simbolo", "segmentos", "grafias", "e_acorde")
+
+    def __init__(self, simbolo, literal=False):
+        self.simbolo = simbolo
+        self.e_acorde = not literal and ACORDE_VALIDO.fullmatch(simbolo) is not None
+
+        if self.e_acorde:
+            self.segmentos = tuple(_analisar_segmento(parte) for parte in simbolo.split('/'))
+            grafias = []
+            for nomes in (NOTAS_SUSTENIDOS, NOTAS_BEMOIS):
+                for semitons in range(12):
+                    grafias.append('/'.join(
+                        prefixo + nomes[(classe + semitons) % 12] + resto
+                        if classe is not None else prefixo
+                        for prefixo, classe, resto in self.segmentos
+                    ))
+            self.grafias = tuple(grafias)
+        else:
+            # Palavras que não são acordes passam inalteradas
+            self.segmentos = ((simbolo, None, ""),)
+            self.grafias = (simbolo,) * 24
+
+    @property
+    def raiz(self):
+        """Classe de altura (0-11) da nota fundamental, ou None"""
+        return self.segmentos[0][1]
+
+    @property
+    def qualidade(self):
+        """Sufixo de qualidade do acorde (ex: 'm7', 'sus4')"""
+        return self.segmentos[0][2]
+
+    @property
+    def baixo(self):
+        """Classe de altura do baixo em acordes com barra, ou None"""
+        if len(self.segmentos) > 1:
+            return self.segmentos[1][1]
+        return None
+
+    def transpor(self, semitons, usar_bemois=False):
+        """Consulta a grafia transposta na tabela pré-calculada"""
+        return self.grafias[semitons % 12 + (12 if usar_bemois else 0)]
+
 
 class TranspositorMusical:
-    def __init__(self):
-        # Notas musicais naturais e acidentadas
-        self.notas = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        self.notas_naturais = ['C', 'D', 'E', 'F', 'G', 'A', 'B']
-        self.notas_portugues = {
-            'C': 'Dó', 'D': 'Ré', 'E': 'Mi', 'F': 'Fá', 
-            'G': 'Sol', 'A': 'Lá', 'B': 'Si',
-            'C#': 'Dó#', 'D#': 'Ré#', 'F#': 'Fá#', 'G#': 'Sol#', 'A#': 'Lá#',
-            'Db': 'Réb', 'Eb': 'Mib', 'Gb': 'Solb', 'Ab': 'Láb', 'Bb': 'Sib'
-        }
-        
-        # Tipos de acordes suportados
-        self.tipos_acordes = {
-            '': 'maior',
-            'm': 'menor',
-            '7': 'sétima',
-            'm7': 'menor sétima',
-            'maj7': 'sétima maior',
-            'dim': 'diminuto',
-            'aug': 'aumentado',
-            'sus2': 'suspenso 2ª',
-            'sus4': 'suspenso 4ª',
-            '6': 'sexta',
-            '9': 'nona'
-        }
+    """Transpõe notas, acordes e cifras entre instrumentos
+
+    Uma instância pode ser usada por várias threads ao mesmo tempo: as tabelas
+    são imutáveis, os caches são CacheLimitado compartilhados e cada alteração
+    do catálogo publica um novo mapeamento imutável. Só o perfil de
+    desempenho (ativar_perfil) não deve ser compartilhado entre threads.
+    """
+
+    # Tabelas imutáveis compartilhadas por todas as instâncias
+    notas = NOTAS_SUSTENIDOS
+    notas_naturais = NOTAS_NATURAIS
+    notas_portugues = NOTAS_PORTUGUES
+    tipos_acordes = TIPOS_ACORDES
+    transposicoes = TRANSPOSICOES
+    
+    # Cache de símbolos já compilados (símbolo -> AcordeCompilado), compartilhado
+    _acordes_compilados = CacheLimitado()
+    
+    # Palavras de linhas que não são de acordes, mantidas literalmente
+    _literais = CacheLimitado()
+    
+    # Explicações já montadas (símbolo -> texto, '' se não for acorde)
+    _explicacoes = CacheLimitado()
+    _trie_qualidades = _TRIE_QUALIDADES
+    
+    # (escalas, notas_acordes) de compilar_tabelas_harmonicas, montadas no primeiro uso
+    _tabelas_harmonicas = None
+    
+    # Notas de acordes já consultados (símbolo -> notas, () se não for acorde)
+    _notas_acordes = CacheLimitado()
+    
+    __slots__ = ("instrumentos", "versao_catalogo", "_catalogo_compilado", "perfil")
+
+    def __init__(self, catalogo=None):
+        # O catálogo é sempre somente leitura; alterações publicam uma cópia nova.
+        # ``catalogo`` é um CatalogoInstrumentos ou o caminho de um arquivo JSON.
+        if catalogo is None:
+            catalogo = INSTRUMENTOS_PADRAO
+        elif not isinstance(catalogo, CatalogoInstrumentos):
+            catalogo = carregar_catalogo(catalogo)
+        self.instrumentos = catalogo
         
-        self.instrumentos = {
-            # Cordas
-            "violao": {"nome": "Violão", "afinacao": ["E2", "A2", "D3", "G3", "B3", "E4"], "tonalidade": "C"},
-            "guitarra": {"nome": "Guitarra", "afinacao": ["E2", "A2", "D3", "G3", "B3", "E4"], "tonalidade": "C"},
-            "baixo": {"nome": "Baixo", "afinacao": ["E1", "A1", "D2", "G2"], "tonalidade": "C"},
-            "ukulele_soprano": {"nome": "Ukulele Soprano", "afinacao": ["G4", "C4", "E4", "A4"], "tonalidade": "C"},
-            "violino": {"nome": "Violino", "afinacao": ["G3", "D4", "A4", "E5"], "tonalidade": "C"},
-            
-            # Madeiras
-            "flauta_transversal": {"nome": "Flauta Transversal", "afinacao": ["C4"], "tonalidade": "C"},
-            "clarineta_sib": {"nome": "Clarineta Sib", "afinacao": ["D3"], "tonalidade": "Bb"},
-            "saxofone_alto": {"nome": "Saxofone Alto", "afinacao": ["Db3"], "tonalidade": "Eb"},
-            "saxofone_tenor": {"nome": "Saxofone Tenor", "afinacao": ["Ab2"], "tonalidade": "Bb"},
-            "oboe": {"nome": "Oboé", "afinacao": ["C4"], "tonalidade": "C"},
-            
-            # Metais
-            "trompete_sib": {"nome": "Trompete Sib", "afinacao": ["C4"], "tonalidade": "Bb"},
-            "trompa_fa": {"nome": "Trompa em Fá", "afinacao": ["F2"], "tonalidade": "F"},
-            "trombone": {"nome": "Trombone", "afinacao": ["E2"], "tonalidade": "C"},
-            "tuba_sib": {"nome": "Tuba Sib", "afinacao": ["Bb1"], "tonalidade": "Bb"},
-        }
+        # Catálogo compilado: matriz NxN de intervalos entre instrumentos.
+        # É reconstruída sob demanda sempre que a versão do catálogo muda.
+        self.versao_catalogo = 0
+        self._catalogo_compilado = None
         
-        self.transposicoes = {
-            'C': 0,   # Não transpositor
-            'Bb': -2, # Soa 1 tom abaixo
-            'Eb': -9, # Soa 1 tom e meio abaixo
-            'F': -7,  # Soa 5ª justa abaixo
-            'A': -3   # Soa 1 tom e meio abaixo
-        }
+        # Instrumentação opcional (ver ativar_perfil)
+        self.perfil = None
 
     def nota_para_numero(self, nota):
         """Converte nota para número sequencial"""
-        nota = self._converter_bemol_para_sustenido(nota)
-        
-        # Extrai nome da nota e oitava
-        nome_nota = ""
-        oitava = ""
-        
-        for char in nota:
-            if char.isdigit() or char == '-':
-                oitava += char
-            else:
-                nome_nota += char
+        # Separa nome da nota e oitava
+        inicio_oitava = len(nota.rstrip('0123456789-'))
+        nome_nota = nota[:inicio_oitava]
+        oitava = nota[inicio_oitava:]
         
         if not oitava:
-            raise ValueError(f"Nota inválida: {nota}")
+            raise NotaInvalida(f"Nota inválida: {nota}")
         
-        oitava = int(oitava)
+        classe = INDICE_NOTAS.get(nome_nota)
+        if classe is None:
+            raise NotaInvalida(f"Nota inválida: {nome_nota}")
         
         try:
-            indice_nota = self.notas.index(nome_nota)
+            oitava = int(oitava)
         except ValueError:
-            raise ValueError(f"Nota inválida: {nome_nota}")
+            raise NotaInvalida(f"Nota inválida: {nota}") from None
         
-        return oitava * 12 + indice_nota
+        return oitava * 12 + classe + _AJUSTE_OITAVA.get(nome_nota, 0)
 
     def _converter_bemol_para_sustenido(self, nota):
         """Converte bemóis para sustenidos equivalentes"""
-        conversoes = {
-            'Db': 'C#', 'Eb': 'D#', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#'
-        }
-        for bemol, sustenido in conversoes.items():
+        for bemol, sustenido in BEMOL_PARA_SUSTENIDO.items():
             if bemol in nota:
                 return nota.replace(bemol, sustenido)
         return nota
 
     def _converter_sustenido_para_bemol(self, nota):
         """Converte sustenidos para bemóis equivalentes"""
-        conversoes = {
-            'C#': 'Db', 'D#': 'Eb', 'F#': 'Gb', 'G#': 'Ab', 'A#': 'Bb'
-        }
-        for sustenido, bemol in conversoes.items():
+        for sustenido, bemol in SUSTENIDO_PARA_BEMOL.items():
             if sustenido in nota:
                 return nota.replace(sustenido, bemol)
         return nota
 
     def numero_para_nota(self, numero, usar_bemois=False):
         """Converte número sequencial para nota"""
-        oitava = numero // 12
-        indice_nota = numero % 12
-        
-        nota = self.notas[indice_nota]
-        if usar_bemois:
-            nota = self._converter_sustenido_para_bemol(nota)
-        
-        return f"{nota}{oitava}"
+        oitava, indice_nota = divmod(numero, 12)
+        nomes = NOTAS_BEMOIS if usar_bemois else NOTAS_SUSTENIDOS
+        return f"{nomes[indice_nota]}{oitava}"
 
     def converter_nota_portugues(self, nota_ingles):
         """Converte nota do inglês para português"""
@@ -129,37 +836,110 @@ class TranspositorMusical:
         return self.notas_portugues.get(nota_base, nota_ingles)
 
     def explicar_acorde(self, acorde):
-        """Explica a composição de um acorde"""
-        if not any(note in acorde for note in self.notas_naturais):
-            return None
-        
-        # Encontra a nota base
-        nota_base = ""
-        resto = acorde
-        for i in range(min(2, len(acorde))):
-            if acorde[i] in self.notas_naturais:
-                if i + 1 < len(acorde) and acorde[i + 1] in ['#', 'b']:
-                    nota_base = acorde[i:i+2]
-                    resto = acorde[i+2:]
-                else:
-                    nota_base = acorde[i]
-                    resto = acorde[i+1:]
-                break
-        
-        if not nota_base:
+        """Explica a composição de um acorde (ex: 'Am7/G' -> 'Lá menor sétima com baixo em Sol')"""
+        explicacao = self._explicacoes.get(acorde)
+        if explicacao is None:
+            explicacao = self._explicacoes.guardar(acorde, self._explicar(acorde))
+        return explicacao or None
+
+    def _analisar_acorde(self, acorde):
+        """Divide um símbolo em (fundamental, nome da qualidade, sobra, barra, baixo)
+
+        Retorna None se o símbolo não for um acorde.
+        """
+        if ACORDE_VALIDO.fullmatch(acorde) is None:
             return None
+        # Parênteses de cada lado são independentes ('(C G Am F)' tem '(C' e 'F)');
+        # o ')' final só sai se não fechar uma extensão, como em 'D7(9)'
+        if acorde.startswith('('):
+            acorde = acorde[1:]
+        if acorde.endswith(')') and acorde.count('(') < acorde.count(')'):
+            acorde = acorde[:-1]
         
-        # Identifica o tipo de acorde
-        tipo_acorde = ""
-        for tipo in self.tipos_acordes.keys():
-            if resto.startswith(tipo):
-                tipo_acorde = tipo
-                break
+        tamanho_nota = 2 if acorde[1:2] in ALTERACOES else 1
+        nota_base, resto = acorde[:tamanho_nota], acorde[tamanho_nota:]
         
-        explicacao = self.tipos_acordes.get(tipo_acorde, "desconhecido")
-        nota_pt = self.converter_nota_portugues(nota_base)
+        # Qualidade mais longa conhecida; o que sobrar é baixo ou extensão extra
+        qualidade, nome = qualidade_mais_longa(resto, self._trie_qualidades)
+        sobra, barra, baixo = resto[len(qualidade):].partition('/')
+        return nota_base, nome, sobra, barra, baixo
+
+    def _explicar(self, acorde):
+        """Monta a explicação de um símbolo ainda não visto ('' se não for acorde)"""
+        partes_acorde = self._analisar_acorde(acorde)
+        if partes_acorde is None:
+            return ''
+        nota_base, nome, sobra, barra, baixo = partes_acorde
         
-        return f"{nota_pt} {explicacao}"
+        partes = [self.converter_nota_portugues(nota_base), nome]
+        if sobra:
+            partes.append(sobra)
+        if barra:
+            if baixo in INDICE_NOTAS:
+                partes.append(f"com baixo em {self.converter_nota_portugues(baixo)}")
+            else:
+                partes.append('/' + baixo)
+        return ' '.join(partes)
+
+    @staticmethod
+    def _harmonia():
+        """Tabelas (escalas, notas_acordes), montadas uma única vez por processo"""
+        tabelas = TranspositorMusical._tabelas_harmonicas
+        if tabelas is None:
+            tabelas = TranspositorMusical._tabelas_harmonicas = compilar_tabelas_harmonicas()
+        return tabelas
+
+    def escala(self, tonica, modo="maior"):
+        """Notas de uma escala ou modo de ESCALAS, com uma letra por grau
+
+        ``tonica`` é um nome de nota ('F#', 'Gb') ou uma classe de altura (0-11).
+        """
+        escala = self._harmonia()[0].get((tonica, modo))
+        if escala is None:
+            if modo not in ESCALAS:
+                raise ErroTransposicao(f"Escala desconhecida: {modo}")
+            raise NotaInvalida(f"Nota inválida: {tonica}")
+        return escala
+
+    def notas_acorde(self, acorde):
+        """Notas de um acorde a partir do baixo (ex: 'Am7/G' -> ('G', 'A', 'C', 'E'))
+
+        Com baixo, o acorde é invertido se o baixo for uma de suas notas; senão
+        o baixo é acrescentado antes. Retorna None se não for um acorde.
+        """
+        notas = self._notas_acordes.get(acorde)
+        if notas is None:
+            notas = self._notas_acordes.guardar(acorde, self._montar_notas(acorde))
+        return notas or None
+
+    def formula_acorde(self, acorde):
+        """(fundamental, graus da qualidade, baixo ou None) de um acorde, ou None
+
+        Ex: 'Am7/G' -> ('A', ('1', 'b3', '5', 'b7'), 'G').
+        """
+        partes_acorde = self._analisar_acorde(acorde)
+        if partes_acorde is None:
+            return None
+        nota_base, nome, _, _, baixo = partes_acorde
+        if nota_base not in INDICE_NOTAS:
+            raise ErroTransposicao(f"Fundamental inválida no acorde: {acorde}")
+        return nota_base, FORMULAS_ACORDES[nome], baixo if baixo in INDICE_NOTAS else None
+
+    def _montar_notas(self, acorde):
+        partes_acorde = self._analisar_acorde(acorde)
+        if partes_acorde is None:
+            return ()
+        nota_base, nome, _, _, baixo = partes_acorde
+        notas = self._harmonia()[1].get((nota_base, nome))
+        if notas is None:
+            raise ErroTransposicao(f"Fundamental inválida no acorde: {acorde}")
+        if baixo in INDICE_NOTAS:
+            if baixo in notas:
+                posicao = notas.index(baixo)
+                notas = notas[posicao:] + notas[:posicao]
+            else:
+                notas = (baixo,) + notas
+        return notas
 
     def transpor_nota(self, nota, semitons, usar_bemois=False):
         """Transpõe uma nota individual"""
@@ -167,147 +947,905 @@ class TranspositorMusical:
         nova_nota_numero = numero + semitons
         
         if nova_nota_numero < 0:
-            raise ValueError("Transposição resulta em nota abaixo do limite")
+            raise NotaInvalida("Transposição resulta em nota abaixo do limite")
         
         return self.numero_para_nota(nova_nota_numero, usar_bemois)
 
+    def notas_para_numeros(self, notas):
+        """Converte uma sequência de notas em um array de números MIDI
+
+        Cada grafia distinta é analisada uma única vez. Notas inválidas
+        viram -1, que ``transpor_numeros`` marca como fora do limite.
+        """
+        conhecidas = {}
+        numeros = array('h')
+        anexar = numeros.append
+        for nota in notas:
+            numero = conhecidas.get(nota)
+            if numero is None:
+                try:
+                    numero = self.nota_para_numero(nota) + 12
+                except ValueError:
+                    numero = -1
+                if not 0 <= numero <= MIDI_MAXIMO:
+                    numero = -1
+                conhecidas[nota] = numero
+            anexar(numero)
+        return numeros
+
+    def transpor_numeros(self, numeros, semitons):
+        """Soma ``semitons`` a todos os números MIDI de uma vez
+
+        Retorna (numeros_transpostos, fora_do_limite) como array('h') e
+        array('B'). Com NumPy (ver _numpy) a soma e a máscara são
+        vetorizadas. Deslocamentos maiores que a faixa MIDI são limitados a
+        ela: todas as notas já ficam fora do limite.
+        """
+        semitons = max(-2 * MIDI_MAXIMO, min(int(semitons), 2 * MIDI_MAXIMO))
+        np = _numpy()
+        if np is not None:
+            origem = np.asarray(numeros, dtype=np.int16)
+            transpostos = origem + np.int16(semitons)
+            fora = (origem < 0) | (transpostos < 0) | (transpostos > MIDI_MAXIMO)
+            return array('h', transpostos.tobytes()), array('B', fora.astype(np.uint8).tobytes())
+        
+        transpostos = array('h', [numero + semitons for numero in numeros])
+        fora = array('B', [
+            numero < 0 or not 0 <= novo <= MIDI_MAXIMO
+            for numero, novo in zip(numeros, transpostos)
+        ])
+        return transpostos, fora
+
+    def numeros_para_notas(self, numeros, usar_bemois=False, fora_do_limite=None):
+        """Converte números MIDI em nomes de notas (None nas posições inválidas)"""
+        nomes = NOMES_MIDI_BEMOIS if usar_bemois else NOMES_MIDI_SUSTENIDOS
+        if fora_do_limite is None:
+            return [nomes[n] if 0 <= n <= MIDI_MAXIMO else None for n in numeros]
+        return [None if fora else nomes[n] for n, fora in zip(numeros, fora_do_limite)]
+
+    def transpor_notas(self, notas, semitons, usar_bemois=False):
+        """Transpõe uma sequência de notas em lote sem interromper nas inválidas"""
+        numeros = self.notas_para_numeros(notas)
+        transpostos, fora = self.transpor_numeros(numeros, semitons)
+        return LoteNotas(self.numeros_para_notas(transpostos, usar_bemois, fora), transpostos, fora)
+
+    def _dados_instrumento(self, instrumento_id):
+        try:
+            return self.instrumentos[instrumento_id]
+        except KeyError:
+            raise InstrumentoDesconhecido(instrumento_id) from None
+
+    def alturas_instrumento(self, instrumento_id):
+        """Dados de altura do instrumento, compilados uma vez por catálogo"""
+        catalogo = self.instrumentos
+        instrumento = self._dados_instrumento(instrumento_id)
+        alturas = catalogo.alturas.get(instrumento["id"])
+        if alturas is None:
+            numeros = tuple(self.nota_para_numero(nota) for nota in instrumento["afinacao"])
+            alturas = AlturasInstrumento(
+                numeros, self.transposicoes.get(instrumento["tonalidade"], 0),
+                min(numeros) + 12, max(numeros) + 12 + ALCANCE_ACIMA_AFINACAO,
+            )
+            catalogo.alturas[instrumento["id"]] = alturas
+        return alturas
+
     def calcular_transposicao_instrumento(self, instrumento_id):
         """Calcula semitons de transposição para instrumento"""
-        instrumento = self.instrumentos[instrumento_id]
-        tonalidade = instrumento["tonalidade"]
-        return self.transposicoes.get(tonalidade, 0)
+        return self.alturas_instrumento(instrumento_id).deslocamento
 
-    def calcular_diferenca_afinacao(self, instrumento_origem_id, instrumento_destino_id):
-        """Calcula diferença em semitons entre instrumentos"""
+    def _diferenca_afinacao_direta(self, instrumento_origem_id, instrumento_destino_id):
+        """Calcula a diferença em semitons analisando as afinações (sem cache)"""
         trans_origem = self.calcular_transposicao_instrumento(instrumento_origem_id)
         trans_destino = self.calcular_transposicao_instrumento(instrumento_destino_id)
         
         # Usa primeira corda/nota como referência
-        instr_origem = self.instrumentos[instrumento_origem_id]
-        instr_destino = self.instrumentos[instrumento_destino_id]
+        afinacao_origem = self.alturas_instrumento(instrumento_origem_id).afinacao
+        afinacao_destino = self.alturas_instrumento(instrumento_destino_id).afinacao
         
-        if instr_origem["afinacao"] and instr_destino["afinacao"]:
-            corda_origem = instr_origem["afinacao"][0]
-            corda_destino = instr_destino["afinacao"][0]
-            
-            num_origem = self.nota_para_numero(corda_origem)
-            num_destino = self.nota_para_numero(corda_destino)
-            
-            diferenca_afinacao = num_destino - num_origem
+        if afinacao_origem and afinacao_destino:
+            diferenca_afinacao = afinacao_destino[0] - afinacao_origem[0]
         else:
             diferenca_afinacao = 0
         
         return diferenca_afinacao + (trans_destino - trans_origem)
 
-    def transpor_acorde(self, acorde, semitons, usar_bemois=False):
-        """Transpõe um acorde"""
-        # Padrão para acordes complexos
-        if '/' in acorde:
-            partes = acorde.split('/')
-            acorde_base = self._transpor_acorde_simples(partes[0], semitons, usar_bemois)
-            baixo = self._transpor_acorde_simples(partes[1], semitons, usar_bemois)
-            return f"{acorde_base}/{baixo}"
-        else:
-            return self._transpor_acorde_simples(acorde, semitons, usar_bemois)
-
-    def _transpor_acorde_simples(self, acorde, semitons, usar_bemois):
-        """Transpõe um acorde simples (sem baixo)"""
-        if not any(note in acorde for note in self.notas_naturais):
-            return acorde
-        
-        # Encontra a nota base do acorde
-        nota_base = ""
-        resto = acorde
-        
-        for i in range(min(3, len(acorde))):
-            if acorde[i] in self.notas_naturais:
-                if i + 1 < len(acorde) and acorde[i + 1] in ['#', 'b']:
-                    nota_base = acorde[i:i+2]
-                    resto = acorde[i+2:]
-                else:
-                    nota_base = acorde[i]
-                    resto = acorde[i+1:]
-                break
+    def _compilar_catalogo(self):
+        """Compila o catálogo em índices e na matriz de intervalos (uma vez por versão)"""
+        # A versão é lida antes do catálogo: se outra thread alterá-lo durante a
+        # compilação, o resultado fica com a versão antiga e é refeito depois
+        versao = self.versao_catalogo
+        compilado = self._catalogo_compilado
+        if compilado is not None and compilado[0] == versao:
+            return compilado
+        
+        # Instâncias que compartilham o catálogo compartilham também a matriz
+        instrumentos = self.instrumentos
+        if instrumentos.compilado is not None:
+            compilado = (versao,) + instrumentos.compilado[1:]
+            self._catalogo_compilado = compilado
+            return compilado
+        
+        ids = tuple(instrumentos)
+        indice = {instrumento_id: i for i, instrumento_id in enumerate(ids)}
+        for entrada in instrumentos.listar():
+            for apelido in entrada["apelidos"]:
+                indice[apelido] = indice[entrada["id"]]
+        matriz = tuple(
+            tuple(self._diferenca_afinacao_direta(origem, destino) for destino in ids)
+            for origem in ids
+        )
+        deslocamentos = tuple(self.calcular_transposicao_instrumento(i) for i in ids)
         
-        if not nota_base:
-            return acorde
+        # Impressão digital estável (entre processos) do catálogo e das tabelas
+        conteudo = json.dumps([
+            VERSAO_TABELAS,
+            [[i, dict(instrumentos[i])] for i in ids],
+            dict(TRANSPOSICOES),
+            dict(TIPOS_ACORDES),
+        ], ensure_ascii=False, sort_keys=True, default=list)
+        assinatura = hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:16]
         
+        compilado = (versao, ids, indice, matriz, deslocamentos, assinatura)
+        self._catalogo_compilado = compilado
+        instrumentos.compilado = compilado
+        return compilado
+
+    def invalidar_catalogo(self):
+        """Marca o catálogo como alterado; a matriz é recompilada no próximo uso"""
+        self.versao_catalogo += 1
+        self._catalogo_compilado = None
+
+    def _publicar_catalogo(self, catalogo):
+        """Troca o catálogo por um novo, também imutável (copy-on-write)
+
+        Quem já leu o catálogo anterior continua com uma versão consistente.
+        """
+        self.instrumentos = catalogo
+        self.invalidar_catalogo()
+
+    def adicionar_instrumento(self, instrumento_id, nome, afinacao, tonalidade="C", familia=None, apelidos=None):
+        """Adiciona (ou substitui) um instrumento no catálogo
+
+        Ao substituir um instrumento, a família e os apelidos omitidos são mantidos.
+        """
+        anterior = self.instrumentos.get(instrumento_id)
+        if anterior is None or anterior["id"] != instrumento_id:
+            anterior = {"familia": FAMILIA_PADRAO, "apelidos": ()}
+        entrada = _instrumento(
+            instrumento_id, nome, afinacao, tonalidade,
+            anterior["familia"] if familia is None else familia,
+            anterior["apelidos"] if apelidos is None else apelidos,
+        )
+        self._publicar_catalogo(self.instrumentos.com_instrumento(entrada))
+
+    def remover_instrumento(self, instrumento_id):
+        """Remove um instrumento do catálogo (pelo id ou por um apelido)"""
+        resolvido = self.instrumentos.resolver(instrumento_id)
+        if resolvido is None:
+            raise InstrumentoDesconhecido(instrumento_id)
+        self._publicar_catalogo(self.instrumentos.sem_instrumento(resolvido))
+
+    def matriz_intervalos(self):
+        """Retorna (ids, matriz) com a diferença em semitons entre cada par de instrumentos"""
+        _, ids, _, matriz, _, _ = self._compilar_catalogo()
+        return ids, matriz
+
+    def deslocamento_concerto(self, instrumento_id):
+        """Semitons entre a nota escrita e o som real (tom de concerto) do instrumento"""
+        _, _, indice, _, deslocamentos, _ = self._compilar_catalogo()
         try:
-            # Transpõe a nota base
-            nota_completa = f"{nota_base}4"  # Usa oitava 4 como referência
-            nova_nota = self.transpor_nota(nota_completa, semitons, usar_bemois)
-            nova_nota_base = nova_nota[:-1]  # Remove a oitava
-            
-            return nova_nota_base + resto
-        except:
-            return acorde
+            return deslocamentos[indice[instrumento_id]]
+        except KeyError:
+            raise InstrumentoDesconhecido(instrumento_id) from None
+
+    def assinatura_catalogo(self):
+        """Identificador do catálogo e das tabelas atuais, usado como chave de cache"""
+        return self._compilar_catalogo()[5]
+
+    def calcular_diferenca_afinacao(self, instrumento_origem_id, instrumento_destino_id):
+        """Calcula diferença em semitons entre instrumentos"""
+        _, _, indice, matriz, _, _ = self._compilar_catalogo()
+        try:
+            return matriz[indice[instrumento_origem_id]][indice[instrumento_destino_id]]
+        except KeyError as e:
+            raise InstrumentoDesconhecido(e.args[0]) from None
+
+    def extensao_instrumento(self, instrumento_id):
+        """Notas MIDI (grave, agudo) aproximadas que o instrumento alcança"""
+        alturas = self.alturas_instrumento(instrumento_id)
+        return alturas.grave, alturas.agudo
+
+    def melhores_tonalidades(self, material, instrumento_id, limite=None):
+        """Avalia as 12 transposições de uma cifra ou melodia para o instrumento
+
+        ``material`` é uma cifra (texto ou já compilada) ou uma sequência de
+        notas com oitava. Cada transposição recebe um custo (PESOS_TONALIDADE)
+        combinando armadura, acidentes, notas fora da extensão (melodias) e
+        acordes sem forma aberta (instrumentos de cordas). A cifra é analisada
+        uma só vez; as 12 opções saem de histogramas por classe de altura.
+        Retorna uma lista de OpcaoTonalidade, da melhor para a pior.
+        """
+        if isinstance(material, str):
+            material = self.compilar_cifra(material)
+        material = list(material)
+
+        raizes = [0] * 12     # classes de altura das fundamentais
+        alturas = [0] * 12    # fundamentais e baixos (para contar acidentes)
+        numeros = []
+        menor = False
+        if material and isinstance(material[0], AcordeCompilado):
+            acordes = [acorde for acorde in material if acorde.e_acorde]
+            for acorde in acordes:
+                raizes[acorde.raiz] += 1
+                alturas[acorde.raiz] += 1
+                if acorde.baixo is not None:
+                    alturas[acorde.baixo] += 1
+            if acordes:
+                # A tonalidade é estimada pelo primeiro acorde
+                tonica = acordes[0].raiz
+                qualidade = acordes[0].qualidade
+                menor = qualidade.startswith(('m', '-')) and not qualidade.startswith('maj')
+        else:
+            numeros = sorted(n for n in self.notas_para_numeros(material) if n >= 0)
+            for numero in numeros:
+                alturas[numero % 12] += 1
+            if numeros:
+                # Melodias costumam terminar na tônica
+                tonica = max(self.notas_para_numeros(material[-1:])[0], 0) % 12
+
+        total = sum(alturas)
+        if not total:
+            raise ErroTransposicao("Nenhum acorde ou nota reconhecido")
+
+        afinacao = self.alturas_instrumento(instrumento_id).afinacao
+        abertas = None
+        if len(afinacao) > 1 and not numeros:
+            # Forma aberta: fundamental ou quinta numa corda solta
+            soltas = {numero % 12 for numero in afinacao}
+            abertas = {classe for classe in range(12) if classe in soltas or (classe + 7) % 12 in soltas}
+        grave, agudo = self.extensao_instrumento(instrumento_id)
+        pesos = PESOS_TONALIDADE
+
+        opcoes = []
+        for deslocamento in range(12):
+            nova_tonica = (tonica + deslocamento) % 12
+            maior_relativa = (nova_tonica + 3) % 12 if menor else nova_tonica
+            usar_bemois = maior_relativa in TONICAS_COM_BEMOIS
+            armadura = ARMADURAS[maior_relativa]
+            acidentes = sum(alturas[c] for c in range(12) if (c + deslocamento) % 12 in TECLAS_PRETAS) / total
+            custo = pesos["armadura"] * armadura / 6 + pesos["acidentes"] * acidentes
+
+            fora_da_extensao = None
+            if numeros:
+                # Escolhe a oitava em que menos notas ficam fora da extensão
+                fora, _, semitons = min(
+                    (bisect_left(numeros, grave - s) + len(numeros) - bisect_right(numeros, agudo - s), abs(s), s)
+                    for s in (deslocamento - 24, deslocamento - 12, deslocamento, deslocamento + 12)
+                )
+                fora_da_extensao = fora / len(numeros)
+                custo += pesos["extensao"] * fora_da_extensao
+            else:
+                semitons = (deslocamento + 5) % 12 - 5
+
+            formas_abertas = None
+            if abertas is not None:
+                formas_abertas = sum(raizes[c] for c in range(12) if (c + deslocamento) % 12 in abertas) / sum(raizes)
+                custo += pesos["formas_abertas"] * (1 - formas_abertas)
+
+            nomes = NOTAS_BEMOIS if usar_bemois else NOTAS_SUSTENIDOS
+            opcoes.append(OpcaoTonalidade(
+                semitons, nomes[nova_tonica] + ('m' if menor else ''), usar_bemois, round(custo, 4),
+                armadura, acidentes, fora_da_extensao, formas_abertas))
+
+        opcoes.sort(key=lambda opcao: (opcao.custo, abs(opcao.semitons)))
+        return opcoes[:limite] if limite else opcoes
+
+    def compilar_acorde(self, simbolo):
+        """Analisa um símbolo uma única vez e devolve sua forma compilada"""
+        compilado = self._acordes_compilados.get(simbolo)
+        if compilado is None:
+            compilado = self._acordes_compilados.guardar(simbolo, AcordeCompilado(simbolo))
+        return compilado
+
+    def _compilar_literal(self, palavra):
+        """Token que nunca é transposto (palavra de letra, tablatura ou seção)"""
+        compilado = self._literais.get(palavra)
+        if compilado is None:
+            compilado = self._literais.guardar(palavra, AcordeCompilado(palavra, literal=True))
+        return compilado
+
+    def compilar_cifra(self, cifra):
+        """Converte a cifra em uma lista de tokens compilados
+
+        Só as linhas classificadas como de acordes são analisadas; as demais
+        viram tokens literais.
+        """
+        compilar_linha = self._compilar_linha
+        tokens = []
+        for linha in cifra.splitlines():
+            tokens.extend(compilar_linha(linha.split()))
+        return tokens
+
+    def _compilar_linha(self, palavras):
+        """Compila os tokens de uma linha; se ela não for de acordes, viram literais
+
+        Segue a mesma regra de classificar_linha, mas reaproveita o cache de
+        acordes compilados em vez de aplicar a gramática token a token.
+        """
+        compilar = self.compilar_acorde
+        compilados = [compilar(palavra) for palavra in palavras]
+        acordes = 0
+        for compilado in compilados:
+            acordes += compilado.e_acorde
+        if acordes * 2 <= len(compilados):
+            neutro = _TOKEN_NEUTRO.fullmatch
+            palavras_letra = 0
+            for compilado in compilados:
+                if not compilado.e_acorde and not neutro(compilado.simbolo):
+                    palavras_letra += 1
+            if acordes <= palavras_letra:
+                literal = self._compilar_literal
+                return [c if not c.e_acorde else literal(c.simbolo) for c in compilados]
+        return compilados
+
+    def analisar_cifra(self, linhas):
+        """Conta linhas e tokens por tipo e quanto da cifra o pré-filtro dispensa
+
+        Aceita um texto ou um iterável de linhas (ex: um arquivo aberto).
+        """
+        if isinstance(linhas, str):
+            linhas = linhas.splitlines()
+        
+        contagem_linhas = dict.fromkeys(TIPOS_LINHA, 0)
+        contagem_tokens = dict.fromkeys(TIPOS_LINHA, 0)
+        for linha in linhas:
+            tipo = classificar_linha(linha)
+            contagem_linhas[tipo] += 1
+            contagem_tokens[tipo] += len(linha.split())
+        
+        total_linhas = sum(contagem_linhas.values())
+        total_tokens = sum(contagem_tokens.values())
+        return {
+            "linhas": contagem_linhas,
+            "tokens": contagem_tokens,
+            "linhas_ignoradas": 1 - contagem_linhas[LINHA_ACORDES] / total_linhas if total_linhas else 0.0,
+            "tokens_ignorados": 1 - contagem_tokens[LINHA_ACORDES] / total_tokens if total_tokens else 0.0,
+        }
+
+    def transpor_cifra_compilada(self, cifra_compilada, semitons, usar_bemois=False):
+        """Transpõe uma cifra já compilada usando apenas consultas à tabela"""
+        indice = semitons % 12 + (12 if usar_bemois else 0)
+        return ' '.join([token.grafias[indice] for token in cifra_compilada])
+
+    def transpor_e_explicar(self, cifra, semitons, usar_bemois=False):
+        """Transpõe a cifra e já explica o resultado, analisando cada token uma vez
+
+        Equivale a transpor_cifra seguido de converter_cifra_portugues sobre o
+        resultado, sem analisar de novo os acordes gerados. Palavras que não
+        são acordes aparecem inalteradas na explicação.
+        """
+        indice = semitons % 12 + (12 if usar_bemois else 0)
+        explicacoes = self._explicacoes
+        explicar = self.explicar_acorde
+        transpostos = []
+        explicados = []
+        
+        for token in self.compilar_cifra(cifra):
+            novo = token.grafias[indice]
+            transpostos.append(novo)
+            if token.e_acorde:
+                explicados.append(explicacoes.get(novo) or explicar(novo))
+            else:
+                explicados.append(novo)
+        
+        return ResultadoTransposicao(' '.join(transpostos), semitons, ' | '.join(explicados))
+
+    def fluxo_transposicao(self, linhas, semitons, usar_bemois=False):
+        """Gera um TokenTransposto por token, linha a linha (memória constante)"""
+        indice = semitons % 12 + (12 if usar_bemois else 0)
+        explicar = self.explicar_acorde
+        compilar_linha = self._compilar_linha
+        if isinstance(linhas, str):
+            linhas = linhas.splitlines()
+        
+        for linha in linhas:
+            for token in compilar_linha(linha.split()):
+                novo = token.grafias[indice]
+                yield TokenTransposto(token.simbolo, novo, explicar(novo) if token.e_acorde else None)
+
+    def transpor_acorde(self, acorde, semitons, usar_bemois=False):
+        """Transpõe um acorde"""
+        return self.compilar_acorde(acorde).transpor(semitons, usar_bemois)
 
     def transpor_cifra(self, cifra, instrumento_origem_id, instrumento_destino_id, usar_bemois=False):
         """Transpõe cifra completa entre instrumentos"""
         semitons = self.calcular_diferenca_afinacao(instrumento_origem_id, instrumento_destino_id)
+        return self.transpor_cifra_compilada(self.compilar_cifra(cifra), semitons, usar_bemois)
+
+    def transpor_partes(self, cifra, instrumento_origem_id, instrumentos_destino=None,
+                        usar_bemois=False, preservar_layout=False, diretorio=None):
+        """Gera a cifra de cada instrumento de destino analisando o texto uma única vez
+
+        Retorna um dicionário {id_instrumento: cifra}. Instrumentos que caem na
+        mesma transposição compartilham o mesmo resultado. Se ``diretorio`` for
+        informado, cada parte também é gravada em ``<diretorio>/<id>.txt``.
+        """
+        if instrumentos_destino is None:
+            instrumentos_destino = list(self.instrumentos)
         
-        # Divide a cifra em palavras e processa cada uma
-        palavras = cifra.split()
-        resultado = []
+        if preservar_layout:
+            linhas = cifra.splitlines(keepends=True)
+            
+            def gerar(semitons):
+                return ''.join(self.transpor_fluxo(linhas, semitons, usar_bemois))
+        else:
+            compilada = self.compilar_cifra(cifra)
+            
+            def gerar(semitons):
+                return self.transpor_cifra_compilada(compilada, semitons, usar_bemois)
         
-        for palavra in palavras:
-            # Tenta transpor se parece com um acorde
-            if any(note in palavra for note in self.notas_naturais):
-                acorde_transposto = self.transpor_acorde(palavra, semitons, usar_bemois)
-                resultado.append(acorde_transposto)
-            else:
-                resultado.append(palavra)
+        por_deslocamento = {}
+        partes = {}
+        for instrumento_id in instrumentos_destino:
+            semitons = self.calcular_diferenca_afinacao(instrumento_origem_id, instrumento_id)
+            deslocamento = semitons % 12
+            if deslocamento not in por_deslocamento:
+                por_deslocamento[deslocamento] = gerar(deslocamento)
+            partes[instrumento_id] = por_deslocamento[deslocamento]
+        
+        if diretorio is not None:
+            os.makedirs(diretorio, exist_ok=True)
+            for instrumento_id, texto in partes.items():
+                caminho = os.path.join(diretorio, f"{instrumento_id}.txt")
+                with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+                    arquivo.write(texto)
+        
+        return partes
+
+    def transpor_linha(self, linha, semitons, usar_bemois=False):
+        """Transpõe os acordes de uma linha preservando espaços e alinhamento"""
+        corpo = linha.rstrip('\r\n')
+        tokens = _PALAVRA_ESPACO.findall(corpo)
+        compilados = self._compilar_linha([palavra for palavra, _ in tokens])
+        if not any(compilado.e_acorde for compilado in compilados):
+            return linha  # letra, tablatura, seção ou linha vazia
+        final = linha[len(corpo):]
+        indice = semitons % 12 + (12 if usar_bemois else 0)
+        
+        partes = [corpo[:len(corpo) - len(corpo.lstrip(' \t'))]]
+        divida = 0  # caracteres a mais que ainda precisam ser compensados
+        alterada = False
+        
+        for (palavra, espacos), compilado in zip(tokens, compilados):
+            novo = compilado.grafias[indice]
+            if novo is not palavra:
+                alterada = True
+                divida += len(novo) - len(palavra)
+            
+            # Ajusta o espaço seguinte para manter a coluna do próximo token
+            if espacos and divida:
+                if divida > 0:
+                    removidos = min(divida, len(espacos) - 1)
+                    espacos = espacos[removidos:]
+                    divida -= removidos
+                else:
+                    espacos += ' ' * -divida
+                    divida = 0
+            
+            partes.append(novo)
+            partes.append(espacos)
         
-        return ' '.join(resultado)
+        if not alterada:
+            return linha
+        
+        partes.append(final)
+        return ''.join(partes)
+
+    def transpor_fluxo(self, linhas, semitons, usar_bemois=False):
+        """Gera as linhas transpostas uma a uma (memória constante)"""
+        transpor_linha = self.transpor_linha
+        for linha in linhas:
+            yield transpor_linha(linha, semitons, usar_bemois)
+
+    def transpor_arquivo(self, entrada, saida, semitons, usar_bemois=False):
+        """Transpõe um arquivo (ou fluxo) de cifra em blocos, sem carregá-lo inteiro"""
+        arquivo_entrada = entrada
+        arquivo_saida = saida
+        if isinstance(entrada, (str, os.PathLike)):
+            arquivo_entrada = open(entrada, 'r', encoding='utf-8', newline='', buffering=TAMANHO_BLOCO)
+        if isinstance(saida, (str, os.PathLike)):
+            arquivo_saida = open(saida, 'w', encoding='utf-8', newline='', buffering=TAMANHO_BLOCO)
+        
+        linhas_processadas = 0
+        try:
+            while True:
+                bloco = arquivo_entrada.readlines(TAMANHO_BLOCO)
+                if not bloco:
+                    break
+                arquivo_saida.writelines(self.transpor_fluxo(bloco, semitons, usar_bemois))
+                linhas_processadas += len(bloco)
+        finally:
+            if arquivo_entrada is not entrada:
+                arquivo_entrada.close()
+            if arquivo_saida is not saida:
+                arquivo_saida.close()
+        
+        return linhas_processadas
 
-    def listar_instrumentos(self):
-        """Lista todos os instrumentos disponíveis"""
-        return [
-            {"id": id, **info} 
-            for id, info in self.instrumentos.items()
-        ]
+    def gravar_cifras_binarias(self, caminho, musicas):
+        """Grava cifras (pares nome/texto ou dicionário) no formato binário compacto"""
+        from cifra_binaria import gravar_corpus
+        return gravar_corpus(caminho, musicas, self)
+
+    def abrir_cifras_binarias(self, caminho):
+        """Abre um corpus binário por mmap (ver cifra_binaria.CorpusBinario)"""
+        from cifra_binaria import CorpusBinario
+        return CorpusBinario(caminho, self)
+
+    def digitacoes_cifra(self, cifra, instrumento_id, semitons=0, usar_bemois=False, limite=1):
+        """Digitações de cada acorde distinto da cifra transposta (ver braco.digitacoes_cifra)"""
+        from braco import digitacoes_cifra
+        return digitacoes_cifra(cifra, instrumento_id, semitons, usar_bemois, limite, self)
+
+    def listar_instrumentos(self, familia=None, tonalidade=None):
+        """Lista os instrumentos disponíveis (entradas somente leitura do catálogo)"""
+        return self.instrumentos.listar(familia, tonalidade)
 
     def mostrar_info_instrumento(self, instrumento_id):
-        """Mostra informações do instrumento"""
-        if instrumento_id not in self.instrumentos:
+        """Mostra informações do instrumento (pelo id ou por um apelido)"""
+        instrumento = self.instrumentos.get(instrumento_id)
+        if instrumento is None:
             return None
         
-        instrumento = self.instrumentos[instrumento_id]
         transposicao = self.calcular_transposicao_instrumento(instrumento_id)
         
         return {
+            "id": instrumento["id"],
             "nome": instrumento["nome"],
+            "familia": instrumento["familia"],
             "tonalidade": instrumento["tonalidade"],
             "afinacao": instrumento["afinacao"],
+            "apelidos": instrumento["apelidos"],
             "transposicao": transposicao
         }
 
     def mostrar_escala_natural(self, nota_base="C"):
-        """Mostra as 7 notas musicais naturais a partir de uma nota base"""
-        try:
-            idx_base = self.notas.index(nota_base)
-            escala = []
-            for i in range(7):
-                nota_idx = (idx_base + i) % 12
-                escala.append(self.notas[nota_idx])
-            return escala
-        except:
-            return None
+        """Mostra as 7 notas da escala maior a partir de uma nota base"""
+        escala = self._harmonia()[0].get((nota_base, "maior"))
+        return list(escala) if escala is not None else None
 
     def converter_cifra_portugues(self, cifra):
         """Converte cifra inteira para nomenclatura portuguesa"""
-        palavras = cifra.split()
+        # Uma consulta por símbolo distinto; só os novos são analisados
+        explicacoes = self._explicacoes
+        explicar = self.explicar_acorde
         resultado_pt = []
         
-        for palavra in palavras:
-            explicacao = self.explicar_acorde(palavra)
-            if explicacao:
-                resultado_pt.append(explicacao)
-            else:
-                resultado_pt.append(palavra)
+        for palavra in cifra.split():
+            explicacao = explicacoes.get(palavra)
+            if explicacao is None:
+                explicacao = explicar(palavra)
+            resultado_pt.append(explicacao or palavra)
         
         return ' | '.join(resultado_pt)
 
+    def ativar_perfil(self):
+        """Liga a contagem de chamadas, acertos de cache e tempo por etapa
+
+        Enquanto desligado não há custo algum: a instância só passa a usar
+        os métodos instrumentados (TranspositorInstrumentado) após esta chamada.
+        """
+        if self.perfil is None:
+            self.perfil = Perfil()
+        self.__class__ = TranspositorInstrumentado
+        return self.perfil
+
+    def desativar_perfil(self):
+        """Desliga a instrumentação, mantendo os contadores coletados"""
+        self.__class__ = TranspositorMusical
+        return self.perfil
+
+    def obter_perfil(self):
+        """Retorna os contadores coletados (ou None se o perfil nunca foi ativado)"""
+        if self.perfil is None:
+            return None
+        return self.perfil.resumo()
+
+    def relatorio_perfil(self):
+        """Retorna o relatório de desempenho formatado em texto"""
+        if self.perfil is None:
+            return "📊 Perfil de desempenho desativado"
+        return self.perfil.relatorio()
+
+
+# Etapas medidas pela instrumentação e os métodos atribuídos a cada uma
+ETAPAS_PERFIL = {
+    "analise": ("nota_para_numero", "notas_para_numeros", "compilar_cifra", "compilar_acorde"),
+    "transposicao": ("transpor_cifra", "transpor_cifra_compilada", "transpor_e_explicar", "transpor_acorde",
+                     "transpor_linha", "transpor_nota", "transpor_notas", "transpor_numeros",
+                     "transpor_partes", "calcular_diferenca_afinacao"),
+    "grafia": ("numero_para_nota", "numeros_para_notas"),
+    "traducao": ("explicar_acorde", "converter_cifra_portugues", "converter_nota_portugues",
+                 "notas_acorde", "escala"),
+}
+
+
+class Perfil:
+    """Contadores de chamadas e tempo por etapa do transpositor
+
+    O tempo de cada etapa é exclusivo (descontado o tempo das chamadas
+    internas), então a soma das etapas corresponde ao tempo total medido.
+    Não é compartilhável entre threads.
+    """
+
+    __slots__ = ("etapas", "metodos", "acertos_cache", "falhas_cache", "_pilha")
+
+    def __init__(self):
+        self.etapas = {etapa: [0, 0.0] for etapa in ETAPAS_PERFIL}
+        self.metodos = {}
+        self.acertos_cache = 0
+        self.falhas_cache = 0
+        self._pilha = []
+
+    def chamar(self, etapa, nome, funcao, *args, **kwargs):
+        """Executa ``funcao`` contabilizando a chamada na etapa e no método"""
+        quadro = [time.perf_counter(), 0.0]
+        self._pilha.append(quadro)
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            duracao = time.perf_counter() - quadro[0]
+            self._pilha.pop()
+            if self._pilha:
+                self._pilha[-1][1] += duracao
+            
+            contador_etapa = self.etapas[etapa]
+            contador_etapa[0] += 1
+            contador_etapa[1] += duracao - quadro[1]
+            
+            contador_metodo = self.metodos.get(nome)
+            if contador_metodo is None:
+                contador_metodo = self.metodos[nome] = [0, 0.0]
+            contador_metodo[0] += 1
+            contador_metodo[1] += duracao
+
+    def zerar(self):
+        """Zera todos os contadores"""
+        self.__init__()
+
+    def resumo(self):
+        """Retorna os contadores como dicionário"""
+        consultas = self.acertos_cache + self.falhas_cache
+        return {
+            "etapas": {
+                etapa: {"chamadas": chamadas, "tempo_s": tempo}
+                for etapa, (chamadas, tempo) in self.etapas.items()
+            },
+            "metodos": {
+                nome: {"chamadas": chamadas, "tempo_s": tempo}
+                for nome, (chamadas, tempo) in self.metodos.items()
+            },
+            "cache": {
+                "acertos": self.acertos_cache,
+                "falhas": self.falhas_cache,
+                "taxa_acertos": self.acertos_cache / consultas if consultas else 0.0,
+            },
+        }
+
+    def relatorio(self):
+        """Formata o resumo como texto"""
+        resumo = self.resumo()
+        linhas = ["📊 Perfil de desempenho", f"  {'etapa':<16}{'chamadas':>12}{'tempo (ms)':>14}"]
+        for etapa, dados in resumo["etapas"].items():
+            linhas.append(f"  {etapa:<16}{dados['chamadas']:>12}{dados['tempo_s'] * 1000:>14.3f}")
+        linhas.append(f"  {'método':<28}{'chamadas':>12}{'tempo (ms)':>14}")
+        for nome, dados in sorted(resumo["metodos"].items(), key=lambda item: -item[1]["tempo_s"]):
+            linhas.append(f"  {nome:<28}{dados['chamadas']:>12}{dados['tempo_s'] * 1000:>14.3f}")
+        cache = resumo["cache"]
+        linhas.append(f"  Cache de acordes: {cache['acertos']} acertos, {cache['falhas']} falhas "
+                      f"({cache['taxa_acertos']:.1%})")
+        return "\n".join(linhas)
+
+
+def _metodo_instrumentado(etapa, nome):
+    original = getattr(TranspositorMusical, nome)
+    
+    def metodo(self, *args, **kwargs):
+        return self.perfil.chamar(etapa, nome, original, self, *args, **kwargs)
+    
+    metodo.__name__ = nome
+    metodo.__doc__ = original.__doc__
+    return metodo
+
+
+class TranspositorInstrumentado(TranspositorMusical):
+    """TranspositorMusical com contadores; usado só enquanto o perfil está ativo"""
+
+    __slots__ = ()
+
+    def compilar_acorde(self, simbolo):
+        """Analisa um símbolo uma única vez e devolve sua forma compilada"""
+        compilado = self._acordes_compilados.get(simbolo)
+        if compilado is not None:
+            self.perfil.acertos_cache += 1
+            return compilado
+        self.perfil.falhas_cache += 1
+        return self.perfil.chamar("analise", "compilar_acorde",
+                                  TranspositorMusical.compilar_acorde, self, simbolo)
+
+
+for _etapa, _nomes in ETAPAS_PERFIL.items():
+    for _nome in _nomes:
+        if _nome not in TranspositorInstrumentado.__dict__:
+            setattr(TranspositorInstrumentado, _nome, _metodo_instrumentado(_etapa, _nome))
+
+# Operações aceitas no modo em lote (JSON lines)
+OPERACOES_LOTE = ("transpor", "notas", "explicar", "diferenca")
+
+# Transpositor de cada processo trabalhador do modo em lote
+_transpositor_lote = None
+
+
+def _iniciar_lote(catalogo=None):
+    """Cria o transpositor do processo (nos trabalhadores, via Pool(initializer=...))"""
+    global _transpositor_lote
+    _transpositor_lote = TranspositorMusical(catalogo)
+
+
+def _texto_do_pedido(pedido, campo):
+    valor = pedido[campo]
+    if not isinstance(valor, str):
+        raise TypeError(f"Campo '{campo}' deve ser um texto")
+    return valor
+
+
+def _semitons_do_pedido(transpositor, pedido):
+    semitons = pedido.get("semitons")
+    if semitons is not None:
+        if isinstance(semitons, bool) or not isinstance(semitons, (int, float)):
+            raise TypeError("Campo 'semitons' deve ser um número inteiro")
+        if isinstance(semitons, float) and not semitons.is_integer():
+            raise ValueError(f"Campo 'semitons' deve ser um número inteiro, não {semitons}")
+        return int(semitons)
+    return transpositor.calcular_diferenca_afinacao(
+        _texto_do_pedido(pedido, "origem"), _texto_do_pedido(pedido, "destino"))
+
+
+def processar_pedido(transpositor, pedido):
+    """Executa um pedido do modo em lote e retorna a resposta como dicionário
+
+    Campos do pedido: ``operacao`` (transpor, notas, explicar ou diferenca),
+    ``cifra`` ou ``notas``, ``origem``/``destino`` ou ``semitons``,
+    ``usar_bemois``, ``explicar`` (inclui a explicação em português ao
+    transpor) e um ``id`` opcional devolvido na resposta.
+    """
+    inicio = time.perf_counter()
+    resposta = {"id": pedido.get("id")} if "id" in pedido else {}
+    try:
+        operacao = pedido.get("operacao", "transpor")
+        usar_bemois = bool(pedido.get("usar_bemois", False))
+        
+        if operacao == "transpor":
+            cifra = _texto_do_pedido(pedido, "cifra")
+            semitons = _semitons_do_pedido(transpositor, pedido)
+            if pedido.get("explicar"):
+                resultado = transpositor.transpor_e_explicar(cifra, semitons, usar_bemois)
+                resposta["resultado"] = resultado.cifra
+                resposta["explicacao"] = resultado.explicacao
+            else:
+                compilada = transpositor.compilar_cifra(cifra)
+                resposta["resultado"] = transpositor.transpor_cifra_compilada(compilada, semitons, usar_bemois)
+            resposta["semitons"] = semitons
+        elif operacao == "notas":
+            notas = pedido["notas"]
+            if not isinstance(notas, list) or not all(isinstance(nota, str) for nota in notas):
+                raise TypeError("Campo 'notas' deve ser uma lista de textos")
+            semitons = _semitons_do_pedido(transpositor, pedido)
+            lote = transpositor.transpor_notas(notas, semitons, usar_bemois)
+            resposta["resultado"] = lote.notas
+            resposta["semitons"] = semitons
+        elif operacao == "explicar":
+            resposta["resultado"] = transpositor.converter_cifra_portugues(_texto_do_pedido(pedido, "cifra"))
+        elif operacao == "diferenca":
+            resposta["resultado"] = transpositor.calcular_diferenca_afinacao(
+                _texto_do_pedido(pedido, "origem"), _texto_do_pedido(pedido, "destino"))
+        else:
+            raise ValueError(f"Operação inválida: {operacao}")
+        resposta["ok"] = True
+    except ErroTransposicao as e:
+        # Nota ou instrumento inválido: o tipo vai na resposta para o cliente tratar
+        resposta["ok"] = False
+        resposta["erro"] = str(e)
+        resposta["tipo_erro"] = type(e).__name__
+    except KeyError as e:
+        resposta["ok"] = False
+        resposta["erro"] = f"Campo obrigatório ausente: {e.args[0]}"
+        resposta["tipo_erro"] = "CampoAusente"
+    except (TypeError, ValueError, OverflowError) as e:
+        resposta["ok"] = False
+        resposta["erro"] = str(e)
+        resposta["tipo_erro"] = "PedidoInvalido"
+    except Exception as e:
+        # Um pedido com problema não interrompe o lote: o erro vai na resposta dele
+        resposta = {"id": pedido.get("id")} if "id" in pedido else {}
+        resposta["ok"] = False
+        resposta["erro"] = f"{type(e).__name__}: {e}"
+        resposta["tipo_erro"] = "ErroInterno"
+    
+    resposta["tempo_us"] = round((time.perf_counter() - inicio) * 1e6, 1)
+    return resposta
+
+
+def _processar_linha_json(linha):
+    """Processa uma linha JSON no processo atual (usado também pelos trabalhadores)"""
+    global _transpositor_lote
+    if _transpositor_lote is None:
+        _transpositor_lote = TranspositorMusical()
+    try:
+        pedido = json.loads(linha)
+        if not isinstance(pedido, dict):
+            raise ValueError("o pedido deve ser um objeto JSON")
+    except (ValueError, RecursionError) as e:
+        resposta = {"ok": False, "erro": f"JSON inválido: {e}"}
+    else:
+        resposta = processar_pedido(_transpositor_lote, pedido)
+    return json.dumps(resposta, ensure_ascii=False) + "\n"
+
+
+def _processar_bloco_json(linhas):
+    """Processa várias linhas JSON de uma vez, devolvendo as respostas concatenadas"""
+    return ''.join([_processar_linha_json(linha) for linha in linhas])
+
+
+def processar_jsonl(entrada, saida, processos=1, catalogo=None, transpositor=None):
+    """Lê pedidos JSON (um por linha) e escreve as respostas na mesma ordem
+
+    Num só processo usa ``transpositor`` (ou um novo, criado a partir de
+    ``catalogo``). Com ``processos`` > 1 os pedidos são distribuídos em blocos
+    entre processos trabalhadores, cada um com o próprio transpositor criado a
+    partir de ``catalogo``. Retorna o número de pedidos processados.
+    """
+    global _transpositor_lote
+    
+    def blocos():
+        while True:
+            bloco = entrada.readlines(TAMANHO_BLOCO)
+            if not bloco:
+                return
+            yield [linha for linha in bloco if linha.strip()]
+    
+    total = 0
+    if processos > 1:
+        import multiprocessing
+        tamanho_parte = 2048
+        with multiprocessing.Pool(processos, initializer=_iniciar_lote, initargs=(catalogo,)) as pool:
+            for bloco in blocos():
+                partes = [bloco[i:i + tamanho_parte] for i in range(0, len(bloco), tamanho_parte)]
+                saida.writelines(pool.imap(_processar_bloco_json, partes))
+                total += len(bloco)
+    else:
+        _transpositor_lote = transpositor if transpositor is not None else TranspositorMusical(catalogo)
+        for bloco in blocos():
+            saida.write(_processar_bloco_json(bloco))
+            total += len(bloco)
+    saida.flush()
+    return total
+
+def medir_inicializacao(repeticoes=100000):
+    """Mede o tempo de importação do módulo e de criação de instâncias"""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        TranspositorMusical()
+    tempo_instancia = (time.perf_counter() - inicio) / repeticoes
+    
+    instancia = TranspositorMusical()
+    return {
+        "importacao_ms": TEMPO_IMPORTACAO * 1000,
+        "instancia_us": tempo_instancia * 1e6,
+        "bytes_por_instancia": sys.getsizeof(instancia),
+        "repeticoes": repeticoes,
+    }
+
 def menu_principal():
     print("\n" + "="*60)
     print("           🎵 SISTEMA DE TRANSPOSIÇÃO MUSICAL OFFLINE")
@@ -321,6 +1859,7 @@ def menu_principal():
     print("7. 🇧🇷 Explicar cifra em português")
     print("8. 🎼 Mostrar todas as notas musicais")
     print("9. 🚪 Sair")
+    print("10. 📊 Perfil de desempenho")
     print("="*60)
 
 def mostrar_notas_musicais():
@@ -378,15 +1917,14 @@ def main():
                     cifra = input("\n🎼 Digite a cifra: ")
                     usar_bemois = input("🎹 Usar bemóis? (s/n): ").lower().startswith('s')
                     
-                    resultado = transpositor.transpor_cifra(cifra, instrumento_origem, instrumento_destino, usar_bemois)
-                    
-                    print(f"\n🎵 Resultado: {resultado}")
                     semitons = transpositor.calcular_diferenca_afinacao(instrumento_origem, instrumento_destino)
-                    print(f"🎼 Diferença: {semitons} semitons")
+                    resultado = transpositor.transpor_e_explicar(cifra, semitons, usar_bemois)
+                    
+                    print(f"\n🎵 Resultado: {resultado.cifra}")
+                    print(f"🎼 Diferença: {resultado.semitons} semitons")
                     
                     # Mostra explicação em português
-                    explicacao_pt = transpositor.converter_cifra_portugues(resultado)
-                    print(f"🇧🇷 Explicação: {explicacao_pt}")
+                    print(f"🇧🇷 Explicação: {resultado.explicacao}")
                 else:
                     print("❌ Números inválidos!")
             
@@ -395,15 +1933,10 @@ def main():
                 semitons = int(input("🎹 Semitons para transpor (+ para cima, - para baixo): "))
                 usar_bemois = input("🎵 Usar bemóis? (s/n): ").lower().startswith('s')
                 
-                resultado = ""
-                palavras = cifra.split()
-                for palavra in palavras:
-                    acorde_transposto = transpositor.transpor_acorde(palavra, semitons, usar_bemois)
-                    resultado += acorde_transposto + " "
+                resultado = transpositor.transpor_e_explicar(cifra, semitons, usar_bemois)
                 
-                print(f"\n🎵 Resultado: {resultado.strip()}")
-                explicacao_pt = transpositor.converter_cifra_portugues(resultado.strip())
-                print(f"🇧🇷 Explicação: {explicacao_pt}")
+                print(f"\n🎵 Resultado: {resultado.cifra}")
+                print(f"🇧🇷 Explicação: {resultado.explicacao}")
             
             elif opcao == "3":
                 print("\n📋 Instrumentos disponíveis:")
@@ -450,6 +1983,10 @@ def main():
                 cifra = input("\n🎼 Digite a cifra para explicar: ")
                 explicacao = transpositor.converter_cifra_portugues(cifra)
                 print(f"\n🇧🇷 Explicação: {explicacao}")
+                for acorde in dict.fromkeys(cifra.split()):
+                    notas = transpositor.notas_acorde(acorde)
+                    if notas:
+                        print(f"  {acorde}: {' - '.join(notas)}")
             
             elif opcao == "8":
                 mostrar_notas_musicais()
@@ -458,6 +1995,15 @@ def main():
                 print("\n🎶 Obrigado por usar o Transpositor Musical!")
                 break
             
+            elif opcao == "10":
+                ativo = isinstance(transpositor, TranspositorInstrumentado)
+                print(f"\n{transpositor.relatorio_perfil()}")
+                if input(f"\n📊 {'Desativar' if ativo else 'Ativar'} perfil? (s/n): ").lower().startswith('s'):
+                    if ativo:
+                        transpositor.desativar_perfil()
+                    else:
+                        transpositor.ativar_perfil()
+            
             else:
                 print("❌ Opção inválida!")
         
@@ -468,5 +2014,147 @@ def main():
         
         input("\n📝 Pressione Enter para continuar...")
 
+def cli(argv=None):
+    """Ponto de entrada não interativo (linha de comando)"""
+    parser = argparse.ArgumentParser(description="Transpositor Musical Offline")
+    parser.add_argument("--perfil", action="store_true",
+                        help="Mede as etapas e mostra o relatório de desempenho no stderr")
+    parser.add_argument("--catalogo", help="Arquivo JSON de instrumentos (padrão: instrumentos.json)")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+    
+    p_transpor = subcomandos.add_parser("transpor", help="Transpõe um arquivo de cifra preservando o layout")
+    p_transpor.add_argument("entrada", help="Arquivo de cifra ('-' para stdin)")
+    p_transpor.add_argument("-o", "--saida", default="-", help="Arquivo de saída ('-' para stdout)")
+    p_transpor.add_argument("-s", "--semitons", type=int, help="Semitons para transpor")
+    p_transpor.add_argument("--origem", help="ID do instrumento de origem")
+    p_transpor.add_argument("--destino", help="ID do instrumento de destino")
+    p_transpor.add_argument("-b", "--bemois", action="store_true", help="Usar bemóis")
+    
+    p_partes = subcomandos.add_parser("partes", help="Gera a parte de cada instrumento a partir de uma cifra")
+    p_partes.add_argument("entrada", help="Arquivo de cifra ('-' para stdin)")
+    p_partes.add_argument("--origem", required=True, help="ID do instrumento de origem")
+    p_partes.add_argument("--destinos", help="IDs de destino separados por vírgula (padrão: todos)")
+    p_partes.add_argument("-d", "--diretorio", required=True, help="Diretório onde gravar as partes")
+    p_partes.add_argument("-b", "--bemois", action="store_true", help="Usar bemóis")
+    
+    subcomandos.add_parser("inicializacao", help="Mede o tempo de importação e de criação de instâncias")
+    
+    p_classificar = subcomandos.add_parser("classificar", help="Mostra quantas linhas são acordes, letra, tablatura ou seção")
+    p_classificar.add_argument("entrada", help="Arquivo de cifra ('-' para stdin)")
+    
+    p_tonalidades = subcomandos.add_parser("tonalidades", help="Sugere as melhores tonalidades da cifra para um instrumento")
+    p_tonalidades.add_argument("entrada", help="Arquivo de cifra ('-' para stdin)")
+    p_tonalidades.add_argument("-i", "--instrumento", required=True, help="ID do instrumento")
+    p_tonalidades.add_argument("-n", "--quantidade", type=int, default=5, help="Opções mostradas (padrão: 5)")
+    
+    p_instrumentos = subcomandos.add_parser("instrumentos", help="Lista os instrumentos do catálogo")
+    p_instrumentos.add_argument("-f", "--familia", help="Só os de uma família (ex: madeiras)")
+    p_instrumentos.add_argument("-t", "--tonalidade", help="Só os de uma tonalidade (ex: Bb)")
+    
+    p_lote = subcomandos.add_parser("lote", help="Processa pedidos em JSON lines (um por linha) sem interação")
+    p_lote.add_argument("entrada", nargs="?", default="-", help="Arquivo .jsonl ('-' para stdin)")
+    p_lote.add_argument("-o", "--saida", default="-", help="Arquivo de respostas ('-' para stdout)")
+    p_lote.add_argument("-j", "--processos", type=int, default=1, help="Processos trabalhadores (padrão: 1)")
+    
+    args = parser.parse_args(argv)
+    transpositor = TranspositorMusical(args.catalogo)
+    if args.perfil:
+        transpositor.ativar_perfil()
+    
+    if args.comando == "transpor":
+        if args.semitons is not None:
+            semitons = args.semitons
+        elif args.origem and args.destino:
+            try:
+                semitons = transpositor.calcular_diferenca_afinacao(args.origem, args.destino)
+            except ErroTransposicao as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return 1
+        else:
+            parser.error("informe --semitons ou --origem e --destino")
+        
+        entrada = sys.stdin if args.entrada == "-" else args.entrada
+        saida = sys.stdout if args.saida == "-" else args.saida
+        transpositor.transpor_arquivo(entrada, saida, semitons, args.bemois)
+    
+    elif args.comando == "partes":
+        if args.entrada == "-":
+            cifra = sys.stdin.read()
+        else:
+            with open(args.entrada, 'r', encoding='utf-8', newline='') as arquivo:
+                cifra = arquivo.read()
+        destinos = args.destinos.split(",") if args.destinos else None
+        try:
+            partes = transpositor.transpor_partes(cifra, args.origem, destinos, args.bemois,
+                                                  preservar_layout=True, diretorio=args.diretorio)
+        except ErroTransposicao as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        print(f"🎼 {len(partes)} partes gravadas em {args.diretorio}")
+    
+    elif args.comando == "classificar":
+        if args.entrada == "-":
+            analise = transpositor.analisar_cifra(sys.stdin)
+        else:
+            with open(args.entrada, 'r', encoding='utf-8', buffering=TAMANHO_BLOCO) as arquivo:
+                analise = transpositor.analisar_cifra(arquivo)
+        for tipo in TIPOS_LINHA:
+            print(f"  {tipo:<10} {analise['linhas'][tipo]:>8} linhas {analise['tokens'][tipo]:>10} tokens")
+        print(f"⏭️  Linhas ignoradas: {analise['linhas_ignoradas']:.1%} | "
+              f"Tokens ignorados: {analise['tokens_ignorados']:.1%}")
+    
+    elif args.comando == "tonalidades":
+        if args.entrada == "-":
+            cifra = sys.stdin.read()
+        else:
+            with open(args.entrada, 'r', encoding='utf-8') as arquivo:
+                cifra = arquivo.read()
+        try:
+            opcoes = transpositor.melhores_tonalidades(cifra, args.instrumento, args.quantidade)
+        except ErroTransposicao as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        print(f"  {'tom':<6}{'semitons':>9}{'custo':>8}{'armadura':>10}{'acidentes':>11}{'abertas':>9}")
+        for opcao in opcoes:
+            abertas = "-" if opcao.formas_abertas is None else f"{opcao.formas_abertas:.0%}"
+            print(f"  {opcao.tonalidade:<6}{opcao.semitons:>+9}{opcao.custo:>8.3f}{opcao.armadura:>10}"
+                  f"{opcao.acidentes:>11.0%}{abertas:>9}")
+    
+    elif args.comando == "instrumentos":
+        for instr in transpositor.listar_instrumentos(args.familia, args.tonalidade):
+            apelidos = f"  (também: {', '.join(instr['apelidos'])})" if instr["apelidos"] else ""
+            print(f"  {instr['id']:<20} {instr['nome']:<20} {instr['familia']:<10} "
+                  f"{instr['tonalidade']:<3} {'-'.join(instr['afinacao'])}{apelidos}")
+    
+    elif args.comando == "lote":
+        entrada = sys.stdin if args.entrada == "-" else open(args.entrada, 'r', encoding='utf-8', buffering=TAMANHO_BLOCO)
+        saida = sys.stdout if args.saida == "-" else open(args.saida, 'w', encoding='utf-8', buffering=TAMANHO_BLOCO)
+        try:
+            inicio = time.perf_counter()
+            total = processar_jsonl(entrada, saida, args.processos, args.catalogo, transpositor)
+            duracao = time.perf_counter() - inicio
+            print(f"✅ {total} pedidos em {duracao:.3f} s ({total / duracao if duracao else 0:.0f}/s)",
+                  file=sys.stderr)
+        finally:
+            if entrada is not sys.stdin:
+                entrada.close()
+            if saida is not sys.stdout:
+                saida.close()
+    
+    elif args.comando == "inicializacao":
+        medidas = medir_inicializacao()
+        print(f"⏱️  Importação do módulo: {medidas['importacao_ms']:.3f} ms")
+        print(f"⏱️  Criação de instância: {medidas['instancia_us']:.3f} µs")
+        print(f"💾 Memória por instância: {medidas['bytes_por_instancia']} bytes")
+    
+    if args.perfil:
+        print(transpositor.relatorio_perfil(), file=sys.stderr)
+    
+    return 0
+
+TEMPO_IMPORTACAO = time.perf_counter() - _INICIO_IMPORTACAO
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli())
     main()
\ No newline at end of file
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Serviço HTTP local do Transpositor Musical (asyncio, sem dependências externas)
+Atende a página estática de front/ e expõe a transposição como API JSON
+
+Rotas:
+    GET  /api/instrumentos    catálogo de instrumentos
+    POST /api/transpor        {"cifra", "origem", "destino" | "semitons", "usar_bemois"}
+    POST /api/lote            {"requisicoes": [ ...mesmos campos de /api/transpor... ]}
+    GET  /api/estatisticas    latência das requisições e uso do cache
+    GET  /...                 arquivos de front/
+"""
+
+import argparse
+import asyncio
+import json
+import mimetypes
+import os
+import sys
+import time
+from collections import deque
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cache_resultados import CacheResultados
+from main import TranspositorMusical, _semitons_do_pedido
+
+DIRETORIO_FRONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "front")
+
+MAX_CONCORRENCIA_PADRAO = 64
+MAX_CORPO = 8 * 1024 * 1024          # bytes por requisição
+MAX_LOTE = 10000                     # cifras por requisição de lote
+TEMPO_OCIOSO = 15                    # segundos de keep-alive sem requisições
+AMOSTRAS_LATENCIA = 10000
+
+_MOTIVOS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErroRequisicao(Exception):
+    """Erro que vira uma resposta HTTP com o código informado"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class ServidorTranspositor:
+    """Servidor HTTP/1.1 com keep-alive e limite de requisições simultâneas"""
+
+    def __init__(self, transpositor=None, max_concorrencia=MAX_CONCORRENCIA_PADRAO,
+                 diretorio_front=DIRETORIO_FRONT):
+        self.transpositor = transpositor or TranspositorMusical()
+        self.cache = CacheResultados(self.transpositor)
+        self.diretorio_front = diretorio_front
+        self._limite = asyncio.Semaphore(max_concorrencia)
+        self._latencias = deque(maxlen=AMOSTRAS_LATENCIA)
+        self.requisicoes = 0
+        self.conexoes_abertas = 0
+
+    # ------------------------------------------------------------------ HTTP
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão, processando requisições até ela ser fechada"""
+        self.conexoes_abertas += 1
+        try:
+            while True:
+                try:
+                    cabecalho = await asyncio.wait_for(leitor.readuntil(b"\r\n\r\n"), TEMPO_OCIOSO)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError,
+                        asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                inicio = time.perf_counter()
+                manter = await self._processar(cabecalho, leitor, escritor)
+                self._latencias.append(time.perf_counter() - inicio)
+                self.requisicoes += 1
+                if not manter:
+                    break
+        finally:
+            self.conexoes_abertas -= 1
+            escritor.close()
+
+    async def _processar(self, cabecalho, leitor, escritor):
+        linhas = cabecalho.decode("latin-1").split("\r\n")
+        try:
+            metodo, alvo, versao = linhas[0].split(" ", 2)
+        except ValueError:
+            await self._responder(escritor, 400, {"erro": "Requisição malformada"}, False)
+            return False
+
+        cabecalhos = {}
+        for linha in linhas[1:]:
+            if ":" in linha:
+                nome, valor = linha.split(":", 1)
+                cabecalhos[nome.strip().lower()] = valor.strip()
+
+        conexao = cabecalhos.get("connection", "").lower()
+        manter = conexao != "close" if versao == "HTTP/1.1" else conexao == "keep-alive"
+
+        corpo = b""
+        try:
+            # Só dígitos ASCII: int() também aceitaria sinal, espaços e '_'
+            tamanho = cabecalhos.get("content-length") or "0"
+            if not (tamanho.isascii() and tamanho.isdigit()):
+                raise ValueError(tamanho)
+            tamanho = int(tamanho)
+        except ValueError:
+            await self._responder(escritor, 400, {"erro": "Content-Length inválido"}, False)
+            return False
+        if tamanho > MAX_CORPO:
+            await self._responder(escritor, 413, {"erro": "Corpo da requisição muito grande"}, False)
+            return False
+        if tamanho:
+            try:
+                corpo = await leitor.readexactly(tamanho)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return False  # o cliente enviou menos que o Content-Length ou desconectou
+
+        caminho = alvo.split("?", 1)[0]
+        try:
+            if metodo == "POST":
+                # O processamento das cifras roda fora do laço de eventos, limitado
+                # a ``max_concorrencia`` pedidos simultâneos
+                async with self._limite:
+                    status, resposta = await asyncio.get_running_loop().run_in_executor(
+                        None, self._rotear, metodo, caminho, corpo)
+            else:
+                status, resposta = self._rotear(metodo, caminho, corpo)
+        except ErroRequisicao as e:
+            status, resposta = e.status, {"erro": str(e)}
+        except Exception as e:
+            status, resposta = 500, {"erro": f"Erro inesperado: {e}"}
+
+        await self._responder(escritor, status, resposta, manter)
+        return manter
+
+    async def _responder(self, escritor, status, resposta, manter):
+        if isinstance(resposta, tuple):
+            tipo, conteudo = resposta
+        else:
+            tipo, conteudo = "application/json; charset=utf-8", json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+
+        cabecalho = (
+            f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+            f"Content-Type: {tipo}\r\n"
+            f"Content-Length: {len(conteudo)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n"
+        )
+        escritor.write(cabecalho.encode("latin-1") + conteudo)
+        await escritor.drain()
+
+    # ---------------------------------------------------------------- Rotas
+
+    def _rotear(self, metodo, caminho, corpo):
+        if metodo == "OPTIONS":
+            return 204, ("text/plain", b"")
+
+        if caminho.startswith("/api/"):
+            rota = caminho[len("/api/"):].rstrip("/")
+            if metodo == "GET" and rota == "instrumentos":
+                return 200, {"instrumentos": self._listar_instrumentos()}
+            if metodo == "GET" and rota == "estatisticas":
+                return 200, self.estatisticas()
+            if metodo == "POST" and rota == "transpor":
+                return 200, self.transpor(self._ler_json(corpo))
+            if metodo == "POST" and rota == "lote":
+                return 200, self.transpor_lote(self._ler_json(corpo))
+            raise ErroRequisicao(404, f"Rota desconhecida: {caminho}")
+
+        if metodo != "GET":
+            raise ErroRequisicao(405, "Método não permitido")
+        return 200, self._arquivo_estatico(caminho)
+
+    @staticmethod
+    def _ler_json(corpo):
+        try:
+            dados = json.loads(corpo or b"{}")
+        except ValueError:
+            raise ErroRequisicao(400, "JSON inválido")
+        if not isinstance(dados, dict):
+            raise ErroRequisicao(400, "O corpo deve ser um objeto JSON")
+        return dados
+
+    def _listar_instrumentos(self):
+        return [
+            {"id": instr["id"], "nome": instr["nome"], "familia": instr["familia"],
+             "afinacao": list(instr["afinacao"]), "tonalidade": instr["tonalidade"],
+             "apelidos": list(instr["apelidos"])}
+            for instr in self.transpositor.listar_instrumentos()
+        ]
+
+    def transpor(self, pedido):
+        """Processa um pedido de transposição (mesmos campos de /api/transpor)"""
+        cifra = pedido.get("cifra")
+        if not isinstance(cifra, str):
+            raise ErroRequisicao(400, "Campo 'cifra' é obrigatório")
+        usar_bemois = bool(pedido.get("usar_bemois", False))
+
+        transpositor = self.transpositor
+        try:
+            if pedido.get("semitons") is not None:
+                # Sem instrumentos não há cache: transpõe e explica numa só passada.
+                # Os semitons passam pela mesma validação do modo em lote (main.py)
+                semitons = _semitons_do_pedido(transpositor, pedido)
+                transposta = transpositor.transpor_e_explicar(cifra, semitons, usar_bemois)
+                return {"resultado": transposta.cifra, "semitons": transposta.semitons,
+                        "explicacao": transposta.explicacao}
+            origem, destino = pedido.get("origem"), pedido.get("destino")
+            semitons = transpositor.calcular_diferenca_afinacao(origem, destino)
+            resultado = self.cache.transpor_cifra(cifra, origem, destino, usar_bemois)
+        except KeyError as e:
+            raise ErroRequisicao(400, f"Instrumento desconhecido: {e.args[0]}")
+        except (TypeError, ValueError) as e:
+            raise ErroRequisicao(400, str(e))
+
+        return {
+            "resultado": resultado,
+            "semitons": semitons,
+            "explicacao": self.cache.converter_cifra_portugues(resultado),
+        }
+
+    def transpor_lote(self, pedido):
+        """Processa várias cifras; erros são isolados por item"""
+        requisicoes = pedido.get("requisicoes")
+        if not isinstance(requisicoes, list):
+            raise ErroRequisicao(400, "Campo 'requisicoes' deve ser uma lista")
+        if len(requisicoes) > MAX_LOTE:
+            raise ErroRequisicao(413, f"Máximo de {MAX_LOTE} cifras por lote")
+
+        resultados = []
+        for item in requisicoes:
+            try:
+                if not isinstance(item, dict):
+                    raise ErroRequisicao(400, "Cada item deve ser um objeto JSON")
+                resultados.append(self.transpor(item))
+            except ErroRequisicao as e:
+                resultados.append({"erro": str(e)})
+            except Exception as e:
+                resultados.append({"erro": f"Erro inesperado: {e}"})
+        return {"resultados": resultados}
+
+    def _arquivo_estatico(self, caminho):
+        relativo = caminho.lstrip("/") or "index.html"
+        completo = os.path.realpath(os.path.join(self.diretorio_front, relativo))
+        if not completo.startswith(os.path.realpath(self.diretorio_front) + os.sep) or not os.path.isfile(completo):
+            raise ErroRequisicao(404, f"Arquivo não encontrado: {caminho}")
+        tipo = mimetypes.guess_type(completo)[0] or "application/octet-stream"
+        if tipo.startswith("text/") or tipo == "application/javascript":
+            tipo += "; charset=utf-8"
+        with open(completo, "rb") as arquivo:
+            return tipo, arquivo.read()
+
+    def estatisticas(self):
+        """Latência das últimas requisições (em ms) e contadores do serviço"""
+        latencias = sorted(self._latencias)
+
+        def percentil(p):
+            if not latencias:
+                return 0.0
+            return latencias[min(len(latencias) - 1, int(round(p / 100 * (len(latencias) - 1))))] * 1000
+
+        return {
+            "requisicoes": self.requisicoes,
+            "conexoes_abertas": self.conexoes_abertas,
+            "latencia_ms": {"p50": percentil(50), "p90": percentil(90), "p99": percentil(99)},
+            "cache": self.cache.estatisticas(),
+        }
+
+
+async def servir(host="127.0.0.1", porta=8080, max_concorrencia=MAX_CONCORRENCIA_PADRAO):
+    """Inicia o servidor e atende até ser interrompido"""
+    servidor = ServidorTranspositor(max_concorrencia=max_concorrencia)
+    rede = await asyncio.start_server(servidor.atender, host, porta)
+    print(f"🎵 Transpositor Musical em http://{host}:{porta}/")
+    async with rede:
+        await rede.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP local do Transpositor Musical")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("-p", "--porta", type=int, default=8080, help="Porta (padrão: 8080)")
+    parser.add_argument("-c", "--max-concorrencia", type=int, default=MAX_CONCORRENCIA_PADRAO,
+                        help="Requisições processadas ao mesmo tempo")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.max_concorrencia))
+    except KeyboardInterrupt:
+        print("\n🎶 Servidor encerrado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Sessão de edição de cifra com transposição incremental
+Mantém o texto indexado por linha e retransforma só as linhas editadas
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from main import TranspositorMusical
+
+# Trecho da saída que mudou: as linhas [inicio, fim) da versão anterior
+# devem ser substituídas por ``linhas``
+AlteracaoLinhas = namedtuple("AlteracaoLinhas", ["inicio", "fim", "linhas"])
+
+
+class SessaoCifra:
+    """Documento de cifra aberto para edição, com a versão transposta sempre em dia
+
+    Cada edição substitui um intervalo de linhas e só essas linhas são
+    transpostas de novo (com transpor_linha, preservando o alinhamento), então
+    o custo de uma edição não depende do tamanho da música. Os métodos de
+    edição retornam a lista de AlteracaoLinhas da saída.
+    """
+
+    def __init__(self, texto="", semitons=0, usar_bemois=False, transpositor=None):
+        self.transpositor = transpositor or TranspositorMusical()
+        self.semitons = semitons
+        self.usar_bemois = usar_bemois
+        self.linhas = texto.splitlines()
+        self.saida = [self._transpor(linha) for linha in self.linhas]
+
+    def _transpor(self, linha):
+        return self.transpositor.transpor_linha(linha, self.semitons, self.usar_bemois)
+
+    @property
+    def texto(self):
+        """Texto original atual"""
+        return '\n'.join(self.linhas)
+
+    @property
+    def resultado(self):
+        """Texto transposto atual"""
+        return '\n'.join(self.saida)
+
+    def editar(self, inicio, fim, novas_linhas):
+        """Substitui as linhas [inicio, fim) do original por ``novas_linhas``
+
+        ``novas_linhas`` pode ser um texto (dividido em linhas) ou uma lista.
+        """
+        if isinstance(novas_linhas, str):
+            novas_linhas = novas_linhas.splitlines()
+        if not 0 <= inicio <= fim <= len(self.linhas):
+            raise IndexError(f"Intervalo de linhas inválido: {inicio}-{fim} (total: {len(self.linhas)})")
+
+        transpostas = [self._transpor(linha) for linha in novas_linhas]
+        anteriores = self.saida[inicio:fim]
+        self.linhas[inicio:fim] = novas_linhas
+        self.saida[inicio:fim] = transpostas
+        return self._diferenca(inicio, anteriores, transpostas)
+
+    def atualizar(self, texto):
+        """Recebe o texto completo editado e retransforma só o trecho que mudou
+
+        Útil para clientes que enviam a área de texto inteira a cada alteração:
+        as linhas iguais no início e no fim são reaproveitadas.
+        """
+        novas = texto.splitlines()
+        antigas = self.linhas
+        limite = min(len(novas), len(antigas))
+
+        inicio = 0
+        while inicio < limite and novas[inicio] == antigas[inicio]:
+            inicio += 1
+        comum_final = 0
+        while (comum_final < limite - inicio
+               and novas[-1 - comum_final] == antigas[-1 - comum_final]):
+            comum_final += 1
+
+        return self.editar(inicio, len(antigas) - comum_final, novas[inicio:len(novas) - comum_final])
+
+    def transpor(self, semitons, usar_bemois=None):
+        """Muda a transposição da sessão; todas as linhas de acordes são refeitas"""
+        self.semitons = semitons
+        if usar_bemois is not None:
+            self.usar_bemois = usar_bemois
+
+        anteriores = self.saida
+        self.saida = [self._transpor(linha) for linha in self.linhas]
+        return [
+            AlteracaoLinhas(numero, numero + 1, [nova])
+            for numero, (antiga, nova) in enumerate(zip(anteriores, self.saida))
+            if antiga != nova
+        ]
+
+    @staticmethod
+    def _diferenca(inicio, anteriores, transpostas):
+        """Reduz a substituição ao trecho que de fato mudou na saída"""
+        comum = 0
+        limite = min(len(anteriores), len(transpostas))
+        while comum < limite and anteriores[comum] == transpostas[comum]:
+            comum += 1
+        comum_final = 0
+        while (comum_final < limite - comum
+               and anteriores[-1 - comum_final] == transpostas[-1 - comum_final]):
+            comum_final += 1
+
+        if comum == len(anteriores) == len(transpostas):
+            return []
+        return [AlteracaoLinhas(inicio + comum, inicio + len(anteriores) - comum_final,
+                                transpostas[comum:len(transpostas) - comum_final])]